@@ -176,7 +176,7 @@ class _EffectBuilder(Protocol):
             offset_jitter: ポリラインごとに offset に加えるジッター量 [mm]
         """
         ...
-    def displace(self, *, bypass: bool = ..., amplitude: Vec3 = ..., spatial_freq: Vec3 = ..., amplitude_gradient: Vec3 = ..., frequency_gradient: Vec3 = ..., min_gradient_factor: float = ..., max_gradient_factor: float = ..., t: float = ...) -> _EffectBuilder:
+    def displace(self, *, bypass: bool = ..., amplitude: Vec3 = ..., spatial_freq: Vec3 = ..., amplitude_gradient: Vec3 = ..., frequency_gradient: Vec3 = ..., min_gradient_factor: float = ..., max_gradient_factor: float = ..., t: float = ..., lattice_resolution: int = ...) -> _EffectBuilder:
         """
         3D Perlin ノイズで頂点を変位する。
 
@@ -189,6 +189,7 @@ class _EffectBuilder(Protocol):
             min_gradient_factor: 勾配適用時の最小係数（0.0–1.0）
             max_gradient_factor: 勾配適用時の最大係数（1.0–4.0）
             t: 時間オフセット（位相）
+            lattice_resolution: ノイズ格子キャッシュの分割数（1 ノイズセルあたり、0 で無効）
         """
         ...
     def drop(self, *, bypass: bool = ..., interval: int = ..., index_offset: int = ..., min_length: float = ..., max_length: float = ..., probability_base: Vec3 = ..., probability_slope: Vec3 = ..., by: str = ..., keep_mode: str = ..., seed: int = ...) -> _EffectBuilder:
@@ -476,7 +477,7 @@ class _E(Protocol):
             offset_jitter: ポリラインごとに offset に加えるジッター量 [mm]
         """
         ...
-    def displace(self, *, bypass: bool = ..., amplitude: Vec3 = ..., spatial_freq: Vec3 = ..., amplitude_gradient: Vec3 = ..., frequency_gradient: Vec3 = ..., min_gradient_factor: float = ..., max_gradient_factor: float = ..., t: float = ...) -> _EffectBuilder:
+    def displace(self, *, bypass: bool = ..., amplitude: Vec3 = ..., spatial_freq: Vec3 = ..., amplitude_gradient: Vec3 = ..., frequency_gradient: Vec3 = ..., min_gradient_factor: float = ..., max_gradient_factor: float = ..., t: float = ..., lattice_resolution: int = ...) -> _EffectBuilder:
         """
         3D Perlin ノイズで頂点を変位する。
 
@@ -489,6 +490,7 @@ class _E(Protocol):
             min_gradient_factor: 勾配適用時の最小係数（0.0–1.0）
             max_gradient_factor: 勾配適用時の最大係数（1.0–4.0）
             t: 時間オフセット（位相）
+            lattice_resolution: ノイズ格子キャッシュの分割数（1 ノイズセルあたり、0 で無効）
         """
         ...
     def drop(self, *, bypass: bool = ..., interval: int = ..., index_offset: int = ..., min_length: float = ..., max_length: float = ..., probability_base: Vec3 = ..., probability_slope: Vec3 = ..., by: str = ..., keep_mode: str = ..., seed: int = ...) -> _EffectBuilder:
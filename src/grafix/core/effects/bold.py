@@ -9,7 +9,7 @@ import numpy as np
 
 from grafix.core.effect_registry import effect
 from grafix.core.parameters.meta import ParamMeta
-from grafix.core.realized_geometry import RealizedGeometry
+from grafix.core.realized_geometry import InstancedGeometry, RealizedGeometry
 
 bold_meta = {
     "count": ParamMeta(kind="int", ui_min=1, ui_max=10),
@@ -65,7 +65,7 @@ def bold(
     Returns
     -------
     RealizedGeometry
-        複製後の実体ジオメトリ。
+        複製後の実体ジオメトリ（`InstancedGeometry`。座標配列は参照時に展開される）。
 
     Notes
     -----
@@ -97,25 +97,10 @@ def bold(
     offsets_xy = np.zeros((copies, 2), dtype=np.float64)
     offsets_xy[1:] = _sample_offsets_xy(rng=rng, n=copies - 1, radius=r)
 
-    base_coords64 = base.coords.astype(np.float64, copy=False)
-    out_coords64 = np.empty((n_vertices * copies, 3), dtype=np.float64)
-    for k in range(copies):
-        s = k * n_vertices
-        e = s + n_vertices
-        out_coords64[s:e] = base_coords64
-        out_coords64[s:e, 0] += offsets_xy[k, 0]
-        out_coords64[s:e, 1] += offsets_xy[k, 1]
-
-    tail = base.offsets[1:].astype(np.int64, copy=False)
-    out_offsets = np.empty((n_lines * copies + 1,), dtype=np.int32)
-    out_offsets[0] = 0
-    for k in range(copies):
-        start = 1 + k * n_lines
-        end = start + n_lines
-        out_offsets[start:end] = (tail + k * n_vertices).astype(np.int32, copy=False)
-
-    coords = out_coords64.astype(np.float32, copy=False)
-    return RealizedGeometry(coords=coords, offsets=out_offsets)
+    transforms = np.zeros((copies, 3, 4), dtype=np.float64)
+    transforms[:, :, 0:3] = np.eye(3)
+    transforms[:, 0:2, 3] = offsets_xy
+    return InstancedGeometry(base, transforms)
 
 
 __all__ = ["bold", "bold_meta"]
@@ -11,6 +11,8 @@ from grafix.core.effect_registry import effect
 from grafix.core.realized_geometry import RealizedGeometry
 from grafix.core.parameters.meta import ParamMeta
 
+from .polyline_metrics import polyline_metrics
+
 buffer_meta = {
     "join": ParamMeta(kind="choice", choices=("mitre", "round", "bevel")),
     "distance": ParamMeta(kind="float", ui_min=-25.0, ui_max=25.0),
@@ -39,14 +41,13 @@ def _empty_geometry() -> RealizedGeometry:
     return RealizedGeometry(coords=coords, offsets=offsets)
 
 
-def _close_curve(points: np.ndarray, threshold: float) -> np.ndarray:
-    """端点が閾値以内なら、始点を終端に複製して閉じる。"""
-    if points.shape[0] < 2:
-        return points
-    dist = float(np.linalg.norm(points[0] - points[-1]))
-    if dist <= float(threshold):
-        return np.concatenate([points[:-1], points[0:1]], axis=0)
-    return points
+def _close_curves(coords: np.ndarray, offsets: np.ndarray, closing: np.ndarray) -> np.ndarray:
+    """closing が True の線について、終点を始点で置き換えて閉じる（全線一括）。"""
+    starts = offsets[:-1]
+    ends = offsets[1:] - 1
+    out = coords.copy()
+    out[ends[closing]] = coords[starts[closing]]
+    return out
 
 
 def _fit_plane_basis(points: np.ndarray) -> _PlaneBasis:
@@ -155,69 +156,49 @@ def _fit_plane_basis(points: np.ndarray) -> _PlaneBasis:
     return _PlaneBasis(origin=origin, u=u_axis, v=v_axis)
 
 
-def _project_to_2d(points: np.ndarray, basis: _PlaneBasis) -> np.ndarray:
-    p = points.astype(np.float64, copy=False) - basis.origin
-    x = p @ basis.u
-    y = p @ basis.v
-    return np.stack([x, y], axis=1)
-
-
-def _lift_to_3d(coords_2d: np.ndarray, basis: _PlaneBasis) -> np.ndarray:
-    xy = coords_2d.astype(np.float64, copy=False)
-    return basis.origin[None, :] + xy[:, 0:1] * basis.u[None, :] + xy[:, 1:2] * basis.v[None, :]
+def _extract_rings_2d(
+    buffered: np.ndarray, *, which: str
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """buffer 結果の配列から輪郭頂点列を一括抽出する。
 
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        `(coords_2d, counts, source)`。`coords_2d` は全輪郭を連結した (K,2)、
+        `counts` は輪郭ごとの頂点数、`source` は輪郭ごとの元の `buffered` インデックス。
+        頂点数 < 2 の輪郭は含めない。
+    """
+    # ローカル import（effect 未使用時に shapely import を避ける）
+    import shapely  # type: ignore[import-not-found, import-untyped]
 
-def _extract_vertices_2d(buffered, *, which: str) -> list[np.ndarray]:
-    """Shapely geometry から輪郭頂点列（Nx2）を抽出して返す。"""
-    if buffered.is_empty:
-        return []
+    parts, part_source = shapely.get_parts(buffered, return_index=True)
+    type_ids = shapely.get_type_id(parts)
+    is_polygon = type_ids == 3
 
-    # ローカル import（effect 未使用時に shapely import を避ける）
-    from shapely.geometry import (  # type: ignore[import-not-found, import-untyped]
-        LineString,
-        MultiLineString,
-        MultiPolygon,
-        Polygon,
-    )
-
-    out: list[np.ndarray] = []
     if which == "exterior":
-        if isinstance(buffered, Polygon):
-            out.append(np.asarray(buffered.exterior.coords, dtype=np.float64))
-            return out
-        if isinstance(buffered, MultiPolygon):
-            for poly in buffered.geoms:
-                if not poly.is_empty:
-                    out.append(np.asarray(poly.exterior.coords, dtype=np.float64))
-            return out
-        if isinstance(buffered, LineString):
-            out.append(np.asarray(buffered.coords, dtype=np.float64))
-            return out
-        if isinstance(buffered, MultiLineString):
-            for line in buffered.geoms:
-                out.append(np.asarray(line.coords, dtype=np.float64))
-            return out
+        # 面は外周、線（LineString / LinearRing）はそのまま輪郭として扱う。
+        is_line = (type_ids == 1) | (type_ids == 2)
+        keep = is_polygon | is_line
+        rings = parts[keep].copy()
+        rings[is_polygon[keep]] = shapely.get_exterior_ring(parts[is_polygon])
+        ring_source = part_source[keep]
     elif which == "interior":
-        if isinstance(buffered, Polygon):
-            for ring in buffered.interiors:
-                out.append(np.asarray(ring.coords, dtype=np.float64))
-            return out
-        if isinstance(buffered, MultiPolygon):
-            for poly in buffered.geoms:
-                if poly.is_empty:
-                    continue
-                for ring in poly.interiors:
-                    out.append(np.asarray(ring.coords, dtype=np.float64))
-            return out
+        polygons = parts[is_polygon]
+        n_holes = shapely.get_num_interior_rings(polygons)
+        owner = np.repeat(np.arange(polygons.shape[0]), n_holes)
+        # 各面内での穴番号（0, 1, ...）。
+        first = np.repeat(np.cumsum(n_holes) - n_holes, n_holes)
+        hole_index = np.arange(owner.shape[0]) - first
+        rings = shapely.get_interior_ring(polygons[owner], hole_index)
+        ring_source = part_source[is_polygon][owner]
     else:
         raise ValueError(f"unknown which: {which!r}")
 
-    # GeometryCollection 等の可能性は浅く処理する（未知型は黙って捨てる）。
-    geoms = getattr(buffered, "geoms", None)
-    if geoms is not None:
-        for g in geoms:
-            out.extend(_extract_vertices_2d(g, which=which))
-    return out
+    coords_2d, ring_index = shapely.get_coordinates(rings, return_index=True)
+    counts = np.bincount(ring_index, minlength=rings.shape[0])
+    keep_ring = counts >= 2
+    keep_point = keep_ring[ring_index]
+    return coords_2d[keep_point], counts[keep_ring], ring_source[keep_ring]
 
 
 @effect(meta=buffer_meta)
@@ -286,78 +267,77 @@ def buffer(
         quad_segs_i = _QUAD_SEGS_MAX
 
     # ローカル import（effect 未使用時に shapely import を避ける）
-    from shapely.geometry import LineString, MultiLineString  # type: ignore[import-not-found]
+    import shapely  # type: ignore[import-not-found, import-untyped]
 
     coords = base.coords
     offsets = base.offsets
-
-    out_lines: list[np.ndarray] = []
-    if bool(union):
-        basis = _fit_plane_basis(coords)
-
-        lines2: list[np.ndarray] = []
-        for i in range(int(offsets.size) - 1):
-            s = int(offsets[i])
-            e = int(offsets[i + 1])
-            line3 = coords[s:e]
-            if line3.shape[0] < 2:
-                continue
-            line3 = _close_curve(line3, _AUTO_CLOSE_THRESHOLD)
-            lines2.append(_project_to_2d(line3, basis))
-
-        if lines2:
-            buffered = MultiLineString(lines2).buffer(  # type: ignore[arg-type]
-                abs_d,
-                quad_segs=quad_segs_i,
-                join_style=join_style,
-            )
-            which = "exterior" if d > 0.0 else "interior"
-            for v2 in _extract_vertices_2d(buffered, which=which):
-                if v2.shape[0] < 2:
-                    continue
-                v3 = _lift_to_3d(v2[:, :2], basis).astype(np.float32, copy=False)
-                out_lines.append(v3)
-    else:
-        for i in range(int(offsets.size) - 1):
-            s = int(offsets[i])
-            e = int(offsets[i + 1])
-            line3 = coords[s:e]
-            if line3.shape[0] < 2:
-                continue
-
-            line3 = _close_curve(line3, _AUTO_CLOSE_THRESHOLD)
-            basis = _fit_plane_basis(line3)
-            line2 = _project_to_2d(line3, basis)
-
-            buffered = LineString(line2).buffer(  # type: ignore[arg-type]
-                abs_d,
-                quad_segs=quad_segs_i,
-                join_style=join_style,
-            )
-            which = "exterior" if d > 0.0 else "interior"
-            for v2 in _extract_vertices_2d(buffered, which=which):
-                if v2.shape[0] < 2:
-                    continue
-                v3 = _lift_to_3d(v2[:, :2], basis).astype(np.float32, copy=False)
-                out_lines.append(v3)
+    counts = np.diff(offsets)
+
+    # 2 点以上の線だけを対象に、端点が近いものを閉じる。
+    valid = np.flatnonzero(counts >= 2)
+    which = "exterior" if d > 0.0 else "interior"
+    out_coords_list: list[np.ndarray] = []
+    out_counts_list: list[np.ndarray] = []
+
+    if valid.size > 0:
+        valid_counts = counts[valid]
+        sub_offsets = np.zeros((valid.size + 1,), dtype=np.int64)
+        np.cumsum(valid_counts, out=sub_offsets[1:])
+        line_index = np.repeat(np.arange(valid.size), valid_counts)
+        point_index = offsets[valid][line_index] + (
+            np.arange(line_index.shape[0]) - sub_offsets[line_index]
+        )
+        closing = polyline_metrics(base).closing_lengths[valid] <= _AUTO_CLOSE_THRESHOLD
+        lines3 = _close_curves(coords[point_index].astype(np.float64), sub_offsets, closing)
+
+        # union は全体で 1 つの基底、それ以外は従来どおり線ごとに基底を推定する
+        # （各線は自分の平面で buffer される）。Shapely の buffer 呼び出しだけを一括にする。
+        if bool(union):
+            basis = _fit_plane_basis(coords)
+            origins = basis.origin[None, :]
+            us = basis.u[None, :]
+            vs = basis.v[None, :]
+            point_basis = np.zeros((lines3.shape[0],), dtype=np.int64)
+        else:
+            bases = [
+                _fit_plane_basis(lines3[sub_offsets[i] : sub_offsets[i + 1]])
+                for i in range(valid.size)
+            ]
+            origins = np.stack([b.origin for b in bases])
+            us = np.stack([b.u for b in bases])
+            vs = np.stack([b.v for b in bases])
+            point_basis = line_index
+
+        rel = lines3 - origins[point_basis]
+        lines2 = np.stack(
+            [
+                np.einsum("ij,ij->i", rel, us[point_basis]),
+                np.einsum("ij,ij->i", rel, vs[point_basis]),
+            ],
+            axis=1,
+        )
+        geoms = shapely.linestrings(lines2, indices=line_index)
+        if bool(union):
+            geoms = np.array([shapely.multilinestrings(geoms)], dtype=object)
+
+        buffered = shapely.buffer(geoms, abs_d, quad_segs=quad_segs_i, join_style=join_style)
+        ring_xy, ring_counts, ring_source = _extract_rings_2d(buffered, which=which)
+        if ring_counts.size > 0:
+            ring_basis = np.zeros_like(ring_source) if bool(union) else ring_source
+            pb = np.repeat(ring_basis, ring_counts)
+            lifted = origins[pb] + ring_xy[:, 0:1] * us[pb] + ring_xy[:, 1:2] * vs[pb]
+            out_coords_list.append(lifted.astype(np.float32))
+            out_counts_list.append(ring_counts)
 
     if keep_original:
-        for i in range(int(offsets.size) - 1):
-            s = int(offsets[i])
-            e = int(offsets[i + 1])
-            original = coords[s:e]
-            if original.shape[0] > 0:
-                out_lines.append(original.astype(np.float32, copy=False))
-
-    if not out_lines:
-        return base if d > 0.0 else _empty_geometry()
+        out_coords_list.append(coords)
+        out_counts_list.append(counts[counts > 0])
 
-    out_coords = np.concatenate(out_lines, axis=0).astype(np.float32, copy=False)
-    out_offsets = np.empty((len(out_lines) + 1,), dtype=np.int32)
-    out_offsets[0] = 0
-    acc = 0
-    for i, line in enumerate(out_lines):
-        acc += int(line.shape[0])
-        out_offsets[i + 1] = acc
+    n_out = int(sum(c.size for c in out_counts_list))
+    if n_out == 0:
+        return base if d > 0.0 else _empty_geometry()
 
+    out_coords = np.concatenate(out_coords_list, axis=0).astype(np.float32, copy=False)
+    out_offsets = np.zeros((n_out + 1,), dtype=np.int32)
+    np.cumsum(np.concatenate(out_counts_list), out=out_offsets[1:])
     return RealizedGeometry(coords=out_coords, offsets=out_offsets)
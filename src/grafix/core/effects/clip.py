@@ -7,11 +7,17 @@
 
 処理:
 - マスクの代表リングから姿勢（平面）を推定し、両入力を XY 平面へ整列して 2D クリップする。
+- マスク側の前処理（姿勢推定・整数リング化）はマスク入力のインスタンスごとにキャッシュする
+  （realize キャッシュは同じ GeometryId に同じインスタンスを返すので、
+  静的なマスクの前処理はフレーム間で共有される）。
 - 結果のポリラインを元の姿勢へ戻して出力する。
 """
 
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Sequence
 
 import numpy as np
@@ -19,7 +25,7 @@ import pyclipper  # type: ignore[import-not-found, import-untyped]
 
 from grafix.core.effect_registry import effect
 from grafix.core.parameters.meta import ParamMeta
-from grafix.core.realized_geometry import RealizedGeometry
+from grafix.core.realized_geometry import RealizedGeometry, concat_realized_geometries
 
 from .util import transform_back, transform_to_xy_plane
 
@@ -56,69 +62,145 @@ def _apply_alignment(
     return aligned
 
 
-def _remove_consecutive_duplicates(
-    path: list[tuple[int, int]],
-) -> list[tuple[int, int]]:
-    if len(path) < 2:
-        return path
-    out = [path[0]]
-    for pt in path[1:]:
-        if pt != out[-1]:
-            out.append(pt)
-    return out
+def _to_int_paths(
+    xy: np.ndarray, offsets: np.ndarray, scale: int, *, min_points: int
+) -> list[np.ndarray]:
+    """ポリライン列を pyclipper 用の整数パス列 (int64, shape (K,2)) へ一括変換する。
 
+    各線で連続重複点を除き、始点と終点が一致する場合は終点を落とす。
+    `min_points` 点未満になった線は捨てる。
+    """
+    n_lines = int(offsets.size) - 1
+    if n_lines <= 0 or xy.shape[0] == 0:
+        return []
+
+    scaled = np.rint(xy.astype(np.float64, copy=False) * float(scale)).astype(np.int64)
+    counts = np.diff(offsets).astype(np.int64, copy=False)
+    line_index = np.repeat(np.arange(n_lines), counts)
+
+    # 連続重複点を除く（線の先頭は常に残す）。
+    keep = np.ones(scaled.shape[0], dtype=bool)
+    keep[1:] = np.any(scaled[1:] != scaled[:-1], axis=1)
+    keep[offsets[:-1][counts > 0]] = True
+    pts = scaled[keep]
+    pts_line = line_index[keep]
+    dedup_counts = np.bincount(pts_line, minlength=n_lines)
+    dedup_ends = np.cumsum(dedup_counts)
+
+    # 閉じた線（始点 == 終点）は終点を落とす。
+    valid = np.flatnonzero(dedup_counts >= int(min_points))
+    firsts = dedup_ends[valid] - dedup_counts[valid]
+    lasts = dedup_ends[valid] - 1
+    closed = np.all(pts[firsts] == pts[lasts], axis=1)
+    keep_pts = np.ones(pts.shape[0], dtype=bool)
+    keep_pts[lasts[closed]] = False
+    final_counts = dedup_counts[valid] - closed.astype(np.int64)
+
+    pts = pts[keep_pts]
+    pts_line = pts_line[keep_pts]
+    final_ends = np.cumsum(np.bincount(pts_line, minlength=n_lines))
+    final_starts = final_ends[valid] - final_counts
+    return [
+        pts[int(a) : int(a) + int(c)]
+        for a, c in zip(final_starts, final_counts, strict=True)
+        if int(c) >= int(min_points)
+    ]
+
+
+def _int_paths_to_lines(
+    paths: Sequence[np.ndarray] | Sequence[Sequence[Sequence[int]]],
+    scale: int,
+    rotation_matrix: np.ndarray,
+    z_offset: float,
+    *,
+    close: bool,
+) -> RealizedGeometry:
+    """整数パス列を元の姿勢へ戻したポリライン列にする（close=True で始点を末尾へ複製）。"""
+    arrays = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in paths]
+    if close:
+        arrays = [np.concatenate([a, a[:1]], axis=0) for a in arrays]
+    if not arrays:
+        return _empty_geometry()
 
-def _to_int_path_open(xy: np.ndarray, scale: int) -> list[tuple[int, int]] | None:
-    if xy.shape[0] < 2:
-        return None
-    scaled = np.rint(xy.astype(np.float64, copy=False) * float(scale)).astype(
-        np.int64, copy=False
-    )
-    path = [(int(p[0]), int(p[1])) for p in scaled]
-    path = _remove_consecutive_duplicates(path)
-    if len(path) < 2:
+    counts = np.fromiter((a.shape[0] for a in arrays), dtype=np.int64, count=len(arrays))
+    v = np.zeros((int(counts.sum()), 3), dtype=np.float64)
+    v[:, 0:2] = np.concatenate(arrays, axis=0) / float(scale)
+    restored = transform_back(v, rotation_matrix, float(z_offset))
+    offsets = np.zeros((len(arrays) + 1,), dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return RealizedGeometry(coords=restored.astype(np.float32), offsets=offsets)
+
+
+@dataclass(slots=True)
+class _PreparedMask:
+    """XY 整列済みのマスク（姿勢、平面判定閾値、整数リング）。輪郭線は初回参照時に作る。"""
+
+    rotation_matrix: np.ndarray
+    z_offset: float
+    threshold: float
+    clip_paths: list[np.ndarray]
+    scale: int
+    _outline: RealizedGeometry | None = None
+
+    def outline(self) -> RealizedGeometry:
+        """マスクの輪郭線（draw_outline 用）を返す。"""
+        outline = self._outline
+        if outline is None:
+            outline = _int_paths_to_lines(
+                self.clip_paths, self.scale, self.rotation_matrix, self.z_offset, close=True
+            )
+            self._outline = outline
+        return outline
+
+
+# マスク前処理のキャッシュ（(id(マスク), scale) → (マスク, 前処理結果)、None は「クリップ不能」）。
+# マスク自身も保持するので、エントリが残っている間に id が別のインスタンスへ再利用されることはない。
+# 静的なマスクでアニメーションする被切り抜きをクリップする場合、毎フレームの前処理を省ける。
+_MASK_CACHE_SIZE = 32
+_mask_cache: OrderedDict[tuple[int, int], tuple[RealizedGeometry, _PreparedMask | None]] = (
+    OrderedDict()
+)
+_mask_cache_lock = threading.Lock()
+
+
+def _prepare_mask(mask: RealizedGeometry, scale: int) -> _PreparedMask | None:
+    rep = _pick_representative_ring(mask)
+    if rep is None:
         return None
-    if path[0] == path[-1]:
-        path = path[:-1]
-    return path if len(path) >= 2 else None
 
+    _rep_aligned, rotation_matrix, z_offset = transform_to_xy_plane(rep)
+    aligned_mask = _apply_alignment(mask.coords, rotation_matrix, z_offset)
+    threshold = _planarity_threshold(rep)
+    if float(np.max(np.abs(aligned_mask[:, 2]))) > threshold:
+        return None
 
-def _to_int_path_ring(xy: np.ndarray, scale: int) -> list[tuple[int, int]] | None:
-    if xy.shape[0] < 3:
+    clip_paths = _to_int_paths(aligned_mask[:, 0:2], mask.offsets, scale, min_points=3)
+    if not clip_paths:
         return None
-    scaled = np.rint(xy.astype(np.float64, copy=False) * float(scale)).astype(
-        np.int64, copy=False
+    return _PreparedMask(
+        rotation_matrix=rotation_matrix,
+        z_offset=float(z_offset),
+        threshold=float(threshold),
+        clip_paths=clip_paths,
+        scale=int(scale),
     )
-    path = [(int(p[0]), int(p[1])) for p in scaled]
-    path = _remove_consecutive_duplicates(path)
-    if len(path) < 3:
-        return None
-    if path[0] == path[-1]:
-        path = path[:-1]
-    return path if len(path) >= 3 else None
 
 
-def _lines_to_realized_geometry(lines: Sequence[np.ndarray]) -> RealizedGeometry:
-    if not lines:
-        return _empty_geometry()
+def _cached_prepared_mask(mask: RealizedGeometry, scale: int) -> _PreparedMask | None:
+    key = (id(mask), int(scale))
+    with _mask_cache_lock:
+        entry = _mask_cache.get(key)
+        if entry is not None and entry[0] is mask:
+            _mask_cache.move_to_end(key)
+            return entry[1]
 
-    coords_list: list[np.ndarray] = []
-    offsets = np.zeros((len(lines) + 1,), dtype=np.int32)
-    cursor = 0
-    for i, line in enumerate(lines):
-        v = np.asarray(line)
-        if v.ndim != 2 or v.shape[1] != 3:
-            raise ValueError("clip: polyline は shape (N,3) が必要")
-        coords_list.append(v.astype(np.float32, copy=False))
-        cursor += int(v.shape[0])
-        offsets[i + 1] = cursor
-
-    coords = (
-        np.concatenate(coords_list, axis=0)
-        if coords_list
-        else np.zeros((0, 3), np.float32)
-    )
-    return RealizedGeometry(coords=coords, offsets=offsets)
+    prepared = _prepare_mask(mask, scale)
+    with _mask_cache_lock:
+        _mask_cache[key] = (mask, prepared)
+        _mask_cache.move_to_end(key)
+        while len(_mask_cache) > _MASK_CACHE_SIZE:
+            _mask_cache.popitem(last=False)
+    return prepared
 
 
 def _pick_representative_ring(mask: RealizedGeometry) -> np.ndarray | None:
@@ -169,85 +251,42 @@ def clip(
     if mask.coords.shape[0] == 0:
         return base
 
-    rep = _pick_representative_ring(mask)
-    if rep is None:
-        return base
-
-    _rep_aligned, rotation_matrix, z_offset = transform_to_xy_plane(rep)
-
-    aligned_base = _apply_alignment(base.coords, rotation_matrix, z_offset)
-    aligned_mask = _apply_alignment(mask.coords, rotation_matrix, z_offset)
-
-    threshold = _planarity_threshold(rep)
-    if float(np.max(np.abs(aligned_mask[:, 2]))) > threshold:
-        return base
-    if float(np.max(np.abs(aligned_base[:, 2]))) > threshold:
-        return base
-
     mode_s = str(mode)
     if mode_s not in {"inside", "outside"}:
         return base
 
-    subject_paths: list[list[tuple[int, int]]] = []
-    for i in range(int(base.offsets.size) - 1):
-        s = int(base.offsets[i])
-        e = int(base.offsets[i + 1])
-        path = _to_int_path_open(aligned_base[s:e, 0:2], scale_i)
-        if path is not None:
-            subject_paths.append(path)
-
-    clip_paths: list[list[tuple[int, int]]] = []
-    for i in range(int(mask.offsets.size) - 1):
-        s = int(mask.offsets[i])
-        e = int(mask.offsets[i + 1])
-        path = _to_int_path_ring(aligned_mask[s:e, 0:2], scale_i)
-        if path is not None:
-            clip_paths.append(path)
+    prepared = _cached_prepared_mask(mask, scale_i)
+    if prepared is None:
+        return base
 
-    if not clip_paths:
+    aligned_base = _apply_alignment(base.coords, prepared.rotation_matrix, prepared.z_offset)
+    if float(np.max(np.abs(aligned_base[:, 2]))) > prepared.threshold:
         return base
-    outline_lines: list[np.ndarray] = []
-    if draw_outline_b:
-        for ring in clip_paths:
-            if len(ring) < 3:
-                continue
-            xy = np.asarray(ring + [ring[0]], dtype=np.float64) / float(scale_i)
-            v = np.zeros((xy.shape[0], 3), dtype=np.float64)
-            v[:, 0:2] = xy
-            restored = transform_back(v, rotation_matrix, float(z_offset))
-            outline_lines.append(restored)
 
+    subject_paths = _to_int_paths(aligned_base[:, 0:2], base.offsets, scale_i, min_points=2)
     if not subject_paths:
-        if outline_lines:
-            return _lines_to_realized_geometry(outline_lines)
+        if draw_outline_b:
+            return prepared.outline()
         return base
 
     pc = pyclipper.Pyclipper()  # type: ignore[attr-defined]
     pc.AddPaths(subject_paths, pyclipper.PT_SUBJECT, False)  # type: ignore[attr-defined]
-    pc.AddPaths(clip_paths, pyclipper.PT_CLIP, True)  # type: ignore[attr-defined]
+    pc.AddPaths(prepared.clip_paths, pyclipper.PT_CLIP, True)  # type: ignore[attr-defined]
 
     cliptype = (
         pyclipper.CT_INTERSECTION if mode_s == "inside" else pyclipper.CT_DIFFERENCE  # type: ignore[attr-defined]
     )
     polytree = pc.Execute2(cliptype, pyclipper.PFT_EVENODD, pyclipper.PFT_EVENODD)  # type: ignore[attr-defined]
-    out_paths = pyclipper.OpenPathsFromPolyTree(polytree)  # type: ignore[attr-defined]
+    out_paths = [p for p in pyclipper.OpenPathsFromPolyTree(polytree) if len(p) >= 2]  # type: ignore[attr-defined]
 
     if not out_paths:
-        if outline_lines:
-            return _lines_to_realized_geometry(outline_lines)
+        if draw_outline_b:
+            return prepared.outline()
         return _empty_geometry()
 
-    out_lines: list[np.ndarray] = []
-    for path in out_paths:
-        if len(path) < 2:  # type: ignore
-            continue
-        xy = np.asarray(path, dtype=np.float64) / float(scale_i)
-        v = np.zeros((xy.shape[0], 3), dtype=np.float64)
-        v[:, 0:2] = xy
-        restored = transform_back(v, rotation_matrix, float(z_offset))
-        out_lines.append(restored)
-
-    out_lines.extend(outline_lines)
-    if not out_lines:
-        return _empty_geometry()
-    return _lines_to_realized_geometry(out_lines)
+    clipped = _int_paths_to_lines(
+        out_paths, scale_i, prepared.rotation_matrix, prepared.z_offset, close=False
+    )
+    if draw_outline_b:
+        return concat_realized_geometries(clipped, prepared.outline())
+    return clipped
@@ -5,9 +5,10 @@ from __future__ import annotations
 from typing import Sequence
 
 import numpy as np
-from numba import njit  # type: ignore[import-untyped]
+from numba import njit, prange  # type: ignore[import-untyped]
 
 from grafix.core.effect_registry import effect
+from grafix.core.env import env_flag
 from grafix.core.realized_geometry import RealizedGeometry
 from grafix.core.parameters.meta import ParamMeta
 
@@ -18,6 +19,11 @@ dash_meta = {
     "offset_jitter": ParamMeta(kind="float", ui_min=0.0, ui_max=100.0),
 }
 
+# 環境変数で `prange` による線単位の並列カーネルを有効化する（既定は直列）。
+PARALLEL_ENV = "GRAFIX_DASH_PARALLEL"
+# 並列化する最小ポリライン本数（スレッド起動コストを下回る入力は直列のまま）。
+PARALLEL_MIN_LINES = 1_024
+
 
 def _empty_geometry() -> RealizedGeometry:
     coords = np.zeros((0, 3), dtype=np.float32)
@@ -82,6 +88,9 @@ def dash(
     - offset は「位相」として扱い、開始が部分ダッシュになり得る。
     - offset_jitter は決定的な RNG（seed=0）で生成し、再現性を優先する。
     - シーケンス指定はコードからの指定を想定する（parameter_gui の編集対象にはしない）。
+
+    環境変数 `GRAFIX_DASH_PARALLEL=1` でポリライン単位の並列カーネルを使う
+    （`PARALLEL_MIN_LINES` 本以上の入力のみ）。出力は直列版と一致する。
     """
     if not inputs:
         return _empty_geometry()
@@ -108,7 +117,6 @@ def dash(
         if not np.isfinite(pattern) or pattern <= 0.0:
             return base
 
-    # 線ごとの offset にランダム量を加える（決定的な RNG を使用、旧仕様）。
     offset_seq = _as_float_cycle(offset)
     jitter_scale = float(offset_jitter)
     if not np.isfinite(jitter_scale) or jitter_scale <= 0.0:
@@ -118,56 +126,52 @@ def dash(
     if n_lines <= 0:
         return base
 
-    line_offset_arr = np.empty(n_lines, dtype=np.float64)
-    rng = np.random.default_rng(0) if jitter_scale > 0.0 else None
-    for li in range(n_lines):
-        base_off = float(offset_seq[li % len(offset_seq)])
-        if not np.isfinite(base_off) or base_off < 0.0:
-            base_off = 0.0
-        if rng is not None:
-            base_off += float(rng.uniform(-jitter_scale, jitter_scale))
-            if base_off < 0.0:
-                base_off = 0.0
-        line_offset_arr[li] = base_off
-
-    # ---- 2 パス実装（count → fill） ---------------------------------------
-    total_out_vertices = 0
-    total_out_lines = 0
-    for li in range(n_lines):
-        v = coords[offsets[li] : offsets[li + 1]]
-        tv, tl = _count_line(
-            v.astype(np.float32, copy=False),
-            dash_arr,
-            gap_arr,
-            float(line_offset_arr[li]),
-        )
-        total_out_vertices += int(tv)
-        total_out_lines += int(tl)
-
+    # 線ごとの offset にランダム量を加える（決定的な RNG を使用、旧仕様）。
+    # 一括生成でも線ごとに `rng.uniform` を呼んでいた旧実装と同じ乱数列になる。
+    offset_arr = np.asarray(offset_seq, dtype=np.float64)
+    line_offset_arr = offset_arr[np.arange(n_lines) % offset_arr.size]
+    line_offset_arr[~np.isfinite(line_offset_arr) | (line_offset_arr < 0.0)] = 0.0
+    if jitter_scale > 0.0:
+        rng = np.random.default_rng(0)
+        line_offset_arr += rng.uniform(-jitter_scale, jitter_scale, size=n_lines)
+        np.maximum(line_offset_arr, 0.0, out=line_offset_arr)
+
+    # ---- 2 パス実装（count → fill、全ポリラインを 1 カーネルで処理） ----------
+    src = np.ascontiguousarray(coords, dtype=np.float32)
+    src_offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    use_parallel = env_flag(PARALLEL_ENV) and n_lines >= PARALLEL_MIN_LINES
+
+    vertex_counts = np.empty(n_lines, dtype=np.int64)
+    line_counts = np.empty(n_lines, dtype=np.int64)
+    count = _count_lines_parallel if use_parallel else _count_lines
+    count(src, src_offsets, dash_arr, gap_arr, line_offset_arr, vertex_counts, line_counts)
+
+    total_out_lines = int(line_counts.sum())
     if total_out_lines == 0:
         return base
 
-    out_coords = np.empty((total_out_vertices, 3), dtype=np.float32)
+    # 各入力線の書き込み先（出力頂点・出力 offset）の先頭位置。
+    vertex_starts = np.zeros(n_lines + 1, dtype=np.int64)
+    np.cumsum(vertex_counts, out=vertex_starts[1:])
+    line_starts = np.zeros(n_lines + 1, dtype=np.int64)
+    np.cumsum(line_counts, out=line_starts[1:])
+
+    out_coords = np.empty((int(vertex_starts[-1]), 3), dtype=np.float32)
     out_offsets = np.empty((total_out_lines + 1,), dtype=np.int32)
     out_offsets[0] = 0
 
-    vc = 0
-    oc = 1
-    for li in range(n_lines):
-        v = coords[offsets[li] : offsets[li + 1]]
-        vc, oc = _fill_line(
-            v.astype(np.float32, copy=False),
-            dash_arr,
-            gap_arr,
-            float(line_offset_arr[li]),
-            out_coords,
-            out_offsets,
-            int(vc),
-            int(oc),
-        )
-
-    if oc < out_offsets.shape[0]:
-        out_offsets[oc:] = vc
+    fill = _fill_lines_parallel if use_parallel else _fill_lines
+    fill(
+        src,
+        src_offsets,
+        dash_arr,
+        gap_arr,
+        line_offset_arr,
+        vertex_starts,
+        line_starts,
+        out_coords,
+        out_offsets,
+    )
     return RealizedGeometry(coords=out_coords, offsets=out_offsets)
 
 
@@ -409,4 +413,83 @@ def _fill_line(
     return vc, oc
 
 
+# ── 全ポリライン一括カーネル（count → fill）───────────────────────────────
+# 各入力線の出力位置は count 結果の累積和で決まるため、線ごとに独立に書き込める。
+# 並列版の結果は直列版と一致する。
+
+
+@njit(cache=True, fastmath=True)  # type: ignore[misc]
+def _count_lines(
+    coords, offsets, dash_lengths, gap_lengths, line_offsets, vertex_counts, line_counts
+):
+    for li in range(offsets.shape[0] - 1):
+        v = coords[offsets[li] : offsets[li + 1]]
+        vertex_counts[li], line_counts[li] = _count_line(
+            v, dash_lengths, gap_lengths, line_offsets[li]
+        )
+
+
+@njit(cache=True, fastmath=True, parallel=True)  # type: ignore[misc]
+def _count_lines_parallel(
+    coords, offsets, dash_lengths, gap_lengths, line_offsets, vertex_counts, line_counts
+):
+    for li in prange(offsets.shape[0] - 1):
+        v = coords[offsets[li] : offsets[li + 1]]
+        vertex_counts[li], line_counts[li] = _count_line(
+            v, dash_lengths, gap_lengths, line_offsets[li]
+        )
+
+
+@njit(cache=True, fastmath=True)  # type: ignore[misc]
+def _fill_lines(
+    coords,
+    offsets,
+    dash_lengths,
+    gap_lengths,
+    line_offsets,
+    vertex_starts,
+    line_starts,
+    out_c,
+    out_o,
+):
+    for li in range(offsets.shape[0] - 1):
+        v = coords[offsets[li] : offsets[li + 1]]
+        _fill_line(
+            v,
+            dash_lengths,
+            gap_lengths,
+            line_offsets[li],
+            out_c,
+            out_o,
+            vertex_starts[li],
+            line_starts[li] + 1,
+        )
+
+
+@njit(cache=True, fastmath=True, parallel=True)  # type: ignore[misc]
+def _fill_lines_parallel(
+    coords,
+    offsets,
+    dash_lengths,
+    gap_lengths,
+    line_offsets,
+    vertex_starts,
+    line_starts,
+    out_c,
+    out_o,
+):
+    for li in prange(offsets.shape[0] - 1):
+        v = coords[offsets[li] : offsets[li + 1]]
+        _fill_line(
+            v,
+            dash_lengths,
+            gap_lengths,
+            line_offsets[li],
+            out_c,
+            out_o,
+            vertex_starts[li],
+            line_starts[li] + 1,
+        )
+
+
 __all__ = ["dash"]
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Sequence
 
 import numpy as np
-from numba import njit  # type: ignore[import-untyped]
+from numba import literally, njit, prange  # type: ignore[import-untyped]
 
 from grafix.core.effect_registry import effect
+from grafix.core.env import env_flag
 from grafix.core.parameters.meta import ParamMeta
 from grafix.core.realized_geometry import RealizedGeometry
 
@@ -19,6 +24,7 @@ displace_meta = {
     "min_gradient_factor": ParamMeta(kind="float", ui_min=0.0, ui_max=0.5),
     "max_gradient_factor": ParamMeta(kind="float", ui_min=1.0, ui_max=4.0),
     "t": ParamMeta(kind="float", ui_min=0.0, ui_max=1.0),
+    "lattice_resolution": ParamMeta(kind="int", ui_min=0, ui_max=16),
 }
 
 # ノイズ位相進行の係数（freq と独立）。
@@ -33,6 +39,15 @@ MIN_GRADIENT_FACTOR_DEFAULT: float = 0.1
 GX = 40
 FGX = 40
 
+# カーネルのバリアント切り替え（環境変数）。
+# - `GRAFIX_DISPLACE_PARALLEL=1`: 頂点範囲をスレッド分割して評価する。
+# - `GRAFIX_DISPLACE_PRECISION=float32`: ノイズ座標を float32 で評価する（既定 float64）。
+PARALLEL_ENV = "GRAFIX_DISPLACE_PARALLEL"
+PRECISION_ENV = "GRAFIX_DISPLACE_PRECISION"
+
+# これ未満の頂点数ではスレッド起動コストが勝つため、parallel 指定でも直列で評価する。
+PARALLEL_MIN_VERTICES = 16_384
+
 
 def _empty_geometry() -> RealizedGeometry:
     coords = np.zeros((0, 3), dtype=np.float32)
@@ -381,306 +396,601 @@ def perlin_noise_3d(x, y, z, perm_table, grad3_array):
 
 
 @njit(fastmath=True, cache=True)
-def perlin_core(
-    vertices: np.ndarray,
-    frequency: tuple,
-    phase: tuple,
-    perm_table: np.ndarray,
-    grad3_array: np.ndarray,
-):
-    """コア Perlin ノイズ計算（3 次元頂点専用）。
+def fade_f32(t):
+    """Perlin ノイズ用のフェード関数（float32 定数版）。"""
+    return t * t * t * (t * (t * np.float32(6.0) - np.float32(15.0)) + np.float32(10.0))
+
+
+@njit(fastmath=True, cache=True)
+def perlin_noise_3d_f32(x, y, z, perm_table, grad3_array):
+    """3 次元 Perlin ノイズ生成（float32 評価版）。
 
-    入力空間変換は noise(pos * freq + phase)。phase は freq に非依存。
+    `perlin_noise_3d` と同じ格子・勾配を使い、中間値を float32 に保つ。
     """
-    n = vertices.shape[0]
-    if n == 0:
-        return np.zeros((0, 3), dtype=np.float32)
+    one = np.float32(1.0)
+    x0 = np.floor(x)
+    y0 = np.floor(y)
+    z0 = np.floor(z)
+    X = int(x0) & 255
+    Y = int(y0) & 255
+    Z = int(z0) & 255
+
+    x = np.float32(x - x0)
+    y = np.float32(y - y0)
+    z = np.float32(z - z0)
+
+    u = fade_f32(x)
+    v = fade_f32(y)
+    w = fade_f32(z)
 
-    result = np.zeros((n, 3), dtype=np.float32)
-    for i in range(n):
-        x = vertices[i, 0] * frequency[0] + phase[0]
-        y = vertices[i, 1] * frequency[1] + phase[1]
-        z = vertices[i, 2] * frequency[2] + phase[2]
+    A = perm_table[X] + Y
+    AA = perm_table[A & 511] + Z
+    AB = perm_table[(A + 1) & 511] + Z
+    B = perm_table[(X + 1) & 255] + Y
+    BA = perm_table[B & 511] + Z
+    BB = perm_table[(B + 1) & 511] + Z
 
-        nx = perlin_noise_3d(x, y, z, perm_table, grad3_array)
-        ny = perlin_noise_3d(x + 100.0, y + 100.0, z + 100.0, perm_table, grad3_array)
-        nz = perlin_noise_3d(x + 200.0, y + 200.0, z + 200.0, perm_table, grad3_array)
-        result[i, 0] = np.float32(nx)
-        result[i, 1] = np.float32(ny)
-        result[i, 2] = np.float32(nz)
+    gAA = grad(perm_table[AA & 511], x, y, z, grad3_array)
+    gBA = grad(perm_table[BA & 511], x - one, y, z, grad3_array)
+    gAB = grad(perm_table[AB & 511], x, y - one, z, grad3_array)
+    gBB = grad(perm_table[BB & 511], x - one, y - one, z, grad3_array)
+    gAA1 = grad(perm_table[(AA + 1) & 511], x, y, z - one, grad3_array)
+    gBA1 = grad(perm_table[(BA + 1) & 511], x - one, y, z - one, grad3_array)
+    gAB1 = grad(perm_table[(AB + 1) & 511], x, y - one, z - one, grad3_array)
+    gBB1 = grad(perm_table[(BB + 1) & 511], x - one, y - one, z - one, grad3_array)
 
-    return result
+    return lerp(
+        lerp(lerp(gAA, gBA, u), lerp(gAB, gBB, u), v),
+        lerp(lerp(gAA1, gBA1, u), lerp(gAB1, gBB1, u), v),
+        w,
+    )
 
 
 @njit(fastmath=True, cache=True)
-def _apply_noise_to_coords(
+def _gradient_factor(t, g, eps, maxf):
+    """正規化座標 t（0..1）に対する勾配係数を返す。"""
+    raw = 1.0 + g * (t - 0.5)
+    if raw < 0.0:
+        raw = 0.0
+    f = eps + (1.0 - eps) * raw
+    if f > maxf:
+        f = maxf
+    return f
+
+
+@njit(fastmath=True, cache=True)
+def _normalized(v, vmin, vrange):
+    if vrange > 1e-9:
+        return (v - vmin) / vrange
+    return 0.5
+
+
+# カーネルへ渡す (7, 3) パラメータ配列の行。
+_ROW_AMPLITUDE = 0
+_ROW_AMPLITUDE_GRAD = 1
+_ROW_FREQUENCY = 2
+_ROW_FREQUENCY_GRAD = 3
+_ROW_BBOX_MIN = 4
+_ROW_BBOX_RANGE = 5
+_ROW_SCALARS = 6  # (phase, min_factor, max_factor)
+
+
+@njit(fastmath=True, cache=True)
+def _vertex_scales(x, y, z, vecs, has_amp_grad, has_freq_grad):
+    """1 頂点ぶんの実効振幅と実効周波数を返す。"""
+    ax = vecs[_ROW_AMPLITUDE, 0]
+    ay = vecs[_ROW_AMPLITUDE, 1]
+    az = vecs[_ROW_AMPLITUDE, 2]
+    fx = vecs[_ROW_FREQUENCY, 0]
+    fy = vecs[_ROW_FREQUENCY, 1]
+    fz = vecs[_ROW_FREQUENCY, 2]
+    if not has_amp_grad and not has_freq_grad:
+        return ax, ay, az, fx, fy, fz
+
+    min_factor = vecs[_ROW_SCALARS, 1]
+    max_factor = vecs[_ROW_SCALARS, 2]
+    tx = _normalized(x, vecs[_ROW_BBOX_MIN, 0], vecs[_ROW_BBOX_RANGE, 0])
+    ty = _normalized(y, vecs[_ROW_BBOX_MIN, 1], vecs[_ROW_BBOX_RANGE, 1])
+    tz = _normalized(z, vecs[_ROW_BBOX_MIN, 2], vecs[_ROW_BBOX_RANGE, 2])
+    if has_amp_grad:
+        ax *= _gradient_factor(tx, vecs[_ROW_AMPLITUDE_GRAD, 0], min_factor, max_factor)
+        ay *= _gradient_factor(ty, vecs[_ROW_AMPLITUDE_GRAD, 1], min_factor, max_factor)
+        az *= _gradient_factor(tz, vecs[_ROW_AMPLITUDE_GRAD, 2], min_factor, max_factor)
+    if has_freq_grad:
+        fx *= _gradient_factor(tx, vecs[_ROW_FREQUENCY_GRAD, 0], min_factor, max_factor)
+        fy *= _gradient_factor(ty, vecs[_ROW_FREQUENCY_GRAD, 1], min_factor, max_factor)
+        fz *= _gradient_factor(tz, vecs[_ROW_FREQUENCY_GRAD, 2], min_factor, max_factor)
+    return ax, ay, az, fx, fy, fz
+
+
+@njit(fastmath=True, cache=True)
+def _displace_vertex(
     coords: np.ndarray,
-    amplitude: tuple,
-    amplitude_grad: tuple,
-    frequency: tuple,
-    frequency_grad: tuple,
-    time: float,
-    min_factor: float,
-    max_factor: float,
+    out: np.ndarray,
+    i: int,
+    vecs: np.ndarray,
+    has_amp_grad: bool,
+    has_freq_grad: bool,
     perm_table: np.ndarray,
     grad3_array: np.ndarray,
-) -> np.ndarray:
-    """座標配列に Perlin ノイズを適用する。"""
-    if coords.size == 0:
-        return coords.copy()
+) -> None:
+    """頂点 i を変位して out[i] へ書き込む（float64 でノイズ評価）。"""
+    x = coords[i, 0]
+    y = coords[i, 1]
+    z = coords[i, 2]
+    ax, ay, az, fx, fy, fz = _vertex_scales(x, y, z, vecs, has_amp_grad, has_freq_grad)
+    phase = vecs[_ROW_SCALARS, 0]
 
-    ax = np.float32(amplitude[0])
-    ay = np.float32(amplitude[1])
-    az = np.float32(amplitude[2])
+    px = np.float64(x) * fx + phase
+    py = np.float64(y) * fy + phase
+    pz = np.float64(z) * fz + phase
 
-    if ax == 0.0 and ay == 0.0 and az == 0.0:
-        return coords.copy()
+    nx = perlin_noise_3d(px, py, pz, perm_table, grad3_array)
+    ny = perlin_noise_3d(px + 100.0, py + 100.0, pz + 100.0, perm_table, grad3_array)
+    nz = perlin_noise_3d(px + 200.0, py + 200.0, pz + 200.0, perm_table, grad3_array)
 
-    gx = np.float32(amplitude_grad[0])
-    gy = np.float32(amplitude_grad[1])
-    gz = np.float32(amplitude_grad[2])
+    out[i, 0] = x + np.float32(nx) * np.float32(ax)
+    out[i, 1] = y + np.float32(ny) * np.float32(ay)
+    out[i, 2] = z + np.float32(nz) * np.float32(az)
 
-    fgx = np.float32(frequency_grad[0])
-    fgy = np.float32(frequency_grad[1])
-    fgz = np.float32(frequency_grad[2])
 
-    has_amp_grad = not (abs(gx) < 1e-6 and abs(gy) < 1e-6 and abs(gz) < 1e-6)
-    has_freq_grad = not (abs(fgx) < 1e-6 and abs(fgy) < 1e-6 and abs(fgz) < 1e-6)
+@njit(fastmath=True, cache=True)
+def _displace_vertex_f32(
+    coords: np.ndarray,
+    out: np.ndarray,
+    i: int,
+    vecs: np.ndarray,
+    has_amp_grad: bool,
+    has_freq_grad: bool,
+    perm_table: np.ndarray,
+    grad3_array: np.ndarray,
+) -> None:
+    """頂点 i を変位して out[i] へ書き込む（float32 でノイズ評価）。"""
+    x = coords[i, 0]
+    y = coords[i, 1]
+    z = coords[i, 2]
+    ax, ay, az, fx, fy, fz = _vertex_scales(x, y, z, vecs, has_amp_grad, has_freq_grad)
 
-    fx_base = np.float32(frequency[0])
-    fy_base = np.float32(frequency[1])
-    fz_base = np.float32(frequency[2])
+    p0 = np.float32(vecs[_ROW_SCALARS, 0])
+    px = x * np.float32(fx) + p0
+    py = y * np.float32(fy) + p0
+    pz = z * np.float32(fz) + p0
+    o1 = np.float32(100.0)
+    o2 = np.float32(200.0)
 
-    phase0 = np.float32(time * PHASE_SPEED + PHASE_SEED)
-    phase_tuple = (phase0, phase0, phase0)
+    nx = perlin_noise_3d_f32(px, py, pz, perm_table, grad3_array)
+    ny = perlin_noise_3d_f32(px + o1, py + o1, pz + o1, perm_table, grad3_array)
+    nz = perlin_noise_3d_f32(px + o2, py + o2, pz + o2, perm_table, grad3_array)
+
+    out[i, 0] = x + nx * np.float32(ax)
+    out[i, 1] = y + ny * np.float32(ay)
+    out[i, 2] = z + nz * np.float32(az)
+
+
+# 頂点ループ本体。直列/並列（prange）× float64/float32 の 4 バリアントを持つ。
+# 各頂点は独立なので、並列版の結果は直列版と一致する。
+# 勾配フラグは `literally` で定数として特殊化する（組み合わせごとに別コンパイル）。
+# 実行時 bool のまま頂点関数へ渡すと LLVM の最適化が効かず、同じ計算で 2〜3 倍遅くなる。
 
-    if not has_amp_grad and not has_freq_grad:
-        noise_offset = perlin_core(
-            coords, frequency, phase_tuple, perm_table, grad3_array
-        )
 
-        n = coords.shape[0]
-        result = np.empty_like(coords, dtype=np.float32)
-        for i in range(n):
-            result[i, 0] = coords[i, 0] + noise_offset[i, 0] * ax
-            result[i, 1] = coords[i, 1] + noise_offset[i, 1] * ay
-            result[i, 2] = coords[i, 2] + noise_offset[i, 2] * az
-
-        return result
-
-    if not has_freq_grad:
-        if gx > FGX:
-            gx = np.float32(FGX)
-        elif gx < -FGX:
-            gx = np.float32(-FGX)
-        if gy > FGX:
-            gy = np.float32(FGX)
-        elif gy < -FGX:
-            gy = np.float32(-FGX)
-        if gz > FGX:
-            gz = np.float32(FGX)
-        elif gz < -FGX:
-            gz = np.float32(-FGX)
-
-        noise_offset = perlin_core(
-            coords, frequency, phase_tuple, perm_table, grad3_array
+@njit(fastmath=True, cache=True)
+def _displace_kernel(coords, out, vecs, has_amp_grad, has_freq_grad, perm, grad3):
+    literally(has_amp_grad)
+    literally(has_freq_grad)
+    for i in range(coords.shape[0]):
+        _displace_vertex(coords, out, i, vecs, has_amp_grad, has_freq_grad, perm, grad3)
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _displace_kernel_parallel(coords, out, vecs, has_amp_grad, has_freq_grad, perm, grad3):
+    literally(has_amp_grad)
+    literally(has_freq_grad)
+    for i in prange(coords.shape[0]):
+        _displace_vertex(coords, out, i, vecs, has_amp_grad, has_freq_grad, perm, grad3)
+
+
+@njit(fastmath=True, cache=True)
+def _displace_kernel_f32(coords, out, vecs, has_amp_grad, has_freq_grad, perm, grad3):
+    literally(has_amp_grad)
+    literally(has_freq_grad)
+    for i in range(coords.shape[0]):
+        _displace_vertex_f32(coords, out, i, vecs, has_amp_grad, has_freq_grad, perm, grad3)
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _displace_kernel_f32_parallel(coords, out, vecs, has_amp_grad, has_freq_grad, perm, grad3):
+    literally(has_amp_grad)
+    literally(has_freq_grad)
+    for i in prange(coords.shape[0]):
+        _displace_vertex_f32(coords, out, i, vecs, has_amp_grad, has_freq_grad, perm, grad3)
+
+
+# --- 格子キャッシュ（lattice_resolution > 0） ---
+#
+# ノイズ空間（pos * freq + phase）に等間隔格子 h = 1 / lattice_resolution を張り、
+# 3 チャンネル（x/y/z 用の +0/+100/+200 オフセット）のノイズ値を一度だけ標本化する。
+# 各フレームは格子からの三線形補間だけで変位を求める。
+#
+# 誤差上界: 三線形補間の誤差は辺長 h のセル上で
+#     |n - I n| <= (h^2 / 8) * (sup|n_xx| + sup|n_yy| + sup|n_zz|)
+# で抑えられる。本実装の Perlin ノイズは sup|n_ii| <= 12（数値計測で約 11.5）なので
+#     |n - I n| <= 4.5 / lattice_resolution^2   （ノイズ値は概ね [-1, 1]）
+# となり、変位誤差は軸ごとに amplitude * 4.5 / lattice_resolution^2 以下
+# （例: resolution=8 で振幅の約 7%、実測の最大誤差は約 4.5%）。
+#
+# 位相は t とともに (1, 1, 1) 方向へ進むため、格子は正方向へ
+# `LATTICE_PHASE_MARGIN` だけ余分に張る。範囲を外れたら張り直す。
+
+# 格子を正方向へ延ばすノイズ空間の余白（t 換算で LATTICE_PHASE_MARGIN / PHASE_SPEED）。
+LATTICE_PHASE_MARGIN: float = 2.0
+
+# 格子点数の上限。これを超える、または頂点数を超える場合は厳密評価に戻す。
+LATTICE_MAX_POINTS: int = 4_000_000
+
+# 保持する格子の数（複数の displace が異なる領域を使う場合向け）。
+LATTICE_CACHE_SIZE: int = 4
+
+
+@dataclass(frozen=True, slots=True)
+class _NoiseLattice:
+    """ノイズ空間の標本格子。
+
+    values[i, j, k, c] は点 origin + (i, j, k) * h におけるチャンネル c のノイズ値。
+    """
+
+    resolution: int
+    origin_index: tuple[int, int, int]
+    values: np.ndarray
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return (
+            int(self.values.shape[0]),
+            int(self.values.shape[1]),
+            int(self.values.shape[2]),
         )
 
-        min_x = np.float32(np.min(coords[:, 0]))
-        max_x = np.float32(np.max(coords[:, 0]))
-        min_y = np.float32(np.min(coords[:, 1]))
-        max_y = np.float32(np.max(coords[:, 1]))
-        min_z = np.float32(np.min(coords[:, 2]))
-        max_z = np.float32(np.max(coords[:, 2]))
-
-        range_x = max_x - min_x
-        range_y = max_y - min_y
-        range_z = max_z - min_z
-
-        maxf = np.float32(max_factor)
-        eps = np.float32(min_factor)
-        one_minus_eps = np.float32(1.0) - eps
-        n = coords.shape[0]
-        result = np.empty_like(coords, dtype=np.float32)
-        for i in range(n):
-            x = coords[i, 0]
-            y = coords[i, 1]
-            z = coords[i, 2]
-
-            if range_x > 1e-9:
-                tx = (x - min_x) / range_x
-            else:
-                tx = 0.5
-            if range_y > 1e-9:
-                ty = (y - min_y) / range_y
-            else:
-                ty = 0.5
-            if range_z > 1e-9:
-                tz = (z - min_z) / range_z
-            else:
-                tz = 0.5
-
-            fx_raw = 1.0 + gx * (tx - 0.5)
-            fy_raw = 1.0 + gy * (ty - 0.5)
-            fz_raw = 1.0 + gz * (tz - 0.5)
-
-            if fx_raw < 0.0:
-                fx_raw = 0.0
-            if fy_raw < 0.0:
-                fy_raw = 0.0
-            if fz_raw < 0.0:
-                fz_raw = 0.0
-
-            fx = eps + one_minus_eps * fx_raw
-            fy = eps + one_minus_eps * fy_raw
-            fz = eps + one_minus_eps * fz_raw
-
-            if fx > maxf:
-                fx = maxf
-            if fy > maxf:
-                fy = maxf
-            if fz > maxf:
-                fz = maxf
-
-            ax_i = ax * fx
-            ay_i = ay * fy
-            az_i = az * fz
-
-            result[i, 0] = x + noise_offset[i, 0] * ax_i
-            result[i, 1] = y + noise_offset[i, 1] * ay_i
-            result[i, 2] = z + noise_offset[i, 2] * az_i
-
-        return result
+    def covers(self, lo_index: tuple[int, ...], hi_index: tuple[int, ...]) -> bool:
+        for a in range(3):
+            if lo_index[a] < self.origin_index[a]:
+                return False
+            if hi_index[a] > self.origin_index[a] + self.values.shape[a] - 1:
+                return False
+        return True
+
+
+_LatticeKey = tuple[int, tuple[int, int, int], tuple[int, int, int]]
+
+_lattice_lock = threading.Lock()
+_lattice_cache: OrderedDict[_LatticeKey, _NoiseLattice] = OrderedDict()
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _sample_noise_lattice(origin, h, nx, ny, nz, perm_table, grad3_array):
+    """格子点でノイズを標本化して (nx, ny, nz, 3) float32 配列を返す。"""
+    out = np.empty((nx, ny, nz, 3), dtype=np.float32)
+    for i in prange(nx):
+        px = origin[0] + i * h
+        for j in range(ny):
+            py = origin[1] + j * h
+            for k in range(nz):
+                pz = origin[2] + k * h
+                out[i, j, k, 0] = perlin_noise_3d(px, py, pz, perm_table, grad3_array)
+                out[i, j, k, 1] = perlin_noise_3d(
+                    px + 100.0, py + 100.0, pz + 100.0, perm_table, grad3_array
+                )
+                out[i, j, k, 2] = perlin_noise_3d(
+                    px + 200.0, py + 200.0, pz + 200.0, perm_table, grad3_array
+                )
+    return out
+
+
+@njit(cache=True)
+def _coords_bounds(coords):
+    """coords の軸別 min/max を 1 パスで返す。"""
+    lo = np.empty(3, dtype=np.float64)
+    hi = np.empty(3, dtype=np.float64)
+    for a in range(3):
+        lo[a] = coords[0, a]
+        hi[a] = coords[0, a]
+    for i in range(1, coords.shape[0]):
+        for a in range(3):
+            v = coords[i, a]
+            if v < lo[a]:
+                lo[a] = v
+            elif v > hi[a]:
+                hi[a] = v
+    return lo, hi
 
-    if has_amp_grad:
-        if gx > GX:
-            gx = np.float32(GX)
-        elif gx < -GX:
-            gx = np.float32(-GX)
-        if gy > GX:
-            gy = np.float32(GX)
-        elif gy < -GX:
-            gy = np.float32(-GX)
-        if gz > GX:
-            gz = np.float32(GX)
-        elif gz < -GX:
-            gz = np.float32(-GX)
-
-    if fgx > FGX:
-        fgx = np.float32(FGX)
-    elif fgx < -FGX:
-        fgx = np.float32(-FGX)
-    if fgy > FGX:
-        fgy = np.float32(FGX)
-    elif fgy < -FGX:
-        fgy = np.float32(-FGX)
-    if fgz > FGX:
-        fgz = np.float32(FGX)
-    elif fgz < -FGX:
-        fgz = np.float32(-FGX)
-
-    min_x = np.float32(np.min(coords[:, 0]))
-    max_x = np.float32(np.max(coords[:, 0]))
-    min_y = np.float32(np.min(coords[:, 1]))
-    max_y = np.float32(np.max(coords[:, 1]))
-    min_z = np.float32(np.min(coords[:, 2]))
-    max_z = np.float32(np.max(coords[:, 2]))
-
-    range_x = max_x - min_x
-    range_y = max_y - min_y
-    range_z = max_z - min_z
-
-    eps = np.float32(min_factor)
-    one_minus_eps = np.float32(1.0) - eps
-    maxf = np.float32(max_factor)
-
-    offset1 = np.float32(100.0)
-    offset2 = np.float32(200.0)
-    n = coords.shape[0]
-    result = np.empty_like(coords, dtype=np.float32)
-    for i in range(n):
+
+@njit(fastmath=True, cache=True)
+def _noise_space_bounds(coords, vecs, has_amp_grad, has_freq_grad):
+    """全頂点の pos * freq（phase 抜き）の軸別 min/max を返す（周波数勾配あり用）。"""
+    literally(has_amp_grad)
+    literally(has_freq_grad)
+    lo = np.full(3, 1e300)
+    hi = np.full(3, -1e300)
+    for i in range(coords.shape[0]):
         x = coords[i, 0]
         y = coords[i, 1]
         z = coords[i, 2]
+        _ax, _ay, _az, fx, fy, fz = _vertex_scales(x, y, z, vecs, has_amp_grad, has_freq_grad)
+        qx = np.float64(x) * fx
+        qy = np.float64(y) * fy
+        qz = np.float64(z) * fz
+        lo[0] = min(lo[0], qx)
+        lo[1] = min(lo[1], qy)
+        lo[2] = min(lo[2], qz)
+        hi[0] = max(hi[0], qx)
+        hi[1] = max(hi[1], qy)
+        hi[2] = max(hi[2], qz)
+    return lo, hi
 
-        if range_x > 1e-9:
-            tx = (x - min_x) / range_x
-        else:
-            tx = 0.5
-        if range_y > 1e-9:
-            ty = (y - min_y) / range_y
-        else:
-            ty = 0.5
-        if range_z > 1e-9:
-            tz = (z - min_z) / range_z
-        else:
-            tz = 0.5
-
-        amp_fx = np.float32(1.0)
-        amp_fy = np.float32(1.0)
-        amp_fz = np.float32(1.0)
-        if has_amp_grad:
-            fx_raw = 1.0 + gx * (tx - 0.5)
-            fy_raw = 1.0 + gy * (ty - 0.5)
-            fz_raw = 1.0 + gz * (tz - 0.5)
-
-            if fx_raw < 0.0:
-                fx_raw = 0.0
-            if fy_raw < 0.0:
-                fy_raw = 0.0
-            if fz_raw < 0.0:
-                fz_raw = 0.0
-
-            amp_fx = eps + one_minus_eps * fx_raw
-            amp_fy = eps + one_minus_eps * fy_raw
-            amp_fz = eps + one_minus_eps * fz_raw
-
-            if amp_fx > maxf:
-                amp_fx = maxf
-            if amp_fy > maxf:
-                amp_fy = maxf
-            if amp_fz > maxf:
-                amp_fz = maxf
-
-        freq_fx_raw = 1.0 + fgx * (tx - 0.5)
-        freq_fy_raw = 1.0 + fgy * (ty - 0.5)
-        freq_fz_raw = 1.0 + fgz * (tz - 0.5)
-
-        if freq_fx_raw < 0.0:
-            freq_fx_raw = 0.0
-        if freq_fy_raw < 0.0:
-            freq_fy_raw = 0.0
-        if freq_fz_raw < 0.0:
-            freq_fz_raw = 0.0
-
-        freq_fx = eps + one_minus_eps * freq_fx_raw
-        freq_fy = eps + one_minus_eps * freq_fy_raw
-        freq_fz = eps + one_minus_eps * freq_fz_raw
-
-        if freq_fx > maxf:
-            freq_fx = maxf
-        if freq_fy > maxf:
-            freq_fy = maxf
-        if freq_fz > maxf:
-            freq_fz = maxf
-
-        px = x * (fx_base * freq_fx) + phase0
-        py = y * (fy_base * freq_fy) + phase0
-        pz = z * (fz_base * freq_fz) + phase0
-
-        nx = perlin_noise_3d(px, py, pz, perm_table, grad3_array)
-        ny = perlin_noise_3d(
-            px + offset1, py + offset1, pz + offset1, perm_table, grad3_array
+
+@njit(fastmath=True, cache=True)
+def _cell(p, origin, inv_h, n):
+    """ノイズ空間座標 p を (セル index, セル内座標) に変換する。"""
+    s = (p - origin) * inv_h
+    i = int(np.floor(s))
+    if i < 0:
+        i = 0
+    elif i > n - 2:
+        i = n - 2
+    return i, np.float32(s - i)
+
+
+@njit(fastmath=True, cache=True)
+def _displace_vertex_lattice(
+    coords: np.ndarray,
+    out: np.ndarray,
+    i: int,
+    vecs: np.ndarray,
+    has_amp_grad: bool,
+    has_freq_grad: bool,
+    flat: np.ndarray,
+    shape: tuple,
+    origin: np.ndarray,
+    inv_h: float,
+) -> None:
+    """頂点 i を格子補間で変位して out[i] へ書き込む。
+
+    flat は (nx, ny, nz, 3) 格子を 1 次元に並べたもの。
+    """
+    x = coords[i, 0]
+    y = coords[i, 1]
+    z = coords[i, 2]
+    ax, ay, az, fx, fy, fz = _vertex_scales(x, y, z, vecs, has_amp_grad, has_freq_grad)
+    phase = vecs[_ROW_SCALARS, 0]
+
+    ci, u = _cell(np.float64(x) * fx + phase, origin[0], inv_h, shape[0])
+    cj, v = _cell(np.float64(y) * fy + phase, origin[1], inv_h, shape[1])
+    ck, w = _cell(np.float64(z) * fz + phase, origin[2], inv_h, shape[2])
+
+    sk = 3
+    sj = shape[2] * sk
+    si = shape[1] * sj
+    b = ci * si + cj * sj + ck * sk
+
+    one = np.float32(1.0)
+    u0 = one - u
+    v0 = one - v
+    w0 = one - w
+    w000 = u0 * v0 * w0
+    w100 = u * v0 * w0
+    w010 = u0 * v * w0
+    w110 = u * v * w0
+    w001 = u0 * v0 * w
+    w101 = u * v0 * w
+    w011 = u0 * v * w
+    w111 = u * v * w
+
+    # 8 隅の重み付き和（チャンネルごと）。ループにせず展開した方が大幅に速い。
+    n0 = (
+        w000 * flat[b] + w100 * flat[b + si] + w010 * flat[b + sj] + w110 * flat[b + si + sj]
+        + w001 * flat[b + sk] + w101 * flat[b + si + sk] + w011 * flat[b + sj + sk]
+        + w111 * flat[b + si + sj + sk]
+    )  # fmt: skip
+    b += 1
+    n1 = (
+        w000 * flat[b] + w100 * flat[b + si] + w010 * flat[b + sj] + w110 * flat[b + si + sj]
+        + w001 * flat[b + sk] + w101 * flat[b + si + sk] + w011 * flat[b + sj + sk]
+        + w111 * flat[b + si + sj + sk]
+    )  # fmt: skip
+    b += 1
+    n2 = (
+        w000 * flat[b] + w100 * flat[b + si] + w010 * flat[b + sj] + w110 * flat[b + si + sj]
+        + w001 * flat[b + sk] + w101 * flat[b + si + sk] + w011 * flat[b + sj + sk]
+        + w111 * flat[b + si + sj + sk]
+    )  # fmt: skip
+
+    out[i, 0] = x + n0 * np.float32(ax)
+    out[i, 1] = y + n1 * np.float32(ay)
+    out[i, 2] = z + n2 * np.float32(az)
+
+
+@njit(fastmath=True, cache=True)
+def _displace_kernel_lattice(
+    coords, out, vecs, has_amp_grad, has_freq_grad, values, origin, inv_h
+):
+    literally(has_amp_grad)
+    literally(has_freq_grad)
+    flat = values.reshape(-1)
+    shape = values.shape
+    for i in range(coords.shape[0]):
+        _displace_vertex_lattice(
+            coords, out, i, vecs, has_amp_grad, has_freq_grad, flat, shape, origin, inv_h
         )
-        nz = perlin_noise_3d(
-            px + offset2, py + offset2, pz + offset2, perm_table, grad3_array
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _displace_kernel_lattice_parallel(
+    coords, out, vecs, has_amp_grad, has_freq_grad, values, origin, inv_h
+):
+    literally(has_amp_grad)
+    literally(has_freq_grad)
+    flat = values.reshape(-1)
+    shape = values.shape
+    for i in prange(coords.shape[0]):
+        _displace_vertex_lattice(
+            coords, out, i, vecs, has_amp_grad, has_freq_grad, flat, shape, origin, inv_h
         )
 
-        result[i, 0] = x + nx * ax * amp_fx
-        result[i, 1] = y + ny * ay * amp_fy
-        result[i, 2] = z + nz * az * amp_fz
 
-    return result
+def _noise_lattice_for(
+    lo: np.ndarray,
+    hi: np.ndarray,
+    *,
+    resolution: int,
+    max_points: int,
+) -> _NoiseLattice | None:
+    """ノイズ空間の範囲 [lo, hi] を覆う格子を返す（キャッシュ）。
+
+    格子点数が max_points を超える場合は None を返す。
+    """
+    r = int(resolution)
+    lo_index = tuple(int(np.floor(float(v) * r)) for v in lo)
+    hi_index = tuple(int(np.ceil(float(v) * r)) for v in hi)
+
+    with _lattice_lock:
+        for key, lattice in _lattice_cache.items():
+            if lattice.resolution == r and lattice.covers(lo_index, hi_index):
+                _lattice_cache.move_to_end(key)
+                return lattice
+
+    margin = int(np.ceil(LATTICE_PHASE_MARGIN * r))
+    shape = tuple(hi_index[a] - lo_index[a] + 1 + margin for a in range(3))
+    n_points = int(shape[0]) * int(shape[1]) * int(shape[2])
+    if n_points > int(max_points):
+        return None
+
+    h = 1.0 / float(r)
+    origin = np.asarray(lo_index, dtype=np.float64) * h
+    values = _sample_noise_lattice(
+        origin,
+        h,
+        int(shape[0]),
+        int(shape[1]),
+        int(shape[2]),
+        NOISE_PERMUTATION_TABLE,
+        NOISE_GRADIENTS_3D,
+    )
+    values.setflags(write=False)
+    lattice = _NoiseLattice(resolution=r, origin_index=lo_index, values=values)  # type: ignore[arg-type]
+
+    with _lattice_lock:
+        _lattice_cache[(r, lattice.origin_index, lattice.shape)] = lattice
+        while len(_lattice_cache) > int(LATTICE_CACHE_SIZE):
+            _lattice_cache.popitem(last=False)
+    return lattice
+
+
+def _clamp(value: float, limit: float) -> float:
+    if value > limit:
+        return float(limit)
+    if value < -limit:
+        return float(-limit)
+    return float(value)
+
+
+def _kernel_variant_from_env() -> tuple[bool, str]:
+    """環境変数から (parallel, precision) を読む。"""
+    parallel = env_flag(PARALLEL_ENV)
+    precision = str(os.environ.get(PRECISION_ENV, "float64")).strip().lower()
+    if precision not in {"float32", "float64"}:
+        precision = "float64"
+    return parallel, precision
+
+
+def _apply_noise_to_coords(
+    coords: np.ndarray,
+    amplitude: tuple[float, float, float],
+    amplitude_grad: tuple[float, float, float],
+    frequency: tuple[float, float, float],
+    frequency_grad: tuple[float, float, float],
+    time: float,
+    min_factor: float,
+    max_factor: float,
+    perm_table: np.ndarray,
+    grad3_array: np.ndarray,
+    *,
+    parallel: bool = False,
+    precision: str = "float64",
+    lattice_resolution: int = 0,
+) -> np.ndarray:
+    """座標配列に Perlin ノイズを適用する。
+
+    Parameters
+    ----------
+    parallel : bool, default False
+        True のとき頂点範囲をスレッド分割する（numba `prange`）。
+        スレッド数は `numba.set_num_threads` / `NUMBA_NUM_THREADS` に従う。
+        `PARALLEL_MIN_VERTICES` 未満の入力では直列で評価する。
+    precision : {"float64", "float32"}, default "float64"
+        ノイズ座標の評価精度。float32 は中間値を 32bit に保ち帯域と演算量を減らす
+        （位相 `t * PHASE_SPEED + PHASE_SEED` が大きい領域では格子内座標の分解能が落ちる）。
+    lattice_resolution : int, default 0
+        0 より大きいとき、ノイズを格子キャッシュからの三線形補間で求める
+        （誤差上界はモジュール内「格子キャッシュ」の注記を参照）。precision は無視する。
+        格子が頂点数より大きくなる場合は厳密評価に戻す。
+    """
+    if coords.size == 0:
+        return coords.copy()
+
+    ax, ay, az = (float(a) for a in amplitude)
+    if ax == 0.0 and ay == 0.0 and az == 0.0:
+        return coords.copy()
+
+    gx, gy, gz = (float(g) for g in amplitude_grad)
+    fgx, fgy, fgz = (float(g) for g in frequency_grad)
+    has_amp_grad = not (abs(gx) < 1e-6 and abs(gy) < 1e-6 and abs(gz) < 1e-6)
+    has_freq_grad = not (abs(fgx) < 1e-6 and abs(fgy) < 1e-6 and abs(fgz) < 1e-6)
+
+    vecs = np.zeros((7, 3), dtype=np.float64)
+    vecs[_ROW_AMPLITUDE] = (ax, ay, az)
+    vecs[_ROW_AMPLITUDE_GRAD] = (_clamp(gx, GX), _clamp(gy, GX), _clamp(gz, GX))
+    vecs[_ROW_FREQUENCY] = (float(frequency[0]), float(frequency[1]), float(frequency[2]))
+    vecs[_ROW_FREQUENCY_GRAD] = (_clamp(fgx, FGX), _clamp(fgy, FGX), _clamp(fgz, FGX))
+    src = np.ascontiguousarray(coords, dtype=np.float32)
+    mins, maxs = _coords_bounds(src)
+    vecs[_ROW_BBOX_MIN] = mins
+    vecs[_ROW_BBOX_RANGE] = (maxs.astype(np.float32) - mins.astype(np.float32)).astype(np.float64)
+
+    phase = float(np.float32(float(time) * PHASE_SPEED + PHASE_SEED))
+    vecs[_ROW_SCALARS] = (phase, float(min_factor), float(max_factor))
+
+    out = np.empty_like(src)
+
+    use_parallel = bool(parallel) and src.shape[0] >= PARALLEL_MIN_VERTICES
+    if int(lattice_resolution) > 0:
+        if has_freq_grad:
+            lo, hi = _noise_space_bounds(src, vecs, has_amp_grad, has_freq_grad)
+        else:
+            freq = vecs[_ROW_FREQUENCY]
+            a = mins * freq
+            b = maxs * freq
+            lo = np.minimum(a, b)
+            hi = np.maximum(a, b)
+        lattice = _noise_lattice_for(
+            lo + phase,
+            hi + phase,
+            resolution=int(lattice_resolution),
+            max_points=min(int(LATTICE_MAX_POINTS), int(src.shape[0])),
+        )
+        if lattice is not None:
+            r = float(lattice.resolution)
+            origin = np.asarray(lattice.origin_index, dtype=np.float64) / r
+            kernel_l = (
+                _displace_kernel_lattice_parallel if use_parallel else _displace_kernel_lattice
+            )
+            kernel_l(src, out, vecs, has_amp_grad, has_freq_grad, lattice.values, origin, r)
+            return out
+
+    if precision == "float32":
+        kernel = _displace_kernel_f32_parallel if use_parallel else _displace_kernel_f32
+    else:
+        kernel = _displace_kernel_parallel if use_parallel else _displace_kernel
+    kernel(src, out, vecs, has_amp_grad, has_freq_grad, perm_table, grad3_array)
+    return out
 
 
 @effect(meta=displace_meta)
@@ -694,6 +1004,7 @@ def displace(
     min_gradient_factor: float = MIN_GRADIENT_FACTOR_DEFAULT,
     max_gradient_factor: float = 2.0,
     t: float = 0.0,
+    lattice_resolution: int = 0,
 ) -> RealizedGeometry:
     """3D Perlin ノイズで頂点を変位する。
 
@@ -715,11 +1026,21 @@ def displace(
         勾配適用時の最大係数（1.0–4.0）。
     t : float, default 0.0
         時間オフセット（位相）。値を変えるとノイズが流れる。
+    lattice_resolution : int, default 0
+        ノイズ格子キャッシュの分割数（1 ノイズセルあたり、0 で無効）。
+        正のとき、ノイズ場を格子へ一度だけ標本化し、各フレームは三線形補間で変位する
+        （t のアニメーション向け）。誤差は軸ごとに amplitude * 4.5 / lattice_resolution^2 以下。
 
     Returns
     -------
     RealizedGeometry
         変位後の実体ジオメトリ。
+
+    Notes
+    -----
+    評価カーネルは環境変数で選ぶ（出力の意味は変わらない）。
+    `GRAFIX_DISPLACE_PARALLEL=1` で頂点並列、`GRAFIX_DISPLACE_PRECISION=float32` で
+    float32 評価になる。
     """
     if not inputs:
         return _empty_geometry()
@@ -748,6 +1069,7 @@ def displace(
     if max_factor_val < min_factor_val:
         max_factor_val = min_factor_val
 
+    parallel, precision = _kernel_variant_from_env()
     new_coords = _apply_noise_to_coords(
         base.coords,
         (ax, ay, az),
@@ -767,9 +1089,12 @@ def displace(
             float(frequency_gradient[2]),
         ),
         float(t),
-        np.float32(min_factor_val),  # type: ignore[arg-type]
-        np.float32(max_factor_val),  # type: ignore[arg-type]
+        min_factor_val,
+        max_factor_val,
         NOISE_PERMUTATION_TABLE,
         NOISE_GRADIENTS_3D,
+        parallel=parallel,
+        precision=precision,
+        lattice_resolution=max(0, int(lattice_resolution)),
     )
     return RealizedGeometry(coords=new_coords, offsets=base.offsets)
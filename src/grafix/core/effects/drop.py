@@ -10,6 +10,9 @@ from grafix.core.effect_registry import effect
 from grafix.core.parameters.meta import ParamMeta
 from grafix.core.realized_geometry import RealizedGeometry
 
+from .polyline_metrics import polyline_metrics
+from .util import select_polylines
+
 drop_meta = {
     "interval": ParamMeta(kind="int", ui_min=0, ui_max=100),
     "index_offset": ParamMeta(kind="int", ui_min=0, ui_max=100),
@@ -29,27 +32,12 @@ def _empty_geometry() -> RealizedGeometry:
     return RealizedGeometry(coords=coords, offsets=offsets)
 
 
-def _compute_polyline_lengths(
-    coords: np.ndarray, offsets: np.ndarray, *, close: bool
-) -> np.ndarray:
-    """各ポリラインの長さを返す。"""
-    n_lines = max(0, int(offsets.size) - 1)
-    lengths = np.zeros((n_lines,), dtype=np.float64)
-    for i in range(n_lines):
-        start = int(offsets[i])
-        end = int(offsets[i + 1])
-        if end - start <= 1:
-            lengths[i] = 0.0
-            continue
-        v = coords[start:end].astype(np.float64, copy=False)
-        diff = v[1:] - v[:-1]
-        seg_len = np.sqrt(np.sum(diff * diff, axis=1))
-        L = float(seg_len.sum())
-        if close and v.shape[0] >= 3:
-            d = v[0] - v[-1]
-            L += float(np.sqrt(np.dot(d, d)))
-        lengths[i] = L
-    return lengths
+def _compute_polyline_lengths(base: RealizedGeometry, *, close: bool) -> np.ndarray:
+    """各ポリラインの長さを返す（close=True なら頂点 3 以上の線に閉じ辺を足す）。"""
+    metrics = polyline_metrics(base)
+    if not close:
+        return metrics.lengths
+    return metrics.lengths + np.where(metrics.counts >= 3, metrics.closing_lengths, 0.0)
 
 
 @effect(meta=drop_meta)
@@ -197,163 +185,68 @@ def drop(
     if eff_interval is None and not use_min and not use_max and not prob_enabled:
         return base
 
-    rng = None
-    if prob_enabled:
-        rng = np.random.default_rng(int(seed))
-
-    center = np.zeros((3,), dtype=np.float64)
-    inv_extent = np.zeros((3,), dtype=np.float64)
-    if prob_enabled:
-        min_v = coords.min(axis=0).astype(np.float64, copy=False)
-        max_v = coords.max(axis=0).astype(np.float64, copy=False)
-        center = (min_v + max_v) * 0.5
-        extent = (max_v - min_v) * 0.5
-        for k in range(3):
-            e = float(extent[k])
-            inv_extent[k] = 0.0 if e < 1e-9 else 1.0 / e
-
-    def _p_eff_for_range(start: int, end: int) -> float:
-        if end <= start:
-            p_x = base_px
-            p_y = base_py
-            p_z = base_pz
-        else:
-            c = coords[start:end].mean(axis=0, dtype=np.float64)
-            t = (c - center) * inv_extent
-            tx = float(t[0])
-            ty = float(t[1])
-            tz = float(t[2])
-            if tx < -1.0:
-                tx = -1.0
-            elif tx > 1.0:
-                tx = 1.0
-            if ty < -1.0:
-                ty = -1.0
-            elif ty > 1.0:
-                ty = 1.0
-            if tz < -1.0:
-                tz = -1.0
-            elif tz > 1.0:
-                tz = 1.0
-
-            p_x = base_px + slope_x * tx
-            p_y = base_py + slope_y * ty
-            p_z = base_pz + slope_z * tz
-
-            if p_x < 0.0:
-                p_x = 0.0
-            elif p_x > 1.0:
-                p_x = 1.0
-            if p_y < 0.0:
-                p_y = 0.0
-            elif p_y > 1.0:
-                p_y = 1.0
-            if p_z < 0.0:
-                p_z = 0.0
-            elif p_z > 1.0:
-                p_z = 1.0
-
-        return 1.0 - (1.0 - p_x) * (1.0 - p_y) * (1.0 - p_z)
+    metrics = polyline_metrics(base)
+    counts = metrics.counts
 
     if by_mode == "line":
-        lengths: np.ndarray | None = None
-        if use_min or use_max:
-            lengths = _compute_polyline_lengths(coords, offsets, close=False)
-
-        keep_mask = np.zeros((n_lines,), dtype=bool)
-        for i in range(n_lines):
-            cond = False
-
-            if eff_interval is not None:
-                cond = cond or (((i - index_offset_i) % eff_interval) == 0)
-
-            if lengths is not None:
-                L = float(lengths[i])
-                if use_min and L <= min_length_f:
-                    cond = True
-                if use_max and L >= max_length_f:
-                    cond = True
-
-            # 旧仕様に合わせて、乱数は全行で消費する（他条件の有無で結果が変わらないようにする）。
-            if rng is not None:
-                start = int(offsets[i])
-                end = int(offsets[i + 1])
-                p_eff = _p_eff_for_range(start, end)
-                if float(rng.random()) < p_eff:
-                    cond = True
-
-            if keep == "drop":
-                keep_mask[i] = not cond
-            else:
-                keep_mask[i] = cond
-
+        # 判定対象（line: 全線 / face: 頂点 3 以上）と、その中での通し番号。
+        targets = np.arange(n_lines)
+        close = False
     else:
-        face_count = 0
-        for i in range(n_lines):
-            start = int(offsets[i])
-            end = int(offsets[i + 1])
-            if end - start >= 3:
-                face_count += 1
-        if face_count <= 0:
+        targets = np.flatnonzero(counts >= 3)
+        if targets.size <= 0:
             return base
+        close = True
 
-        lengths = None
-        if use_min or use_max:
-            lengths = _compute_polyline_lengths(coords, offsets, close=True)
-
-        keep_mask = np.ones((n_lines,), dtype=bool)
-        face_index = 0
-        for i in range(n_lines):
-            start = int(offsets[i])
-            end = int(offsets[i + 1])
-            if end - start < 3:
-                continue
-
-            cond = False
-            if eff_interval is not None:
-                cond = cond or (((face_index - index_offset_i) % eff_interval) == 0)
-
-            if lengths is not None:
-                L = float(lengths[i])
-                if use_min and L <= min_length_f:
-                    cond = True
-                if use_max and L >= max_length_f:
-                    cond = True
-
-            if rng is not None:
-                p_eff = _p_eff_for_range(start, end)
-                if float(rng.random()) < p_eff:
-                    cond = True
-
-            if keep == "drop":
-                keep_mask[i] = not cond
-            else:
-                keep_mask[i] = cond
-
-            face_index += 1
+    cond = np.zeros((targets.size,), dtype=bool)
 
-    if not np.any(keep_mask):
-        return _empty_geometry()
+    if eff_interval is not None:
+        cond |= ((np.arange(targets.size) - index_offset_i) % eff_interval) == 0
 
-    out_coords_list: list[np.ndarray] = []
-    out_offsets_list: list[int] = [0]
-    cursor = 0
-
-    for i in range(n_lines):
-        if not keep_mask[i]:
-            continue
-        start = int(offsets[i])
-        end = int(offsets[i + 1])
-        if end <= start:
-            continue
-        seg = coords[start:end]
-        out_coords_list.append(seg)
-        cursor += int(seg.shape[0])
-        out_offsets_list.append(cursor)
-
-    if len(out_offsets_list) == 1:
+    if use_min or use_max:
+        lengths = _compute_polyline_lengths(base, close=close)[targets]
+        if use_min:
+            cond |= lengths <= min_length_f
+        if use_max:
+            cond |= lengths >= max_length_f
+
+    if prob_enabled:
+        # 旧仕様に合わせて、乱数は全対象で 1 つずつ消費する
+        # （他条件の有無で結果が変わらないようにする）。
+        rng = np.random.default_rng(int(seed))
+        draws = rng.random(targets.size)
+        p_eff = _probabilities(
+            coords,
+            metrics.centroids[targets],
+            base_p=np.array([base_px, base_py, base_pz], dtype=np.float64),
+            slope=np.array([slope_x, slope_y, slope_z], dtype=np.float64),
+        )
+        cond |= draws < p_eff
+
+    keep_mask = np.ones((n_lines,), dtype=bool)
+    keep_mask[targets] = ~cond if keep == "drop" else cond
+    keep_mask &= counts > 0
+
+    if not np.any(keep_mask):
         return _empty_geometry()
 
-    out_coords = np.concatenate(out_coords_list, axis=0)
-    out_offsets = np.asarray(out_offsets_list, dtype=np.int32)
+    out_coords, out_offsets = select_polylines(coords, offsets, keep_mask)
     return RealizedGeometry(coords=out_coords, offsets=out_offsets)
+
+
+def _probabilities(
+    coords: np.ndarray, centroids: np.ndarray, *, base_p: np.ndarray, slope: np.ndarray
+) -> np.ndarray:
+    """各対象の重心位置から合成 drop 確率 `1 - (1-p_x)(1-p_y)(1-p_z)` を求める。"""
+    min_v = coords.min(axis=0).astype(np.float64, copy=False)
+    max_v = coords.max(axis=0).astype(np.float64, copy=False)
+    center = (min_v + max_v) * 0.5
+    extent = (max_v - min_v) * 0.5
+    inv_extent = np.zeros((3,), dtype=np.float64)
+    np.divide(1.0, extent, out=inv_extent, where=extent >= 1e-9)
+
+    t = np.clip((centroids - center) * inv_extent, -1.0, 1.0)
+    p = np.clip(base_p + slope * t, 0.0, 1.0)
+    # 空ポリライン（重心 NaN）は位置に依らず base の確率を使う。
+    p = np.where(np.isnan(centroids), base_p, p)
+    return 1.0 - (1.0 - p[:, 0]) * (1.0 - p[:, 1]) * (1.0 - p[:, 2])
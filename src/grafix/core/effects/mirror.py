@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Sequence
+from collections.abc import Sequence
 
 import numpy as np
 from numba import njit  # type: ignore[import-untyped]
@@ -11,6 +11,8 @@ from grafix.core.effect_registry import effect
 from grafix.core.parameters.meta import ParamMeta
 from grafix.core.realized_geometry import RealizedGeometry
 
+from .util import concat_polylines, select_polylines, unique_polyline_mask
+
 EPS = 1e-6
 INCLUDE_BOUNDARY = True
 
@@ -203,19 +205,9 @@ def mirror(
 
         # 通常ケースは重複が出にくいので、dedup は必要時のみ。
         if need_dedup:
-            lines = [
-                out_coords_arr[int(out_offsets_arr[i]) : int(out_offsets_arr[i + 1])]
-                for i in range(int(out_offsets_arr.size) - 1)
-            ]
-            uniq = _dedup_lines(lines)
-            if not uniq:
+            out_coords_arr, out_offsets_arr = _dedup_lines(out_coords_arr, out_offsets_arr)
+            if out_offsets_arr.size < 2:
                 return _empty_geometry()
-            out_coords_arr = np.vstack(uniq).astype(np.float32, copy=False)
-            out_offsets_arr = np.zeros((len(uniq) + 1,), dtype=np.int32)
-            acc = 0
-            for i, ln0 in enumerate(uniq, start=1):
-                acc += int(ln0.shape[0])
-                out_offsets_arr[i] = acc
 
         if show_planes:
             out_coords_arr, out_offsets_arr = _append_wedge_planes(
@@ -228,11 +220,11 @@ def mirror(
 
         return RealizedGeometry(coords=out_coords_arr, offsets=out_offsets_arr)
 
-    uniq = _dedup_lines(out_lines)
+    uniq_coords, uniq_offsets = _dedup_lines(*concat_polylines(out_lines))
 
     if show_planes:
-        if uniq:
-            all_pts = np.vstack(uniq).astype(np.float32, copy=False)
+        if uniq_coords.shape[0] > 0:
+            all_pts = uniq_coords
         else:
             all_pts = coords.astype(np.float32, copy=False)
 
@@ -298,18 +290,16 @@ def mirror(
                     )
 
         if plane_lines:
-            uniq.extend(plane_lines)
+            plane_coords, plane_offsets = concat_polylines(plane_lines)
+            uniq_offsets = np.concatenate(
+                [uniq_offsets, plane_offsets[1:] + uniq_offsets[-1]]
+            )
+            uniq_coords = np.concatenate([uniq_coords, plane_coords], axis=0)
 
-    if not uniq:
+    if uniq_offsets.size < 2:
         return _empty_geometry()
 
-    all_coords = np.vstack(uniq).astype(np.float32, copy=False)
-    new_offsets = np.zeros((len(uniq) + 1,), dtype=np.int32)
-    acc = 0
-    for i, line in enumerate(uniq, start=1):
-        acc += int(line.shape[0])
-        new_offsets[i] = acc
-    return RealizedGeometry(coords=all_coords, offsets=new_offsets)
+    return RealizedGeometry(coords=uniq_coords, offsets=uniq_offsets)
 
 
 def _is_inside(val: float, thresh: float, side: int) -> bool:
@@ -727,19 +717,10 @@ def _rotate_xy(vertices: np.ndarray, ang: float, cx: float, cy: float) -> np.nda
     return out
 
 
-def _dedup_lines(lines: Iterable[np.ndarray]) -> list[np.ndarray]:
-    seen: set[tuple[int, bytes]] = set()
-    out: list[np.ndarray] = []
+def _dedup_lines(coords: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """EPS 格子で量子化した内容が一致するポリラインを、初出だけ残して除く。"""
     inv = 1.0 / EPS if EPS > 0 else 1e6
-    for ln in lines:
-        if ln.shape[0] == 0:
-            continue
-        q = np.rint(ln.astype(np.float64, copy=False) * inv).astype(
-            np.int64, copy=False
-        )
-        key = (int(q.shape[0]), q.tobytes())
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(ln.astype(np.float32, copy=False))
-    return out
+    # 量子化は全頂点まとめて 1 回。重複判定はポリライン単位のハッシュで行う。
+    q = np.rint(coords.astype(np.float64, copy=False) * inv).astype(np.int64, copy=False)
+    keep = unique_polyline_mask(q, offsets)
+    return select_polylines(coords, offsets, keep)
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Sequence
+from collections.abc import Sequence
 
 import numpy as np
+from numba import njit  # type: ignore[import-untyped]
 
 from grafix.core.effect_registry import effect
 from grafix.core.parameters.meta import ParamMeta
 from grafix.core.realized_geometry import RealizedGeometry
 
+from .util import concat_polylines, select_polylines, unique_polyline_mask
+
 EPS = 1e-6
 INCLUDE_BOUNDARY = True
 
@@ -100,7 +103,7 @@ def mirror3d(
 
     mode_s = str(mode)
     if mode_s == "azimuth":
-        out_lines = _mirror3d_azimuth(
+        out_coords, out_offsets = _mirror3d_azimuth(
             coords,
             offsets,
             n_azimuth=int(n_azimuth),
@@ -110,43 +113,43 @@ def mirror3d(
             mirror_equator=bool(mirror_equator),
             source_side=bool(source_side),
         )
-        if show_planes:
-            out_lines.extend(
-                _show_planes_azimuth(
-                    out_lines=out_lines,
-                    coords=coords,
-                    center=c,
-                    axis=ax,
-                    n_azimuth=int(n_azimuth),
-                    phi0=float(phi0),
-                    mirror_equator=bool(mirror_equator),
-                )
+        plane_lines = (
+            _show_planes_azimuth(
+                out_coords=out_coords,
+                coords=coords,
+                center=c,
+                axis=ax,
+                n_azimuth=int(n_azimuth),
+                phi0=float(phi0),
+                mirror_equator=bool(mirror_equator),
             )
+            if show_planes
+            else []
+        )
     elif mode_s == "polyhedral":
-        out_lines = _mirror3d_polyhedral(
+        out_coords, out_offsets = _mirror3d_polyhedral(
             coords,
             offsets,
             center=c,
             group=str(group),
             use_reflection=bool(use_reflection),
         )
-        if show_planes:
-            out_lines.extend(
-                _show_planes_polyhedral(out_lines=out_lines, coords=coords, center=c)
-            )
+        plane_lines = (
+            _show_planes_polyhedral(out_coords=out_coords, coords=coords, center=c)
+            if show_planes
+            else []
+        )
     else:
         return base
 
-    uniq = _dedup_lines(out_lines)
-    if not uniq:
-        return _empty_geometry()
+    if plane_lines:
+        plane_coords, plane_offsets = concat_polylines(plane_lines)
+        out_offsets = np.concatenate([out_offsets, plane_offsets[1:] + out_offsets[-1]])
+        out_coords = np.concatenate([out_coords, plane_coords], axis=0)
 
-    all_coords = np.vstack(uniq).astype(np.float32, copy=False)
-    new_offsets = np.zeros((len(uniq) + 1,), dtype=np.int32)
-    acc = 0
-    for i, ln in enumerate(uniq, start=1):
-        acc += int(ln.shape[0])
-        new_offsets[i] = acc
+    all_coords, new_offsets = _dedup_lines(out_coords, out_offsets)
+    if new_offsets.size < 2:
+        return _empty_geometry()
     return RealizedGeometry(coords=all_coords, offsets=new_offsets)
 
 
@@ -160,51 +163,42 @@ def _mirror3d_azimuth(
     phi0_deg: float,
     mirror_equator: bool,
     source_side: bool,
-) -> list[np.ndarray]:
+) -> tuple[np.ndarray, np.ndarray]:
     if n_azimuth < 1:
-        return []
+        return _empty_lines()
 
     phi0_rad = float(np.deg2rad(float(phi0_deg)))
     n0, n1 = _compute_azimuth_plane_normals(
         n_azimuth=n_azimuth, axis=axis, phi0=phi0_rad
     )
 
-    src_lines: list[np.ndarray] = []
-    for li in range(int(offsets.size) - 1):
-        v = coords[int(offsets[li]) : int(offsets[li + 1])]
-        if v.shape[0] == 0:
-            continue
-        pieces = _clip_polyline_halfspace_3d(v, normal=n0, center=center)
-        tmp: list[np.ndarray] = []
-        for p in pieces:
-            tmp.extend(_clip_polyline_halfspace_3d(p, normal=-n1, center=center))
-        for p in tmp:
-            if p.shape[0] >= 1:
-                src_lines.append(p.astype(np.float32, copy=False))
+    src_coords, src_offsets = _clip_halfspaces(
+        coords, offsets, normals=(n0, -n1), center=center
+    )
 
+    # ソース 1 本ごとに [回転 m=0..n-1] → [n0 反射後の回転 m=0..n-1] の順で並べる。
     step = float(2.0 * np.pi / float(n_azimuth))
-    out_lines: list[np.ndarray] = []
-    for p in src_lines:
-        for m in range(n_azimuth):
-            out_lines.append(_rotate_around_axis(p, axis, m * step, center))
-        pref = _reflect_across_plane(p, n0, center)
-        for m in range(n_azimuth):
-            out_lines.append(_rotate_around_axis(pref, axis, m * step, center))
+    rots = [_rotation_matrix(axis, m * step) for m in range(n_azimuth)]
+    ref = _reflect_matrix(n0).astype(np.float64)
+    mats = np.stack(rots + [r @ ref for r in rots], axis=0)
+    out_coords, out_offsets = _transform_lines(src_coords, src_offsets, mats, center)
 
     if not mirror_equator:
-        return out_lines
+        return out_coords, out_offsets
 
     eq_n = axis
     src_n = eq_n if source_side else -eq_n
 
-    clipped: list[np.ndarray] = []
-    for ln in out_lines:
-        clipped.extend(_clip_polyline_halfspace_3d(ln, normal=src_n, center=center))
-
-    extra: list[np.ndarray] = []
-    for ln in clipped:
-        extra.append(_reflect_across_plane(ln, eq_n, center))
-    return clipped + extra
+    clipped_coords, clipped_offsets = _clip_halfspaces(
+        out_coords, out_offsets, normals=(src_n,), center=center
+    )
+    extra_coords, extra_offsets = _transform_lines(
+        clipped_coords, clipped_offsets, _reflect_matrix(eq_n)[None, :, :], center
+    )
+    return (
+        np.concatenate([clipped_coords, extra_coords], axis=0),
+        np.concatenate([clipped_offsets, extra_offsets[1:] + clipped_offsets[-1]]),
+    )
 
 
 def _mirror3d_polyhedral(
@@ -214,14 +208,14 @@ def _mirror3d_polyhedral(
     center: np.ndarray,
     group: str,
     use_reflection: bool,
-) -> list[np.ndarray]:
+) -> tuple[np.ndarray, np.ndarray]:
     gname = str(group).upper()
     if gname not in {"T", "O", "I"}:
-        return []
+        return _empty_lines()
 
     mats = _polyhedral_rotation_mats(gname)
     if not mats:
-        return []
+        return _empty_lines()
 
     # ソース抽出（簡易: 正の八分体 x>=cx, y>=cy, z>=cz）
     normals = (
@@ -229,32 +223,76 @@ def _mirror3d_polyhedral(
         np.array([0.0, 1.0, 0.0], dtype=np.float32),
         np.array([0.0, 0.0, 1.0], dtype=np.float32),
     )
-    src_lines: list[np.ndarray] = []
-    for li in range(int(offsets.size) - 1):
-        v = coords[int(offsets[li]) : int(offsets[li + 1])]
-        if v.shape[0] == 0:
-            continue
-        pieces = _clip_polyhedron_octant(v, normals=normals, center=center)
-        for p in pieces:
-            if p.shape[0] >= 1:
-                src_lines.append(p.astype(np.float32, copy=False))
-
-    out_lines: list[np.ndarray] = []
-    for p in src_lines:
-        p_local = p - center
-        for M in mats:
-            out_lines.append((p_local @ M.T + center).astype(np.float32, copy=False))
-
-    if use_reflection and out_lines:
+    src_coords, src_offsets = _clip_halfspaces(
+        coords, offsets, normals=normals, center=center
+    )
+
+    out_coords, out_offsets = _transform_lines(
+        src_coords, src_offsets, np.stack(mats, axis=0), center
+    )
+
+    if use_reflection and out_offsets.size > 1:
         # 代表反射: y=cy（ローカルでは y=0）
         Ry = _reflect_matrix(np.array([0.0, 1.0, 0.0], dtype=np.float32))
-        extra: list[np.ndarray] = []
-        for ln in out_lines:
-            ln_local = ln - center
-            extra.append((ln_local @ Ry.T + center).astype(np.float32, copy=False))
-        out_lines.extend(extra)
+        extra_coords, extra_offsets = _transform_lines(
+            out_coords, out_offsets, Ry[None, :, :], center
+        )
+        out_coords = np.concatenate([out_coords, extra_coords], axis=0)
+        out_offsets = np.concatenate([out_offsets, extra_offsets[1:] + out_offsets[-1]])
+
+    return out_coords, out_offsets
 
-    return out_lines
+
+def _empty_lines() -> tuple[np.ndarray, np.ndarray]:
+    return np.zeros((0, 3), dtype=np.float32), np.zeros((1,), dtype=np.int32)
+
+
+def _transform_lines(
+    coords: np.ndarray, offsets: np.ndarray, mats: np.ndarray, center: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """全ポリラインへ (M,3,3) の行列列を一括適用する（center 基準）。
+
+    出力はポリラインごとに M 本のコピーを連続させた順（line-major）。
+    """
+    counts = np.diff(offsets).astype(np.int64, copy=False)
+    n_mats = int(mats.shape[0])
+    out_offsets = np.zeros((counts.size * n_mats + 1,), dtype=np.int32)
+    np.cumsum(np.repeat(counts, n_mats), out=out_offsets[1:])
+    out_coords = np.empty((int(out_offsets[-1]), 3), dtype=np.float32)
+    _fill_transformed_nb(
+        coords.astype(np.float32, copy=False),
+        offsets.astype(np.int64, copy=False),
+        np.ascontiguousarray(mats, dtype=np.float64),
+        center.astype(np.float64),
+        out_coords,
+    )
+    return out_coords, out_offsets
+
+
+@njit(cache=True)
+def _fill_transformed_nb(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    mats: np.ndarray,
+    center: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    cx = center[0]
+    cy = center[1]
+    cz = center[2]
+    vc = 0
+    for li in range(offsets.shape[0] - 1):
+        s = offsets[li]
+        e = offsets[li + 1]
+        for m in range(mats.shape[0]):
+            for i in range(s, e):
+                x = np.float64(coords[i, 0]) - cx
+                y = np.float64(coords[i, 1]) - cy
+                z = np.float64(coords[i, 2]) - cz
+                out[vc, 0] = mats[m, 0, 0] * x + mats[m, 0, 1] * y + mats[m, 0, 2] * z + cx
+                out[vc, 1] = mats[m, 1, 0] * x + mats[m, 1, 1] * y + mats[m, 1, 2] * z + cy
+                out[vc, 2] = mats[m, 2, 0] * x + mats[m, 2, 1] * y + mats[m, 2, 2] * z + cz
+                vc += 1
 
 
 def _polyhedral_rotation_mats(group: str) -> list[np.ndarray]:
@@ -378,7 +416,7 @@ def _polyhedral_rotation_mats(group: str) -> list[np.ndarray]:
 
 def _show_planes_azimuth(
     *,
-    out_lines: list[np.ndarray],
+    out_coords: np.ndarray,
     coords: np.ndarray,
     center: np.ndarray,
     axis: np.ndarray,
@@ -387,8 +425,8 @@ def _show_planes_azimuth(
     mirror_equator: bool,
 ) -> list[np.ndarray]:
     n = max(1, int(n_azimuth))
-    if out_lines:
-        all_pts = np.vstack(out_lines).astype(np.float32, copy=False)
+    if out_coords.shape[0] > 0:
+        all_pts = out_coords
     else:
         all_pts = coords.astype(np.float32, copy=False)
     r = _fit_radius(all_pts=all_pts, center=center)
@@ -410,12 +448,12 @@ def _show_planes_azimuth(
 
 def _show_planes_polyhedral(
     *,
-    out_lines: list[np.ndarray],
+    out_coords: np.ndarray,
     coords: np.ndarray,
     center: np.ndarray,
 ) -> list[np.ndarray]:
-    if out_lines:
-        all_pts = np.vstack(out_lines).astype(np.float32, copy=False)
+    if out_coords.shape[0] > 0:
+        all_pts = out_coords
     else:
         all_pts = coords.astype(np.float32, copy=False)
     r = _fit_radius(all_pts=all_pts, center=center)
@@ -468,42 +506,15 @@ def _unit(v: np.ndarray) -> np.ndarray:
     return (v / n).astype(np.float32, copy=False)
 
 
-def _rotate_around_axis(
-    points: np.ndarray, axis: np.ndarray, angle: float, center: np.ndarray
-) -> np.ndarray:
-    if points.shape[0] == 0:
-        return points
-    k = _unit(axis)
+def _rotation_matrix(axis: np.ndarray, angle: float) -> np.ndarray:
+    """単位軸まわりの回転行列（Rodrigues）を float64 で返す。"""
+    k = _unit(axis).astype(np.float64)
     c = float(np.cos(angle))
     s = float(np.sin(angle))
-
-    p = points.astype(np.float32, copy=True)
-    p[:, 0] -= center[0]
-    p[:, 1] -= center[1]
-    p[:, 2] -= center[2]
-    kv = np.cross(k, p)
-    kdotv = np.dot(p, k)
-    v_rot = p * c + kv * s + np.outer(kdotv, k) * (1.0 - c)
-    v_rot[:, 0] += center[0]
-    v_rot[:, 1] += center[1]
-    v_rot[:, 2] += center[2]
-    return v_rot.astype(np.float32, copy=False)
-
-
-def _reflect_across_plane(
-    points: np.ndarray, normal: np.ndarray, center: np.ndarray
-) -> np.ndarray:
-    n = _unit(normal)
-    p = points.astype(np.float32, copy=True)
-    p[:, 0] -= center[0]
-    p[:, 1] -= center[1]
-    p[:, 2] -= center[2]
-    proj = np.dot(p, n).reshape(-1, 1)
-    p_ref = p - 2.0 * proj * n
-    p_ref[:, 0] += center[0]
-    p_ref[:, 1] += center[1]
-    p_ref[:, 2] += center[2]
-    return p_ref.astype(np.float32, copy=False)
+    K = np.array(
+        [[0.0, -k[2], k[1]], [k[2], 0.0, -k[0]], [-k[1], k[0], 0.0]], dtype=np.float64
+    )
+    return c * np.eye(3) + s * K + (1.0 - c) * np.outer(k, k)
 
 
 def _reflect_matrix(normal: np.ndarray) -> np.ndarray:
@@ -534,89 +545,125 @@ def _basis_perp_axis(axis: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
     return b0, b1
 
 
-def _clip_polyline_halfspace_3d(
-    vertices: np.ndarray, *, normal: np.ndarray, center: np.ndarray
-) -> list[np.ndarray]:
-    """3D 半空間でポリラインをクリップする（内側: n·(p-center) >= -EPS）。"""
-    nrm = _unit(normal)
-    n = int(vertices.shape[0])
-    if n <= 0:
-        return []
-    if n == 1:
-        s = float(np.dot(vertices[0] - center, nrm))
-        ok = s >= (-EPS if INCLUDE_BOUNDARY else EPS)
-        return [vertices.astype(np.float32, copy=True)] if ok else []
-
-    out: list[np.ndarray] = []
-    cur: list[np.ndarray] = []
-
-    a = vertices[0].astype(np.float32, copy=False)
-    sA = float(np.dot(a - center, nrm))
-    inA = sA >= (-EPS if INCLUDE_BOUNDARY else EPS)
-    if inA:
-        cur.append(a)
-
-    for i in range(1, n):
-        b = vertices[i].astype(np.float32, copy=False)
-        sB = float(np.dot(b - center, nrm))
-        inB = sB >= (-EPS if INCLUDE_BOUNDARY else EPS)
-
-        if inA and inB:
-            cur.append(b)
-        elif inA and (not inB):
-            denom = sA - sB
-            t = 0.0 if abs(denom) < 1e-20 else sA / denom
-            t = float(min(max(t, 0.0), 1.0))
-            p = a + (b - a) * np.float32(t)
-            if len(cur) == 0 or not np.allclose(cur[-1], p, atol=EPS):
-                cur.append(p)
-            out.append(np.vstack(cur).astype(np.float32, copy=False))
-            cur = []
-        elif (not inA) and inB:
-            denom = sA - sB
-            t = 0.0 if abs(denom) < 1e-20 else sA / denom
-            t = float(min(max(t, 0.0), 1.0))
-            p = a + (b - a) * np.float32(t)
-            cur = [p, b]
-
-        a, sA, inA = b, sB, inB
-
-    if cur:
-        out.append(np.vstack(cur).astype(np.float32, copy=False))
-    return out
-
-
-def _clip_polyhedron_octant(
-    vertices: np.ndarray,
+def _clip_halfspaces(
+    coords: np.ndarray,
+    offsets: np.ndarray,
     *,
-    normals: tuple[np.ndarray, np.ndarray, np.ndarray],
+    normals: Sequence[np.ndarray],
     center: np.ndarray,
-) -> list[np.ndarray]:
-    n1, n2, n3 = normals
-    pieces = _clip_polyline_halfspace_3d(vertices, normal=n1, center=center)
-    tmp: list[np.ndarray] = []
-    for p in pieces:
-        tmp.extend(_clip_polyline_halfspace_3d(p, normal=n2, center=center))
-    out: list[np.ndarray] = []
-    for p in tmp:
-        out.extend(_clip_polyline_halfspace_3d(p, normal=n3, center=center))
-    return out
-
-
-def _dedup_lines(lines: Iterable[np.ndarray]) -> list[np.ndarray]:
-    seen: set[tuple[int, ...]] = set()
-    out: list[np.ndarray] = []
-    inv = 1.0 / EPS if EPS > 0 else 1e6
-    for ln in lines:
-        if ln.shape[0] == 0:
-            continue
-        q = np.rint(ln.astype(np.float32, copy=False) * inv).astype(np.int64)
-        key = (int(q.shape[0]),) + tuple(q.flatten().tolist())
-        if key in seen:
+) -> tuple[np.ndarray, np.ndarray]:
+    """全ポリラインを半空間列で順にクリップする（内側: n·(p-center) >= -EPS）。
+
+    1 平面ずつ全体を処理しても、断片の並びは「入力 1 本ごとに深さ優先」と同じになる。
+    """
+    out_coords = coords.astype(np.float32, copy=False)
+    out_offsets = offsets.astype(np.int32, copy=False)
+    for normal in normals:
+        out_coords, out_offsets = _clip_halfspace_nb(
+            out_coords,
+            out_offsets,
+            _unit(normal),
+            center.astype(np.float32, copy=False),
+            np.float64(-EPS if INCLUDE_BOUNDARY else EPS),
+        )
+    return out_coords, out_offsets
+
+
+@njit(cache=True)
+def _signed_distance(
+    coords: np.ndarray, i: int, normal: np.ndarray, center: np.ndarray
+) -> float:
+    dx = coords[i, 0] - center[0]
+    dy = coords[i, 1] - center[1]
+    dz = coords[i, 2] - center[2]
+    return np.float64(dx * normal[0] + dy * normal[1] + dz * normal[2])
+
+
+@njit(cache=True)
+def _write_intersection(
+    coords: np.ndarray, a: int, b: int, sa: float, sb: float, out: np.ndarray, vc: int
+) -> None:
+    denom = sa - sb
+    t = 0.0 if abs(denom) < 1e-20 else sa / denom
+    t32 = np.float32(min(max(t, 0.0), 1.0))
+    for k in range(3):
+        out[vc, k] = coords[a, k] + (coords[b, k] - coords[a, k]) * t32
+
+
+@njit(cache=True)
+def _clip_halfspace_nb(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    normal: np.ndarray,
+    center: np.ndarray,
+    threshold: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    n_lines = offsets.shape[0] - 1
+    n_total = coords.shape[0]
+    # 1 頂点あたり高々 2 点（交点 + 頂点）、断片数は高々「本数 + 頂点数」。
+    out_c = np.empty((2 * n_total, 3), dtype=np.float32)
+    out_o = np.empty((n_lines + n_total + 1,), dtype=np.int32)
+    out_o[0] = 0
+    vc = 0
+    oc = 0
+
+    for li in range(n_lines):
+        s = offsets[li]
+        e = offsets[li + 1]
+        if e <= s:
             continue
-        seen.add(key)
-        out.append(ln.astype(np.float32, copy=False))
-    return out
+
+        piece_start = vc
+        sa = _signed_distance(coords, s, normal, center)
+        in_a = sa >= threshold
+        if in_a:
+            out_c[vc] = coords[s]
+            vc += 1
+
+        for i in range(s + 1, e):
+            sb = _signed_distance(coords, i, normal, center)
+            in_b = sb >= threshold
+
+            if in_a and in_b:
+                out_c[vc] = coords[i]
+                vc += 1
+            elif in_a and (not in_b):
+                _write_intersection(coords, i - 1, i, sa, sb, out_c, vc)
+                # np.allclose(prev, p, atol=EPS) 相当なら交点を足さない。
+                dup = vc > piece_start
+                if dup:
+                    for k in range(3):
+                        diff = abs(np.float64(out_c[vc - 1, k]) - np.float64(out_c[vc, k]))
+                        if diff > EPS + 1e-5 * abs(np.float64(out_c[vc, k])):
+                            dup = False
+                            break
+                if not dup:
+                    vc += 1
+                oc += 1
+                out_o[oc] = vc
+                piece_start = vc
+            elif (not in_a) and in_b:
+                _write_intersection(coords, i - 1, i, sa, sb, out_c, vc)
+                vc += 1
+                out_c[vc] = coords[i]
+                vc += 1
+
+            sa = sb
+            in_a = in_b
+
+        if vc > piece_start:
+            oc += 1
+            out_o[oc] = vc
+
+    return out_c[:vc].copy(), out_o[: oc + 1].copy()
+
+
+def _dedup_lines(coords: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """EPS 格子で量子化した内容が一致するポリラインを、初出だけ残して除く。"""
+    inv = 1.0 / EPS if EPS > 0 else 1e6
+    q = np.rint(coords.astype(np.float32, copy=False) * inv).astype(np.int64)
+    keep = unique_polyline_mask(q, offsets)
+    return select_polylines(coords, offsets, keep)
 
 
 __all__ = ["mirror3d"]
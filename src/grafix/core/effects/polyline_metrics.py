@@ -0,0 +1,175 @@
+"""RealizedGeometry のポリライン単位の集計値（長さ・閉判定・bbox・重心）をまとめて求める。
+
+各 effect が線ごとの Python ループで同じ量を再計算しないよう、coords/offsets 全体に対する
+一括計算（numba / ufunc.reduceat）を 1 箇所に集約し、RealizedGeometry インスタンスごとに
+メモ化する。
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import njit  # type: ignore[import-untyped]
+
+from grafix.core.realized_geometry import InstancedGeometry, RealizedGeometry
+
+
+@njit(cache=True)
+def _length_metrics_nb(
+    coords: np.ndarray, offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n_lines = offsets.shape[0] - 1
+    lengths = np.zeros(n_lines, dtype=np.float64)
+    closing = np.zeros(n_lines, dtype=np.float64)
+    gaps = np.full(n_lines, np.inf, dtype=np.float64)
+    for li in range(n_lines):
+        s = offsets[li]
+        e = offsets[li + 1]
+        if e - s < 2:
+            continue
+        acc = 0.0
+        for i in range(s, e - 1):
+            dx = np.float64(coords[i + 1, 0]) - np.float64(coords[i, 0])
+            dy = np.float64(coords[i + 1, 1]) - np.float64(coords[i, 1])
+            dz = np.float64(coords[i + 1, 2]) - np.float64(coords[i, 2])
+            acc += np.sqrt(dx * dx + dy * dy + dz * dz)
+        lengths[li] = acc
+
+        dx = np.float64(coords[s, 0]) - np.float64(coords[e - 1, 0])
+        dy = np.float64(coords[s, 1]) - np.float64(coords[e - 1, 1])
+        dz = np.float64(coords[s, 2]) - np.float64(coords[e - 1, 2])
+        closing[li] = np.sqrt(dx * dx + dy * dy + dz * dz)
+        gaps[li] = max(abs(dx), abs(dy), abs(dz))
+    return lengths, closing, gaps
+
+
+class PolylineMetrics:
+    """1 つの RealizedGeometry に対するポリライン単位の集計値。
+
+    各値は初回アクセス時に全ポリライン分を一括計算し、以後は同じ配列を返す。
+    返す配列は writeable=False。
+
+    Parameters
+    ----------
+    coords : np.ndarray
+        float32 型 shape (N, 3) の頂点配列。
+    offsets : np.ndarray
+        int32 型 shape (M+1,) のポリライン開始インデックス配列。
+    """
+
+    __slots__ = ("coords", "offsets", "_values")
+
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray) -> None:
+        self.coords = coords
+        self.offsets = offsets
+        self._values: dict[str, np.ndarray] = {}
+
+    @property
+    def n_lines(self) -> int:
+        """ポリライン本数。"""
+        return max(0, int(self.offsets.size) - 1)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """(M,) int64。各ポリラインの頂点数。"""
+        values = self._values
+        if "counts" not in values:
+            values["counts"] = _frozen(np.diff(self.offsets).astype(np.int64))
+        return values["counts"]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """(M,) float64。各ポリラインの（開いた）折れ線長。頂点 2 未満は 0。"""
+        self._ensure_length_metrics()
+        return self._values["lengths"]
+
+    @property
+    def closing_lengths(self) -> np.ndarray:
+        """(M,) float64。終点→始点の距離。頂点 2 未満は 0。"""
+        self._ensure_length_metrics()
+        return self._values["closing_lengths"]
+
+    @property
+    def endpoint_gaps(self) -> np.ndarray:
+        """(M,) float64。始点と終点の成分ごとの差の最大値。頂点 2 未満は inf。"""
+        self._ensure_length_metrics()
+        return self._values["endpoint_gaps"]
+
+    def is_closed(self, atol: float) -> np.ndarray:
+        """(M,) bool。始点と終点が各成分 atol 以内で一致するか（`np.allclose(rtol=0)` 相当）。"""
+        return self.endpoint_gaps <= float(atol)
+
+    @property
+    def bbox_min(self) -> np.ndarray:
+        """(M, 3) float64。各ポリラインの最小座標。空ポリラインは NaN。"""
+        self._ensure_bbox()
+        return self._values["bbox_min"]
+
+    @property
+    def bbox_max(self) -> np.ndarray:
+        """(M, 3) float64。各ポリラインの最大座標。空ポリラインは NaN。"""
+        self._ensure_bbox()
+        return self._values["bbox_max"]
+
+    @property
+    def centroids(self) -> np.ndarray:
+        """(M, 3) float64。各ポリラインの頂点平均。空ポリラインは NaN。"""
+        values = self._values
+        if "centroids" not in values:
+            out = np.full((self.n_lines, 3), np.nan, dtype=np.float64)
+            nonempty = self.counts > 0
+            if np.any(nonempty):
+                sums = np.add.reduceat(
+                    self.coords.astype(np.float64), self.offsets[:-1][nonempty], axis=0
+                )
+                out[nonempty] = sums / self.counts[nonempty, None]
+            values["centroids"] = _frozen(out)
+        return values["centroids"]
+
+    def _ensure_length_metrics(self) -> None:
+        values = self._values
+        if "lengths" in values:
+            return
+        lengths, closing, gaps = _length_metrics_nb(
+            self.coords, self.offsets.astype(np.int64, copy=False)
+        )
+        values["closing_lengths"] = _frozen(closing)
+        values["endpoint_gaps"] = _frozen(gaps)
+        values["lengths"] = _frozen(lengths)
+
+    def _ensure_bbox(self) -> None:
+        values = self._values
+        if "bbox_min" in values:
+            return
+        lo = np.full((self.n_lines, 3), np.nan, dtype=np.float64)
+        hi = np.full((self.n_lines, 3), np.nan, dtype=np.float64)
+        nonempty = self.counts > 0
+        if np.any(nonempty):
+            # 空ポリラインを除いた開始位置なら、reduceat の区間はちょうど各ポリラインになる。
+            starts = self.offsets[:-1][nonempty]
+            lo[nonempty] = np.minimum.reduceat(self.coords, starts, axis=0)
+            hi[nonempty] = np.maximum.reduceat(self.coords, starts, axis=0)
+        values["bbox_max"] = _frozen(hi)
+        values["bbox_min"] = _frozen(lo)
+
+
+def polyline_metrics(realized: RealizedGeometry) -> PolylineMetrics:
+    """RealizedGeometry のポリライン集計値を返す（インスタンスごとにメモ化）。
+
+    realize キャッシュは同じ GeometryId に同じインスタンスを返すので、
+    同じ入力を参照する effect 同士・フレーム間で計算結果を共有できる。
+    """
+    if isinstance(realized, InstancedGeometry):
+        realized = realized.expand()
+    metrics = realized._metrics
+    if metrics is None:
+        metrics = PolylineMetrics(realized.coords, realized.offsets)
+        object.__setattr__(realized, "_metrics", metrics)
+    return metrics
+
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+__all__ = ["PolylineMetrics", "polyline_metrics"]
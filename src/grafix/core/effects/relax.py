@@ -26,99 +26,117 @@ def _empty_geometry() -> RealizedGeometry:
     return RealizedGeometry(coords=coords, offsets=offsets)
 
 
-def _iter_ranges(offsets: np.ndarray):
-    for i in range(int(offsets.size) - 1):
-        s = int(offsets[i])
-        e = int(offsets[i + 1])
-        yield s, e
-
-
 def _build_nodes(coords: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
-    """座標配列からユニークノードと頂点→ノード対応を作る（完全一致のみ）。"""
-    index_by_xyz: dict[tuple[float, float, float], int] = {}
-    vertex_to_node = np.empty((coords.shape[0],), dtype=np.int64)
-    nodes: list[tuple[float, float, float]] = []
-
-    for i in range(int(coords.shape[0])):
-        key = (float(coords[i, 0]), float(coords[i, 1]), float(coords[i, 2]))
-        idx = index_by_xyz.get(key)
-        if idx is None:
-            idx = len(nodes)
-            index_by_xyz[key] = idx
-            nodes.append(key)
-        vertex_to_node[i] = int(idx)
-
-    nodes_arr = np.asarray(nodes, dtype=np.float64)
+    """座標配列からユニークノードと頂点→ノード対応を作る（完全一致のみ）。
+
+    ノード番号は初出順に振る。-0.0 と 0.0 は同一点として扱う。
+    """
+    # +0.0 を足して -0.0 を 0.0 に揃え、xyz の float32 バイト列をキーにする。
+    keyed = np.ascontiguousarray(coords, dtype=np.float32) + np.float32(0.0)
+    keys = keyed.view(np.dtype((np.void, keyed.dtype.itemsize * 3))).ravel()
+    _uniq, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    # np.unique はキーのソート順なので、初出順に番号を振り直す。
+    order = np.argsort(first_index, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.shape[0])
+    vertex_to_node = rank[inverse.ravel()].astype(np.int64, copy=False)
+    nodes_arr = coords[first_index[order]].astype(np.float64)
     return nodes_arr, vertex_to_node
 
 
 def _build_edges(offsets: np.ndarray, vertex_to_node: np.ndarray) -> np.ndarray:
-    edges: set[tuple[int, int]] = set()
-    for s, e in _iter_ranges(offsets):
-        for i in range(int(s), int(e) - 1):
-            a = int(vertex_to_node[i])
-            b = int(vertex_to_node[i + 1])
-            if a == b:
-                continue
-            if a < b:
-                edges.add((a, b))
-            else:
-                edges.add((b, a))
-
-    if not edges:
+    """ポリラインの隣接頂点対から重複なしの無向辺 (a < b) をソート済みで返す。"""
+    n_vertices = int(vertex_to_node.shape[0])
+    if n_vertices < 2:
         return np.zeros((0, 2), dtype=np.int64)
-    return np.asarray(sorted(edges), dtype=np.int64)
 
+    # 線の境界をまたぐ頂点対（前の線の終点 → 次の線の始点）を除く。
+    same_line = np.ones((n_vertices - 1,), dtype=np.bool_)
+    boundaries = offsets[1:-1].astype(np.int64) - 1
+    same_line[boundaries[(boundaries >= 0) & (boundaries < n_vertices - 1)]] = False
+
+    a = vertex_to_node[:-1][same_line]
+    b = vertex_to_node[1:][same_line]
+    distinct = a != b
+    lo = np.minimum(a[distinct], b[distinct])
+    hi = np.maximum(a[distinct], b[distinct])
+    if lo.size == 0:
+        return np.zeros((0, 2), dtype=np.int64)
 
-def _build_adjacency(num_nodes: int, edges: np.ndarray) -> list[list[int]]:
-    adjacency: list[list[int]] = [[] for _ in range(int(num_nodes))]
-    for k in range(int(edges.shape[0])):
-        a = int(edges[k, 0])
-        b = int(edges[k, 1])
-        adjacency[a].append(b)
-        adjacency[b].append(a)
-    return adjacency
+    num_nodes = int(vertex_to_node.max()) + 1
+    packed = np.unique(lo * num_nodes + hi)
+    return np.stack([packed // num_nodes, packed % num_nodes], axis=1)
 
 
-def _compute_fixed(nodes: np.ndarray, edges: np.ndarray) -> np.ndarray:
-    """固定点マスクを作る（次数!=2 + 連結成分の min/max）。"""
-    num_nodes = int(nodes.shape[0])
-    degrees = np.zeros((num_nodes,), dtype=np.int64)
-    for k in range(int(edges.shape[0])):
-        degrees[int(edges[k, 0])] += 1
-        degrees[int(edges[k, 1])] += 1
+def _build_adjacency(num_nodes: int, edges: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """CSR 形式の隣接リスト (indptr, indices) を作る。
+
+    各ノードの隣接は辺の並び順（= 辺リストへ順に追加した場合と同じ順）に並ぶ。
+    """
+    m = int(edges.shape[0])
+    src = np.concatenate([edges[:, 0], edges[:, 1]])
+    dst = np.concatenate([edges[:, 1], edges[:, 0]])
+    edge_order = np.concatenate([np.arange(m), np.arange(m)])
+    perm = np.lexsort((edge_order, src))
+    indptr = np.zeros((int(num_nodes) + 1,), dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=int(num_nodes)), out=indptr[1:])
+    return indptr, dst[perm].astype(np.int64, copy=False)
 
-    fixed = degrees != 2
 
-    adjacency = _build_adjacency(num_nodes, edges)
-    visited = np.zeros((num_nodes,), dtype=np.bool_)
-    stack: list[int] = []
+@njit(cache=True)
+def _fix_component_extremes_nb(nodes, indptr, indices, fixed):
+    """連結成分ごとに各軸の min/max ノードを固定する。
 
-    for start in range(num_nodes):
+    成分は未訪問の最小番号ノードから反復 DFS で辿り、同値の候補は訪問順で先のものを選ぶ。
+    """
+    n = nodes.shape[0]
+    visited = np.zeros(n, dtype=np.bool_)
+    stack = np.empty(n, dtype=np.int64)
+    component = np.empty(n, dtype=np.int64)
+
+    for start in range(n):
         if visited[start]:
             continue
         visited[start] = True
-        stack.append(int(start))
-        component: list[int] = []
-        while stack:
-            i = stack.pop()
-            component.append(int(i))
-            for nb in adjacency[i]:
+        stack[0] = start
+        top = 1
+        size = 0
+        while top > 0:
+            top -= 1
+            i = stack[top]
+            component[size] = i
+            size += 1
+            for k in range(indptr[i], indptr[i + 1]):
+                nb = indices[k]
                 if visited[nb]:
                     continue
                 visited[nb] = True
-                stack.append(int(nb))
-
-        comp_nodes = nodes[np.asarray(component, dtype=np.int64)]
-        if comp_nodes.shape[0] == 0:
-            continue
+                stack[top] = nb
+                top += 1
 
         for axis in range(3):
-            min_local = int(np.argmin(comp_nodes[:, axis]))
-            max_local = int(np.argmax(comp_nodes[:, axis]))
-            fixed[component[min_local]] = True
-            fixed[component[max_local]] = True
+            min_node = component[0]
+            max_node = component[0]
+            for c in range(1, size):
+                node = component[c]
+                value = nodes[node, axis]
+                if value < nodes[min_node, axis]:
+                    min_node = node
+                if value > nodes[max_node, axis]:
+                    max_node = node
+            fixed[min_node] = True
+            fixed[max_node] = True
+
+
+def _compute_fixed(nodes: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """固定点マスクを作る（次数!=2 + 連結成分の min/max）。"""
+    num_nodes = int(nodes.shape[0])
+    degrees = np.bincount(edges.ravel(), minlength=num_nodes)
+    fixed = degrees != 2
 
+    indptr, indices = _build_adjacency(num_nodes, edges)
+    _fix_component_extremes_nb(nodes, indptr, indices, fixed)
     return fixed.astype(np.bool_, copy=False)
 
 
@@ -2,15 +2,13 @@
 
 from __future__ import annotations
 
-import math
 from typing import Sequence
 
 import numpy as np
-from numba import njit  # type: ignore[import-untyped]
 
 from grafix.core.effect_registry import effect
 from grafix.core.parameters.meta import ParamMeta
-from grafix.core.realized_geometry import RealizedGeometry
+from grafix.core.realized_geometry import InstancedGeometry, RealizedGeometry
 
 repeat_meta = {
     "count": ParamMeta(kind="int", ui_min=0, ui_max=100),
@@ -32,109 +30,56 @@ def _empty_geometry() -> RealizedGeometry:
     return RealizedGeometry(coords=coords, offsets=offsets)
 
 
-@njit(cache=True, fastmath=True)  # type: ignore[misc]
-def _repeat_fill_all(
-    base_coords: np.ndarray,
-    base_offsets_tail: np.ndarray,
+def _repeat_transforms(
     n_dups: int,
     curve: float,
     cumulative_scale: bool,
     cumulative_offset: bool,
     cumulative_rotate: bool,
     center: np.ndarray,
-    out_coords: np.ndarray,
-    out_offsets: np.ndarray,
     offset_end: np.ndarray,
     scale_end: np.ndarray,
     rotate_end: np.ndarray,
-) -> None:
-    """repeat の全コピーを 1 カーネルで生成する。"""
-    n_vertices = base_coords.shape[0]
-    n_lines = base_offsets_tail.shape[0]
+) -> np.ndarray:
+    """各コピーのアフィン変換 (copies, 3, 4) を返す（k=0 は恒等変換）。"""
     copies = n_dups + 1
-
-    out_offsets[0] = 0
-
-    cx = float(center[0])
-    cy = float(center[1])
-    cz = float(center[2])
-
-    off_end_x = float(offset_end[0])
-    off_end_y = float(offset_end[1])
-    off_end_z = float(offset_end[2])
-    scale_end_x = float(scale_end[0])
-    scale_end_y = float(scale_end[1])
-    scale_end_z = float(scale_end[2])
-    rot_end_x = float(rotate_end[0])
-    rot_end_y = float(rotate_end[1])
-    rot_end_z = float(rotate_end[2])
-    curve_f = float(curve)
-
-    for k in range(copies):
-        v_start = k * n_vertices
-
-        o_start = 1 + k * n_lines
-        for li in range(n_lines):
-            out_offsets[o_start + li] = int(base_offsets_tail[li]) + int(v_start)
-
-        if k == 0:
-            for i in range(n_vertices):
-                out_coords[v_start + i, 0] = base_coords[i, 0]
-                out_coords[v_start + i, 1] = base_coords[i, 1]
-                out_coords[v_start + i, 2] = base_coords[i, 2]
-            continue
-
-        t = float(k) / float(n_dups)
-        if cumulative_scale or cumulative_offset or cumulative_rotate:
-            t_curve = t**curve_f
-        else:
-            t_curve = t
-
-        t_scale = t_curve if cumulative_scale else t
-        t_offset = t_curve if cumulative_offset else t
-        t_rotate = t_curve if cumulative_rotate else t
-
-        sx = 1.0 + (scale_end_x - 1.0) * t_scale
-        sy = 1.0 + (scale_end_y - 1.0) * t_scale
-        sz = 1.0 + (scale_end_z - 1.0) * t_scale
-
-        ox = off_end_x * t_offset
-        oy = off_end_y * t_offset
-        oz = off_end_z * t_offset
-
-        rx = rot_end_x * t_rotate
-        ry = rot_end_y * t_rotate
-        rz = rot_end_z * t_rotate
-
-        sin_x = math.sin(rx)
-        cos_x = math.cos(rx)
-        sin_y = math.sin(ry)
-        cos_y = math.cos(ry)
-        sin_z = math.sin(rz)
-        cos_z = math.cos(rz)
-
-        r00 = cos_y * cos_z
-        r01 = sin_x * sin_y * cos_z - cos_x * sin_z
-        r02 = cos_x * sin_y * cos_z + sin_x * sin_z
-        r10 = cos_y * sin_z
-        r11 = sin_x * sin_y * sin_z + cos_x * cos_z
-        r12 = cos_x * sin_y * sin_z - sin_x * cos_z
-        r20 = -sin_y
-        r21 = sin_x * cos_y
-        r22 = cos_x * cos_y
-
-        for i in range(n_vertices):
-            x = (float(base_coords[i, 0]) - cx) * sx
-            y = (float(base_coords[i, 1]) - cy) * sy
-            z = (float(base_coords[i, 2]) - cz) * sz
-
-            rx0 = x * r00 + y * r01 + z * r02
-            ry0 = x * r10 + y * r11 + z * r12
-            rz0 = x * r20 + y * r21 + z * r22
-
-            out_coords[v_start + i, 0] = rx0 + cx + ox
-            out_coords[v_start + i, 1] = ry0 + cy + oy
-            out_coords[v_start + i, 2] = rz0 + cz + oz
+    t = np.arange(copies, dtype=np.float64) / float(n_dups)
+    if cumulative_scale or cumulative_offset or cumulative_rotate:
+        t_curve = t ** float(curve)
+    else:
+        t_curve = t
+
+    t_scale = (t_curve if cumulative_scale else t)[:, None]
+    t_offset = (t_curve if cumulative_offset else t)[:, None]
+    t_rotate = (t_curve if cumulative_rotate else t)[:, None]
+
+    c = center.astype(np.float64)
+    s = 1.0 + (scale_end.astype(np.float64) - 1.0) * t_scale
+    o = offset_end.astype(np.float64) * t_offset
+    r = rotate_end.astype(np.float64) * t_rotate
+
+    sin_x, sin_y, sin_z = np.sin(r[:, 0]), np.sin(r[:, 1]), np.sin(r[:, 2])
+    cos_x, cos_y, cos_z = np.cos(r[:, 0]), np.cos(r[:, 1]), np.cos(r[:, 2])
+
+    # 回転は旧仕様（Rz・Ry・Rx の合成）。
+    rot = np.empty((copies, 3, 3), dtype=np.float64)
+    rot[:, 0, 0] = cos_y * cos_z
+    rot[:, 0, 1] = sin_x * sin_y * cos_z - cos_x * sin_z
+    rot[:, 0, 2] = cos_x * sin_y * cos_z + sin_x * sin_z
+    rot[:, 1, 0] = cos_y * sin_z
+    rot[:, 1, 1] = sin_x * sin_y * sin_z + cos_x * cos_z
+    rot[:, 1, 2] = cos_x * sin_y * sin_z - sin_x * cos_z
+    rot[:, 2, 0] = -sin_y
+    rot[:, 2, 1] = sin_x * cos_y
+    rot[:, 2, 2] = cos_x * cos_y
+
+    # p' = R @ (S * (p - c)) + c + o = (R S) @ p + (c + o - (R S) @ c)
+    linear = rot * s[:, None, :]
+    transforms = np.empty((copies, 3, 4), dtype=np.float64)
+    transforms[:, :, 0:3] = linear
+    transforms[:, :, 3] = c + o - linear @ c
+    transforms[0] = np.eye(3, 4)
+    return transforms
 
 
 @effect(meta=repeat_meta)
@@ -182,7 +127,7 @@ def repeat(
     Returns
     -------
     RealizedGeometry
-        複製後の実体ジオメトリ。
+        複製後の実体ジオメトリ（`InstancedGeometry`。座標配列は参照時に展開される）。
 
     Notes
     -----
@@ -200,7 +145,6 @@ def repeat(
     if n_dups <= 0:
         return base
 
-    n_vertices = int(base.coords.shape[0])
     n_lines = int(base.offsets.size) - 1
     if n_lines <= 0:
         return base
@@ -232,24 +176,15 @@ def repeat(
     )
     rotate_end = np.deg2rad(rotate_end_deg).astype(np.float32, copy=False)
 
-    copies = n_dups + 1
-    out_coords = np.empty((n_vertices * copies, 3), dtype=np.float32)
-    out_offsets = np.empty((n_lines * copies + 1,), dtype=np.int32)
-    base_tail = base.offsets[1:]
-    _repeat_fill_all(
-        base.coords,
-        base_tail,
+    transforms = _repeat_transforms(
         int(n_dups),
         float(curve),
         bool(cumulative_scale),
         bool(cumulative_offset),
         bool(cumulative_rotate),
         center32,
-        out_coords,
-        out_offsets,
         offset_end,
         scale_end,
         rotate_end,
     )
-
-    return RealizedGeometry(coords=out_coords, offsets=out_offsets)
+    return InstancedGeometry(base, transforms)
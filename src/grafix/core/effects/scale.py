@@ -10,6 +10,8 @@ from grafix.core.effect_registry import effect
 from grafix.core.parameters.meta import ParamMeta
 from grafix.core.realized_geometry import RealizedGeometry
 
+from .polyline_metrics import polyline_metrics
+
 _CLOSED_ATOL = 1e-6
 
 scale_meta = {
@@ -20,12 +22,6 @@ scale_meta = {
 }
 
 
-def _is_closed_polyline(vertices: np.ndarray) -> bool:
-    if vertices.shape[0] < 2:
-        return False
-    return bool(np.allclose(vertices[0], vertices[-1], rtol=0.0, atol=_CLOSED_ATOL))
-
-
 @effect(meta=scale_meta)
 def scale(
     inputs: Sequence[RealizedGeometry],
@@ -88,27 +84,30 @@ def scale(
         coords = scaled.astype(np.float32, copy=False)
         return RealizedGeometry(coords=coords, offsets=base.offsets)
 
-    coords64 = base.coords.astype(np.float64, copy=True)
+    metrics = polyline_metrics(base)
+    counts = metrics.counts
+    is_closed = metrics.is_closed(_CLOSED_ATOL)
+    if mode_s == "by_line":
+        selected = (counts > 0) & ~is_closed
+        centers = metrics.centroids
+    else:  # mode_s == "by_face"
+        selected = is_closed
+        # 閉曲線の重複終点を除いた平均を中心にする（[start, end - 1) の和を直接取る）。
+        centers = np.zeros((counts.size, 3), dtype=np.float64)
+        if np.any(selected):
+            bounds = np.stack(
+                [base.offsets[:-1][selected], base.offsets[1:][selected] - 1], axis=1
+            ).ravel()
+            sums = np.add.reduceat(base.coords.astype(np.float64), bounds, axis=0)[::2]
+            centers[selected] = sums / (counts[selected, None] - 1)
+
     offsets = base.offsets
-    for i in range(int(offsets.size) - 1):
-        s = int(offsets[i])
-        e = int(offsets[i + 1])
-        if e <= s:
-            continue
-
-        v = coords64[s:e]
-        is_closed = _is_closed_polyline(v)
-
-        if mode_s == "by_line":
-            if is_closed:
-                continue
-            center = v.mean(axis=0)
-        else:  # mode_s == "by_face"
-            if not is_closed:
-                continue
-            center = v[:-1].mean(axis=0)
-
-        coords64[s:e] = (v - center) * factors + center
+    coords64 = base.coords.astype(np.float64, copy=True)
+    vertex_center = np.repeat(centers, counts, axis=0)
+    vertex_selected = np.repeat(selected, counts)
+    v = coords64[vertex_selected]
+    c = vertex_center[vertex_selected]
+    coords64[vertex_selected] = (v - c) * factors + c
 
     coords = coords64.astype(np.float32, copy=False)
     return RealizedGeometry(coords=coords, offsets=offsets)
@@ -0,0 +1,272 @@
+"""平面線分の交差判定を一様グリッドのバケットで絞り込む numba ユーティリティ。
+
+全ペア判定（O(n·m)）の代わりに、線分を通過セルへ登録しておき、
+問い合わせ線分が通るセルに登録された線分だけを候補として返す。
+線分の追加を逐次行えるので、交差のたびに辺を分割していくグラフ構築
+（weave など）からも使える。
+
+グリッドは配列のタプル `(geom, head, entries, used)` で表し、すべて njit 関数から扱う。
+
+- geom: float64 (6,) = [x0, y0, cell, inv_cell, nx, ny]
+- head: int64 (nx*ny,) 各セルの連結リスト先頭（-1 で空）
+- entries: int64 (capacity, 2) 各要素 = [segment_id, next]
+- used: int64 (1,) entries の使用数
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from numba import njit  # type: ignore[import-untyped]
+
+# セル境界付近の丸め誤差で取りこぼさないよう、範囲をわずかに広げる（bbox 対角比）。
+_PAD_REL = 1e-9
+
+
+@njit(cache=True)
+def segment_grid_create(
+    xmin: float, ymin: float, xmax: float, ymax: float, n_segments_hint: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """bbox を覆う正方セルのグリッドを作る（セル数は線分数の目安から決める）。"""
+    w = max(xmax - xmin, 1e-12)
+    h = max(ymax - ymin, 1e-12)
+    n_cells = max(1, min(int(n_segments_hint), 65_536))
+    cell = math.sqrt(w * h / n_cells)
+    cell = max(cell, max(w, h) / 256.0)
+    nx = max(1, int(math.ceil(w / cell)))
+    ny = max(1, int(math.ceil(h / cell)))
+
+    geom = np.empty(6, dtype=np.float64)
+    geom[0] = xmin
+    geom[1] = ymin
+    geom[2] = cell
+    geom[3] = 1.0 / cell
+    geom[4] = nx
+    geom[5] = ny
+    head = np.full(nx * ny, -1, dtype=np.int64)
+    entries = np.empty((max(16, 4 * int(n_segments_hint)), 2), dtype=np.int64)
+    used = np.zeros(1, dtype=np.int64)
+    return geom, head, entries, used
+
+
+@njit(cache=True)
+def _clamp_index(v: float, n: int) -> int:
+    if v < 0.0:
+        return 0
+    if v >= n - 1:
+        return n - 1
+    return int(v)
+
+
+@njit(cache=True)
+def _segment_column_spans(
+    geom: np.ndarray, ax: float, ay: float, bx: float, by: float
+) -> tuple[int, np.ndarray, np.ndarray]:
+    """線分が通る各列 (col0 + k) の行範囲 [row_lo[k], row_hi[k]] を返す。"""
+    x0 = geom[0]
+    y0 = geom[1]
+    cell = geom[2]
+    inv = geom[3]
+    nx = int(geom[4])
+    ny = int(geom[5])
+    pad = _PAD_REL * cell * (nx + ny)
+
+    lo_x = min(ax, bx)
+    hi_x = max(ax, bx)
+    col0 = _clamp_index((lo_x - pad - x0) * inv, nx)
+    col1 = _clamp_index((hi_x + pad - x0) * inv, nx)
+    n_cols = col1 - col0 + 1
+    row_lo = np.empty(n_cols, dtype=np.int64)
+    row_hi = np.empty(n_cols, dtype=np.int64)
+
+    dx = bx - ax
+    for k in range(n_cols):
+        c = col0 + k
+        if abs(dx) <= 1e-300:
+            ya = ay
+            yb = by
+        else:
+            # 列の x 区間と線分の x 区間の共通部分における y 範囲。
+            xl = max(lo_x, x0 + c * cell)
+            xr = min(hi_x, x0 + (c + 1) * cell)
+            if xl > xr:
+                xl = xr = min(max(x0 + c * cell, lo_x), hi_x)
+            ya = ay + (xl - ax) / dx * (by - ay)
+            yb = ay + (xr - ax) / dx * (by - ay)
+        y_lo = min(ya, yb)
+        y_hi = max(ya, yb)
+        row_lo[k] = _clamp_index((y_lo - pad - y0) * inv, ny)
+        row_hi[k] = _clamp_index((y_hi + pad - y0) * inv, ny)
+    return col0, row_lo, row_hi
+
+
+@njit(cache=True)
+def segment_grid_insert(
+    geom: np.ndarray,
+    head: np.ndarray,
+    entries: np.ndarray,
+    used: np.ndarray,
+    segment_id: int,
+    ax: float,
+    ay: float,
+    bx: float,
+    by: float,
+) -> np.ndarray:
+    """線分を通過セルへ登録する。容量不足なら拡張した entries を返す。"""
+    ny = int(geom[5])
+    col0, row_lo, row_hi = _segment_column_spans(geom, ax, ay, bx, by)
+    for k in range(row_lo.shape[0]):
+        for r in range(row_lo[k], row_hi[k] + 1):
+            n = used[0]
+            if n >= entries.shape[0]:
+                grown = np.empty((2 * entries.shape[0], 2), dtype=np.int64)
+                grown[:n] = entries[:n]
+                entries = grown
+            cell_index = (col0 + k) * ny + r
+            entries[n, 0] = segment_id
+            entries[n, 1] = head[cell_index]
+            head[cell_index] = n
+            used[0] = n + 1
+    return entries
+
+
+@njit(cache=True)
+def segment_grid_query(
+    geom: np.ndarray,
+    head: np.ndarray,
+    entries: np.ndarray,
+    ax: float,
+    ay: float,
+    bx: float,
+    by: float,
+    stamps: np.ndarray,
+    stamp: int,
+) -> np.ndarray:
+    """線分 AB が通るセルに登録された線分 id を昇順・重複なしで返す。
+
+    stamps は segment_id で引く作業配列（呼び出しごとに異なる stamp 値を渡す）。
+    候補は交差の「可能性がある」線分であり、厳密判定は呼び出し側で行う。
+    """
+    ny = int(geom[5])
+    col0, row_lo, row_hi = _segment_column_spans(geom, ax, ay, bx, by)
+    n_found = 0
+    found = np.empty(16, dtype=np.int64)
+    for k in range(row_lo.shape[0]):
+        for r in range(row_lo[k], row_hi[k] + 1):
+            e = head[(col0 + k) * ny + r]
+            while e >= 0:
+                sid = entries[e, 0]
+                if stamps[sid] != stamp:
+                    stamps[sid] = stamp
+                    if n_found >= found.shape[0]:
+                        grown = np.empty(2 * found.shape[0], dtype=np.int64)
+                        grown[:n_found] = found[:n_found]
+                        found = grown
+                    found[n_found] = sid
+                    n_found += 1
+                e = entries[e, 1]
+    out = found[:n_found]
+    out.sort()
+    return out
+
+
+@njit(fastmath=True, cache=True)
+def segment_intersection(
+    ax: float, ay: float, bx: float, by: float, px: float, py: float, qx: float, qy: float
+) -> tuple[bool, float, float, float]:
+    """線分 AB と PQ の交差判定。(hit, AB 上のパラメータ t, 交点 x, 交点 y) を返す。"""
+    r_x = bx - ax
+    r_y = by - ay
+    s_x = qx - px
+    s_y = qy - py
+    rxs = r_x * s_y - r_y * s_x
+    if abs(rxs) < 1e-8:
+        return False, 0.0, 0.0, 0.0
+    qp_x = px - ax
+    qp_y = py - ay
+    t = (qp_x * s_y - qp_y * s_x) / rxs
+    u = (qp_x * r_y - qp_y * r_x) / rxs
+    if t < 0 or t > 1 or u < 0 or u > 1:
+        return False, 0.0, 0.0, 0.0
+    return True, t, ax + t * r_x, ay + t * r_y
+
+
+def segment_intersections(
+    segments_a: np.ndarray, segments_b: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """2 つの線分集合の交差ペアをグリッドで求める。
+
+    Parameters
+    ----------
+    segments_a, segments_b : np.ndarray
+        float64 shape (N, 4) / (M, 4) の線分 `[ax, ay, bx, by]`。
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        `(index_a, index_b, points)`。points は float64 shape (K, 2) の交点。
+        index_a 昇順、同じ index_a 内では index_b 昇順。
+    """
+    a = np.ascontiguousarray(segments_a, dtype=np.float64).reshape(-1, 4)
+    b = np.ascontiguousarray(segments_b, dtype=np.float64).reshape(-1, 4)
+    if a.shape[0] == 0 or b.shape[0] == 0:
+        return (
+            np.zeros((0,), dtype=np.int64),
+            np.zeros((0,), dtype=np.int64),
+            np.zeros((0, 2), dtype=np.float64),
+        )
+    return _segment_intersections_nb(a, b)
+
+
+@njit(cache=True)
+def _segment_intersections_nb(
+    a: np.ndarray, b: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    xmin = min(a[:, 0].min(), a[:, 2].min(), b[:, 0].min(), b[:, 2].min())
+    xmax = max(a[:, 0].max(), a[:, 2].max(), b[:, 0].max(), b[:, 2].max())
+    ymin = min(a[:, 1].min(), a[:, 3].min(), b[:, 1].min(), b[:, 3].min())
+    ymax = max(a[:, 1].max(), a[:, 3].max(), b[:, 1].max(), b[:, 3].max())
+    geom, head, entries, used = segment_grid_create(xmin, ymin, xmax, ymax, b.shape[0])
+    for j in range(b.shape[0]):
+        entries = segment_grid_insert(
+            geom, head, entries, used, j, b[j, 0], b[j, 1], b[j, 2], b[j, 3]
+        )
+
+    stamps = np.full(b.shape[0], -1, dtype=np.int64)
+    cap = 16
+    ia = np.empty(cap, dtype=np.int64)
+    ib = np.empty(cap, dtype=np.int64)
+    pts = np.empty((cap, 2), dtype=np.float64)
+    n = 0
+    for i in range(a.shape[0]):
+        ax, ay, bx, by = a[i, 0], a[i, 1], a[i, 2], a[i, 3]
+        cand = segment_grid_query(geom, head, entries, ax, ay, bx, by, stamps, i)
+        for j in cand:
+            hit, _t, x, y = segment_intersection(ax, ay, bx, by, b[j, 0], b[j, 1], b[j, 2], b[j, 3])
+            if not hit:
+                continue
+            if n >= cap:
+                cap *= 2
+                ia2 = np.empty(cap, dtype=np.int64)
+                ib2 = np.empty(cap, dtype=np.int64)
+                pts2 = np.empty((cap, 2), dtype=np.float64)
+                ia2[:n] = ia[:n]
+                ib2[:n] = ib[:n]
+                pts2[:n] = pts[:n]
+                ia, ib, pts = ia2, ib2, pts2
+            ia[n] = i
+            ib[n] = j
+            pts[n, 0] = x
+            pts[n, 1] = y
+            n += 1
+    return ia[:n].copy(), ib[:n].copy(), pts[:n].copy()
+
+
+__all__ = [
+    "segment_grid_create",
+    "segment_grid_insert",
+    "segment_grid_query",
+    "segment_intersection",
+    "segment_intersections",
+]
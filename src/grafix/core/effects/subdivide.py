@@ -5,9 +5,10 @@ from __future__ import annotations
 from typing import Sequence
 
 import numpy as np
-from numba import njit  # type: ignore[import-untyped]
+from numba import njit, prange  # type: ignore[import-untyped]
 
 from grafix.core.effect_registry import effect
+from grafix.core.env import env_flag
 from grafix.core.realized_geometry import RealizedGeometry
 from grafix.core.parameters.meta import ParamMeta
 
@@ -16,11 +17,17 @@ MAX_SUBDIVISIONS = 10
 MIN_SEG_LEN = 0.01
 MIN_SEG_LEN_SQ = float(MIN_SEG_LEN * MIN_SEG_LEN)
 MAX_TOTAL_VERTICES = 10_000_000
+_F32_EPS = float(np.finfo(np.float32).eps)
 
 subdivide_meta = {
     "subdivisions": ParamMeta(kind="int", ui_min=0, ui_max=MAX_SUBDIVISIONS),
 }
 
+# 環境変数で `prange` による線単位の並列 fill を有効化する（既定は直列）。
+PARALLEL_ENV = "GRAFIX_SUBDIVIDE_PARALLEL"
+# 並列化する最小出力頂点数（スレッド起動コストを下回る入力は直列のまま）。
+PARALLEL_MIN_VERTICES = 65_536
+
 
 def _empty_geometry() -> RealizedGeometry:
     coords = np.zeros((0, 3), dtype=np.float32)
@@ -54,6 +61,10 @@ def subdivide(
     - 初期状態で最短セグメント長が `MIN_SEG_LEN` 未満なら、そのポリラインは細分化しない。
     - 細分化の途中で最短セグメント長が `MIN_SEG_LEN` 未満になった場合、そこで反復を停止する。
     - 出力合計頂点数が `MAX_TOTAL_VERTICES` を超えないようにガードする。
+
+    出力サイズを先に確定し、1 つの出力配列へ直接書き込む。
+    環境変数 `GRAFIX_SUBDIVIDE_PARALLEL=1` で線単位の並列書き込みを使う
+    （出力 `PARALLEL_MIN_VERTICES` 頂点以上のみ）。
     """
     if not inputs:
         return _empty_geometry()
@@ -76,74 +87,148 @@ def subdivide(
     if n_lines <= 0:
         return base
 
-    out_lines: list[np.ndarray] = []
-    total_vertices = 0
-    for li in range(n_lines):
-        s = int(offsets[li])
-        e = int(offsets[li + 1])
-        vertices = coords[s:e]
-
-        base_n = int(vertices.shape[0])
-        remaining = MAX_TOTAL_VERTICES - total_vertices
-        if remaining <= 0 or remaining < base_n:
-            break
-
-        subdivided = _subdivide_core(vertices, divisions, int(remaining))
-        out_lines.append(subdivided)
-        total_vertices += int(subdivided.shape[0])
-
-    if not out_lines:
+    # ---- 2 パス実装（count → fill、全ポリラインを 1 カーネルで処理） ----------
+    src = np.ascontiguousarray(coords, dtype=np.float32)
+    src_offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    levels = np.empty(n_lines, dtype=np.int64)
+    n_kept = int(_plan_levels(src, src_offsets, divisions, MAX_TOTAL_VERTICES, levels))
+    if n_kept <= 0:
         return _empty_geometry()
 
-    offsets_out = np.zeros((len(out_lines) + 1,), dtype=np.int32)
-    acc = 0
-    coords_list: list[np.ndarray] = []
-    for i, line in enumerate(out_lines):
-        line32 = np.asarray(line, dtype=np.float32)
-        coords_list.append(line32)
-        acc += int(line32.shape[0])
-        offsets_out[i + 1] = acc
+    levels = levels[:n_kept]
+    counts = np.diff(src_offsets[: n_kept + 1])
+    out_counts = np.where(counts > 0, (counts - 1) * (1 << levels) + 1, 0)
+    offsets_out = np.zeros((n_kept + 1,), dtype=np.int64)
+    np.cumsum(out_counts, out=offsets_out[1:])
+    coords_out = np.empty((int(offsets_out[-1]), 3), dtype=np.float32)
 
-    coords_out = (
-        np.concatenate(coords_list, axis=0) if coords_list else np.zeros((0, 3), dtype=np.float32)
-    )
-    return RealizedGeometry(coords=coords_out, offsets=offsets_out)
+    use_parallel = env_flag(PARALLEL_ENV) and coords_out.shape[0] >= PARALLEL_MIN_VERTICES
+    fill = _fill_subdivided_parallel if use_parallel else _fill_subdivided
+    fill(src, src_offsets, levels, offsets_out, coords_out)
+    return RealizedGeometry(coords=coords_out, offsets=offsets_out.astype(np.int32))
 
 
 @njit(fastmath=True, cache=True)
-def _subdivide_core(vertices: np.ndarray, subdivisions: int, max_vertices: int) -> np.ndarray:
-    """単一頂点配列の細分化処理（旧仕様踏襲の Numba 経路）。"""
-    n0 = vertices.shape[0]
-    if n0 < 2 or subdivisions <= 0:
-        return vertices
+def _plan_levels(coords, offsets, subdivisions, max_total_vertices, levels):
+    """各線の細分回数を決め、出力に含める線の本数を返す。
 
-    d0 = vertices[1:] - vertices[:-1]
-    if d0.shape[0] > 0:
-        dsq0 = d0[:, 0] * d0[:, 0] + d0[:, 1] * d0[:, 1] + d0[:, 2] * d0[:, 2]
-        if np.min(dsq0) < MIN_SEG_LEN_SQ:  # type: ignore[operator]
-            return vertices
+    合計頂点数の上限は先頭の線から順に消費する（上限に達した以降の線は出力しない）。
+    細分化で各セグメントはほぼ半分になるため、停止判定は初期の最短セグメント長の 1/4**k で見積もる。
+    見積もりが `MIN_SEG_LEN` に近い（float32 の丸めで判定が入れ替わり得る）線だけは、
+    実際に中点を挿入して各段の最短セグメント長を測る（旧実装と同じ判定）。
+    """
+    total = 0
+    for li in range(offsets.shape[0] - 1):
+        a = offsets[li]
+        b = offsets[li + 1]
+        n = b - a
+        remaining = max_total_vertices - total
+        if remaining <= 0 or remaining < n:
+            return li
+
+        level = 0
+        if n >= 2:
+            min_dsq = np.inf
+            max_abs = 0.0
+            for j in range(a, b - 1):
+                dx = coords[j + 1, 0] - coords[j, 0]
+                dy = coords[j + 1, 1] - coords[j, 1]
+                dz = coords[j + 1, 2] - coords[j, 2]
+                dsq = dx * dx + dy * dy + dz * dz
+                if dsq < min_dsq:
+                    min_dsq = dsq
+            for j in range(a, b):
+                for k in range(3):
+                    v = abs(coords[j, k])
+                    if v > max_abs:
+                        max_abs = v
+            if min_dsq >= MIN_SEG_LEN_SQ:
+                # 中点の丸め誤差（座標の大きさに比例し、段ごとに積み上がる）を見込んだ余裕。
+                tol = MIN_SEG_LEN * 1e-3 + 8.0 * _F32_EPS * max_abs * (subdivisions + 1)
+                est_dsq = min_dsq
+                ambiguous = False
+                for _ in range(subdivisions):
+                    new_n = 2 * n - 1
+                    if new_n > remaining:
+                        break
+                    n = new_n
+                    level += 1
+                    est_dsq *= 0.25
+                    if abs(np.sqrt(est_dsq) - MIN_SEG_LEN) <= tol:
+                        ambiguous = True
+                        break
+                    if est_dsq < MIN_SEG_LEN_SQ:
+                        break
+                if ambiguous:
+                    level = _measured_level(coords, a, b, subdivisions, remaining)
+                    n = (b - a - 1) * (1 << level) + 1
+
+        levels[li] = level
+        total += n
+    return offsets.shape[0] - 1
 
-    subdivisions = subdivisions if subdivisions <= MAX_SUBDIVISIONS else MAX_SUBDIVISIONS
 
-    result = vertices.copy()
+@njit(fastmath=True, cache=True)
+def _measured_level(coords, a, b, subdivisions, remaining):
+    """1 本の線を実際に細分化し、各段の最短セグメント長で停止判定した細分回数を返す。"""
+    result = coords[a:b].copy()
+    level = 0
     for _ in range(subdivisions):
         n = result.shape[0]
-        if n < 2:
-            break
-
         new_n = 2 * n - 1
-        if max_vertices > 0 and new_n > max_vertices:
+        if new_n > remaining:
             break
-
-        new_vertices = np.empty((new_n, result.shape[1]), dtype=result.dtype)
+        new_vertices = np.empty((new_n, 3), dtype=result.dtype)
         new_vertices[::2] = result
-        new_vertices[1::2] = (result[:-1] + result[1:]) / 2
+        new_vertices[1::2] = (result[:-1] + result[1:]) * np.float32(0.5)
         result = new_vertices
+        level += 1
+
+        min_dsq = np.inf
+        for j in range(new_n - 1):
+            dx = result[j + 1, 0] - result[j, 0]
+            dy = result[j + 1, 1] - result[j, 1]
+            dz = result[j + 1, 2] - result[j, 2]
+            dsq = dx * dx + dy * dy + dz * dz
+            if dsq < min_dsq:
+                min_dsq = dsq
+        if min_dsq < MIN_SEG_LEN_SQ:
+            break
+    return level
+
+
+@njit(fastmath=True, cache=True)
+def _subdivide_line_into(coords, a, b, level, out, dst):
+    """1 本の線を `level` 回細分化した結果を out[dst:] へ書き込む。
+
+    元の頂点を間隔 2**level で配置し、間隔を半分にしながら両隣の中点を埋める
+    （1 段ずつ中点を挿入するのと同じ計算順）。
+    """
+    stride = 1 << level
+    for j in range(b - a):
+        out[dst + j * stride, 0] = coords[a + j, 0]
+        out[dst + j * stride, 1] = coords[a + j, 1]
+        out[dst + j * stride, 2] = coords[a + j, 2]
+
+    last = dst + (b - a - 1) * stride
+    half = np.float32(0.5)
+    step = stride
+    while step > 1:
+        h = step // 2
+        for p in range(dst + h, last, step):
+            out[p, 0] = (out[p - h, 0] + out[p + h, 0]) * half
+            out[p, 1] = (out[p - h, 1] + out[p + h, 1]) * half
+            out[p, 2] = (out[p - h, 2] + out[p + h, 2]) * half
+        step = h
+
+
+@njit(fastmath=True, cache=True)
+def _fill_subdivided(coords, offsets, levels, offsets_out, out):
+    for li in range(levels.shape[0]):
+        _subdivide_line_into(coords, offsets[li], offsets[li + 1], levels[li], out, offsets_out[li])
 
-        d = result[1:] - result[:-1]
-        if d.shape[0] > 0:
-            dsq = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] + d[:, 2] * d[:, 2]
-            if np.min(dsq) < MIN_SEG_LEN_SQ:  # type: ignore[operator]
-                break
 
-    return result
+@njit(fastmath=True, cache=True, parallel=True)
+def _fill_subdivided_parallel(coords, offsets, levels, offsets_out, out):
+    for li in prange(levels.shape[0]):
+        _subdivide_line_into(coords, offsets[li], offsets[li + 1], levels[li], out, offsets_out[li])
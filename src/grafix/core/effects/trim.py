@@ -34,35 +34,21 @@ def _clamp01(value: float) -> float:
     return v
 
 
-def _lines_to_realized(lines: Sequence[np.ndarray]) -> RealizedGeometry:
-    if not lines:
-        return _empty_geometry()
-
-    coords_list: list[np.ndarray] = []
-    offsets = np.zeros((len(lines) + 1,), dtype=np.int32)
-    cursor = 0
-    for i, line in enumerate(lines):
-        v = np.asarray(line)
-        if v.ndim != 2 or v.shape[1] != 3:
-            raise ValueError("trim: polyline は shape (N,3) が必要")
-        coords_list.append(v.astype(np.float32, copy=False))
-        cursor += int(v.shape[0])
-        offsets[i + 1] = cursor
-
-    coords = np.concatenate(coords_list, axis=0) if coords_list else np.zeros((0, 3), np.float32)
-    return RealizedGeometry(coords=coords, offsets=offsets)
-
-
 @njit(cache=True, fastmath=True)  # type: ignore[misc]
-def _build_arc_length_nb(v: np.ndarray) -> np.ndarray:
-    n = v.shape[0]
-    s = np.empty(n, dtype=np.float64)
-    s[0] = 0.0
-    for j in range(n - 1):
-        dx = v[j + 1, 0] - v[j, 0]
-        dy = v[j + 1, 1] - v[j, 1]
-        dz = v[j + 1, 2] - v[j, 2]
-        s[j + 1] = s[j] + np.sqrt(dx * dx + dy * dy + dz * dz)
+def _build_arc_lengths_nb(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """全ポリラインの累積弧長を 1 配列に計算する（各線の先頭は 0）。"""
+    s = np.empty(coords.shape[0], dtype=np.float64)
+    for li in range(offsets.shape[0] - 1):
+        a = offsets[li]
+        b = offsets[li + 1]
+        if b <= a:
+            continue
+        s[a] = 0.0
+        for j in range(a, b - 1):
+            dx = coords[j + 1, 0] - coords[j, 0]
+            dy = coords[j + 1, 1] - coords[j, 1]
+            dz = coords[j + 1, 2] - coords[j, 2]
+            s[j + 1] = s[j] + np.sqrt(dx * dx + dy * dy + dz * dz)
     return s
 
 
@@ -144,22 +130,22 @@ def _allclose3(a0: float, a1: float, a2: float, b0: float, b1: float, b2: float)
 
 
 @njit(cache=True, fastmath=True)  # type: ignore[misc]
-def _trim_polyline_nb(
+def _trim_plan_nb(
     vertices: np.ndarray,
+    distances: np.ndarray,
     start_param: float,
     end_param: float,
-) -> np.ndarray:
+) -> tuple[int, int, int, bool, float, float, float, float, float, float]:
+    """1 本の線（2 点以上、全長 > 0）のトリム結果の形を求める。
+
+    Returns
+    -------
+    tuple
+        `(out_n, start_i, interior_count, add_end, sx, sy, sz, ex, ey, ez)`。
+        `out_n < 2` の線は出力しない。
+    """
     n = vertices.shape[0]
-    distances = _build_arc_length_nb(vertices)
     total = float(distances[n - 1])
-    if total == 0.0:
-        out = np.empty((n, 3), dtype=np.float32)
-        for j in range(n):
-            out[j, 0] = vertices[j, 0]
-            out[j, 1] = vertices[j, 1]
-            out[j, 2] = vertices[j, 2]
-        return out
-
     start_dist = float(start_param) * total
     end_dist = float(end_param) * total
 
@@ -184,38 +170,73 @@ def _trim_polyline_nb(
 
     add_end = not _allclose3(last_x, last_y, last_z, ex, ey, ez)
     out_n = 1 + interior_count + (1 if add_end else 0)
-    if out_n < 2:
-        return np.empty((0, 3), dtype=np.float32)
+    return out_n, start_i, interior_count, add_end, sx, sy, sz, ex, ey, ez
 
-    out = np.empty((out_n, 3), dtype=np.float32)
-    out[0, 0] = np.float32(sx)
-    out[0, 1] = np.float32(sy)
-    out[0, 2] = np.float32(sz)
 
-    for j in range(interior_count):
-        src = start_i + j
-        dst = 1 + j
-        out[dst, 0] = vertices[src, 0]
-        out[dst, 1] = vertices[src, 1]
-        out[dst, 2] = vertices[src, 2]
-
-    if add_end:
-        di = out_n - 1
-        out[di, 0] = np.float32(ex)
-        out[di, 1] = np.float32(ey)
-        out[di, 2] = np.float32(ez)
-
-    return out
+@njit(cache=True, fastmath=True)  # type: ignore[misc]
+def _count_trimmed_nb(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    distances: np.ndarray,
+    start_param: float,
+    end_param: float,
+    vertex_counts: np.ndarray,
+) -> None:
+    """各線の出力頂点数を数える（-1 は「線ごと捨てる」）。"""
+    for li in range(offsets.shape[0] - 1):
+        a = offsets[li]
+        b = offsets[li + 1]
+        n = b - a
+        # 2 点未満の線と全長 0 の線はそのまま残す。
+        if n < 2 or distances[b - 1] == 0.0:
+            vertex_counts[li] = n
+            continue
+        out_n = _trim_plan_nb(coords[a:b], distances[a:b], start_param, end_param)[0]
+        vertex_counts[li] = out_n if out_n >= 2 else -1
 
 
-def _trim_polyline(vertices: np.ndarray, start_param: float, end_param: float) -> np.ndarray | None:
-    if vertices.shape[0] < 2:
-        return vertices
+@njit(cache=True, fastmath=True)  # type: ignore[misc]
+def _fill_trimmed_nb(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    distances: np.ndarray,
+    start_param: float,
+    end_param: float,
+    vertex_counts: np.ndarray,
+    vertex_starts: np.ndarray,
+    out_c: np.ndarray,
+) -> None:
+    """count 結果の位置へトリム後の頂点を書き込む。"""
+    for li in range(offsets.shape[0] - 1):
+        count = vertex_counts[li]
+        if count < 0:
+            continue
+        a = offsets[li]
+        b = offsets[li + 1]
+        dst = vertex_starts[li]
+        if b - a < 2 or distances[b - 1] == 0.0:
+            for j in range(b - a):
+                out_c[dst + j, 0] = coords[a + j, 0]
+                out_c[dst + j, 1] = coords[a + j, 1]
+                out_c[dst + j, 2] = coords[a + j, 2]
+            continue
 
-    out = _trim_polyline_nb(vertices.astype(np.float32, copy=False), start_param, end_param)
-    if out.shape[0] < 2:
-        return None
-    return out
+        vertices = coords[a:b]
+        out_n, start_i, interior_count, add_end, sx, sy, sz, ex, ey, ez = _trim_plan_nb(
+            vertices, distances[a:b], start_param, end_param
+        )
+        out_c[dst, 0] = np.float32(sx)
+        out_c[dst, 1] = np.float32(sy)
+        out_c[dst, 2] = np.float32(sz)
+        for j in range(interior_count):
+            out_c[dst + 1 + j, 0] = vertices[start_i + j, 0]
+            out_c[dst + 1 + j, 1] = vertices[start_i + j, 1]
+            out_c[dst + 1 + j, 2] = vertices[start_i + j, 2]
+        if add_end:
+            di = dst + out_n - 1
+            out_c[di, 0] = np.float32(ex)
+            out_c[di, 1] = np.float32(ey)
+            out_c[di, 2] = np.float32(ez)
 
 
 @effect(meta=trim_meta)
@@ -262,27 +283,31 @@ def trim(
     if sp >= ep:
         return base
 
-    results: list[np.ndarray] = []
-    n_lines = int(offsets.size) - 1
-    for i in range(n_lines):
-        s = int(offsets[i])
-        e = int(offsets[i + 1])
-        line = coords[s:e]
-        if line.shape[0] < 2:
-            results.append(line)
-            continue
+    # ---- 2 パス実装（count → fill、全ポリラインを 1 カーネルで処理） ----------
+    src = np.ascontiguousarray(coords, dtype=np.float32)
+    src_offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    distances = _build_arc_lengths_nb(src, src_offsets)
 
-        trimmed = _trim_polyline(line, sp, ep)
-        if trimmed is not None and trimmed.shape[0] >= 2:
-            results.append(trimmed)
+    n_lines = int(offsets.size) - 1
+    vertex_counts = np.empty(n_lines, dtype=np.int64)
+    _count_trimmed_nb(src, src_offsets, distances, sp, ep, vertex_counts)
 
-    if not results:
+    kept = vertex_counts >= 0
+    kept_counts = vertex_counts[kept]
+    total_vertices = int(kept_counts.sum())
+    if kept_counts.size == 0 or total_vertices == 0:
         return base
 
-    out = _lines_to_realized(results)
-    if out.coords.shape[0] == 0 and base.coords.shape[0] != 0:
-        return base
-    return out
+    vertex_starts = np.zeros(n_lines, dtype=np.int64)
+    vertex_starts[kept] = np.cumsum(kept_counts) - kept_counts
+    out_coords = np.empty((total_vertices, 3), dtype=np.float32)
+    _fill_trimmed_nb(
+        src, src_offsets, distances, sp, ep, vertex_counts, vertex_starts, out_coords
+    )
+
+    out_offsets = np.zeros((kept_counts.size + 1,), dtype=np.int32)
+    np.cumsum(kept_counts, out=out_offsets[1:])
+    return RealizedGeometry(coords=out_coords, offsets=out_offsets)
 
 
 __all__ = ["trim", "trim_meta"]
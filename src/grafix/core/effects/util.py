@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 import numpy as np
 from numba import njit  # type: ignore[import-untyped]
 
@@ -153,3 +155,115 @@ def transform_back(
 
     # Apply inverse rotation
     return _apply_row_mat(result, rotation_matrix)
+
+
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+@njit(cache=True)
+def _polyline_hashes(quantized: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """量子化済み座標 (N, 3) int64 から、ポリラインごとの 64bit ハッシュを求める。"""
+    n_lines = offsets.shape[0] - 1
+    out = np.empty(n_lines, dtype=np.uint64)
+    for li in range(n_lines):
+        s = offsets[li]
+        e = offsets[li + 1]
+        h = _FNV_OFFSET ^ np.uint64(e - s)
+        for i in range(s, e):
+            for k in range(3):
+                h = (h ^ np.uint64(quantized[i, k])) * _FNV_PRIME
+        # 下位ビットをテーブル添字に使うので、上位ビットを混ぜておく。
+        h ^= h >> np.uint64(32)
+        out[li] = h
+    return out
+
+
+@njit(cache=True)
+def _same_polyline(quantized: np.ndarray, offsets: np.ndarray, a: int, b: int) -> bool:
+    sa = offsets[a]
+    sb = offsets[b]
+    n = offsets[a + 1] - sa
+    if offsets[b + 1] - sb != n:
+        return False
+    for i in range(n):
+        for k in range(3):
+            if quantized[sa + i, k] != quantized[sb + i, k]:
+                return False
+    return True
+
+
+@njit(cache=True)
+def _unique_polyline_mask_nb(
+    quantized: np.ndarray, offsets: np.ndarray, hashes: np.ndarray
+) -> np.ndarray:
+    n_lines = hashes.shape[0]
+    keep = np.zeros(n_lines, dtype=np.bool_)
+    size = 1
+    while size < 2 * n_lines:
+        size *= 2
+    mask = np.uint64(size - 1)
+    table = np.full(size, -1, dtype=np.int64)
+
+    for li in range(n_lines):
+        if offsets[li + 1] == offsets[li]:
+            continue
+        h = hashes[li]
+        slot = np.int64(h & mask)
+        duplicate = False
+        while table[slot] >= 0:
+            other = table[slot]
+            # 全内容の比較はハッシュ一致時のみ。
+            if hashes[other] == h and _same_polyline(quantized, offsets, li, other):
+                duplicate = True
+                break
+            slot = (slot + 1) & (size - 1)
+        if not duplicate:
+            table[slot] = li
+            keep[li] = True
+    return keep
+
+
+def unique_polyline_mask(quantized: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """量子化済み座標が完全一致するポリラインの重複を除くマスクを返す。
+
+    Parameters
+    ----------
+    quantized : np.ndarray
+        量子化済み座標 (N, 3) int64。
+    offsets : np.ndarray
+        ポリライン境界 (M+1,)。
+
+    Returns
+    -------
+    np.ndarray
+        (M,) bool。各内容の初出だけ True（頂点 0 のポリラインは False）。
+    """
+    q = np.ascontiguousarray(quantized, dtype=np.int64)
+    o = np.asarray(offsets, dtype=np.int64)
+    if o.size < 2:
+        return np.zeros((0,), dtype=np.bool_)
+    hashes = _polyline_hashes(q, o)
+    return _unique_polyline_mask_nb(q, o, hashes)
+
+
+def concat_polylines(lines: Sequence[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """ポリライン列を float32 coords と int32 offsets へまとめる。"""
+    counts = np.fromiter((int(ln.shape[0]) for ln in lines), dtype=np.int32, count=len(lines))
+    offsets = np.zeros((counts.size + 1,), dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    if not lines:
+        return np.zeros((0, 3), dtype=np.float32), offsets
+    coords = np.concatenate(lines, axis=0).astype(np.float32, copy=False)
+    return coords, offsets
+
+
+def select_polylines(
+    coords: np.ndarray, offsets: np.ndarray, keep: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """keep が True のポリラインだけを残した coords/offsets を返す。"""
+    counts = np.diff(offsets)[keep]
+    vertex_keep = np.repeat(keep, np.diff(offsets))
+    new_offsets = np.zeros((counts.size + 1,), dtype=np.int32)
+    np.cumsum(counts, out=new_offsets[1:])
+    return coords[vertex_keep], new_offsets
@@ -8,6 +8,8 @@
 from __future__ import annotations
 
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Sequence
 
 import numpy as np
@@ -15,8 +17,16 @@ from numba import njit, types  # type: ignore[import-untyped]
 from numba.typed import List  # type: ignore[attr-defined]
 
 from grafix.core.effect_registry import effect
+from grafix.core.env import env_flag
 from grafix.core.parameters.meta import ParamMeta
 from grafix.core.realized_geometry import RealizedGeometry
+from .polyline_metrics import polyline_metrics
+from .segment_grid import (
+    segment_grid_create,
+    segment_grid_insert,
+    segment_grid_query,
+    segment_intersection,
+)
 from .util import transform_back, transform_to_xy_plane
 
 weave_meta = {
@@ -29,6 +39,14 @@ MAX_NUM_CANDIDATE_LINES = 500
 MAX_RELAXATION_ITERATIONS = 50
 MAX_STEP = 0.5
 
+# 環境変数で閉曲線ごとのスレッド並列を有効化する（既定は直列）。
+# 主要カーネルは nogil なので、スレッドプールでも複数コアを使える。
+PARALLEL_ENV = "GRAFIX_WEAVE_PARALLEL"
+# 並列化する最小閉曲線数（スレッド起動コストを下回る入力は直列のまま）。
+PARALLEL_MIN_CURVES = 4
+# 辺の交差候補をグリッドで絞る最小境界辺数（これ未満は全辺の線形走査の方が速い）。
+GRID_MIN_BOUNDARY_EDGES = 1024
+
 
 def _empty_geometry() -> RealizedGeometry:
     coords = np.zeros((0, 3), dtype=np.float32)
@@ -65,12 +83,6 @@ def _lines_to_realized(lines: Sequence[np.ndarray]) -> RealizedGeometry:
     return RealizedGeometry(coords=coords, offsets=offsets)
 
 
-def _is_closed_polyline(vertices: np.ndarray) -> bool:
-    if vertices.shape[0] < 2:
-        return False
-    return bool(np.allclose(vertices[0], vertices[-1], rtol=0.0, atol=1e-6))
-
-
 @effect(meta=weave_meta)
 def weave(
     inputs: Sequence[RealizedGeometry],
@@ -100,6 +112,10 @@ def weave(
     Notes
     -----
     開ポリライン（始点と終点が一致しない線）は対象外とし、そのまま返す。
+
+    環境変数 `GRAFIX_WEAVE_PARALLEL=1` で閉曲線ごとにスレッドプールで並列処理する
+    （`PARALLEL_MIN_CURVES` 本以上の入力のみ）。各閉曲線の結果は独立・決定的なので、
+    入力順に連結した出力は直列版と一致する。
     """
     if not inputs:
         return _empty_geometry()
@@ -120,27 +136,37 @@ def weave(
     if step_size > MAX_STEP:
         step_size = MAX_STEP
 
+    metrics = polyline_metrics(base)
+    webify = (metrics.counts >= 3) & metrics.is_closed(1e-6)
+    if not np.any(webify):
+        return base
+
+    polylines = list(_iter_polylines(base))
+    targets = [polylines[i] for i in np.flatnonzero(webify)]
+
+    def _webify(vertices: np.ndarray) -> list[np.ndarray]:
+        return _webify_single_polyline(
+            vertices,
+            num_candidate_lines=num_lines,
+            relaxation_iterations=iterations,
+            step=step_size,
+        )
+
+    use_parallel = env_flag(PARALLEL_ENV) and len(targets) >= PARALLEL_MIN_CURVES
+    if use_parallel:
+        n_workers = min(len(targets), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            webs = iter(list(executor.map(_webify, targets)))
+    else:
+        webs = map(_webify, targets)
+
     out_lines: list[np.ndarray] = []
-    did_webify = False
-    for vertices in _iter_polylines(base):
-        if vertices.shape[0] < 3:
-            out_lines.append(vertices)
-            continue
-        if not _is_closed_polyline(vertices):
+    for vertices, is_target in zip(polylines, webify):
+        if is_target:
+            out_lines.extend(next(webs))
+        else:
             out_lines.append(vertices)
-            continue
-        did_webify = True
-        out_lines.extend(
-            _webify_single_polyline(
-                vertices,
-                num_candidate_lines=num_lines,
-                relaxation_iterations=iterations,
-                step=step_size,
-            )
-        )
 
-    if not did_webify:
-        return base
     return _lines_to_realized(out_lines)
 
 
@@ -162,26 +188,6 @@ def _webify_single_polyline(
     return [transform_back(poly, R, z) for poly in polylines_xy]
 
 
-@njit(fastmath=True, cache=True)
-def line_segment_intersection_nb(Ax, Ay, Bx, By, p0x, p0y, p1x, p1y):
-    r_x = Bx - Ax
-    r_y = By - Ay
-    s_x = p1x - p0x
-    s_y = p1y - p0y
-    rxs = r_x * s_y - r_y * s_x
-    if abs(rxs) < 1e-8:
-        return False, 0.0, 0.0, 0.0
-    qp_x = p0x - Ax
-    qp_y = p0y - Ay
-    t = (qp_x * s_y - qp_y * s_x) / rxs
-    u = (qp_x * r_y - qp_y * r_x) / rxs
-    if t < 0 or t > 1 or u < 0 or u > 1:
-        return False, 0.0, 0.0, 0.0
-    inter_x = Ax + t * r_x
-    inter_y = Ay + t * r_y
-    return True, t, inter_x, inter_y
-
-
 @njit(fastmath=True, cache=True, inline="always")
 def fract(x):
     return x - math.floor(x)
@@ -432,6 +438,7 @@ def trace_cycle(start, adjacency, adjacency_edge_ids, visited_edges, max_cycle_l
     types.ListType(types.float64[:, :])(types.float64[:, :], types.int64[:, :]),
     fastmath=True,
     cache=True,
+    nogil=True,
 )
 def merge_edges_into_polylines(nodes, edges):
     """ノード集合とエッジから連結成分をポリラインへ変換する。"""
@@ -493,7 +500,31 @@ def merge_edges_into_polylines(nodes, edges):
     return polylines
 
 
-@njit(fastmath=True, cache=True)
+@njit(fastmath=True, cache=True, nogil=True)
+def _collect_hits(
+    edge_ids, n_ids, edges, valid_edges, nodes, A_x, A_y, B_x, B_y, hit_e, hit_t, hit_x, hit_y
+):
+    """edge_ids[:n_ids] の辺と候補線 AB の交点を id の並び順に書き出し、個数を返す。"""
+    n_hit = 0
+    for k in range(n_ids):
+        e = edge_ids[k]
+        if not valid_edges[e]:
+            continue
+        i = edges[e, 0]
+        j = edges[e, 1]
+        hit, t_val, ix, iy = segment_intersection(
+            A_x, A_y, B_x, B_y, nodes[i, 0], nodes[i, 1], nodes[j, 0], nodes[j, 1]
+        )
+        if hit:
+            hit_e[n_hit] = e
+            hit_t[n_hit] = t_val
+            hit_x[n_hit] = ix
+            hit_y[n_hit] = iy
+            n_hit += 1
+    return n_hit
+
+
+@njit(fastmath=True, cache=True, nogil=True)
 def create_web_nb(closed_curve, num_candidate_lines, relaxation_iterations, step):
     n = closed_curve.shape[0]
     max_nodes = n + 2 * num_candidate_lines
@@ -513,6 +544,46 @@ def create_web_nb(closed_curve, num_candidate_lines, relaxation_iterations, step
         valid_edges[i] = True
     current_m = n
 
+    # 候補線との交差判定:
+    # 境界辺が少ないうちは全辺の線形走査が最速なのでそのまま使う。境界辺が多いときは
+    # - 境界由来の辺（境界辺とその分割片）を一様グリッドへ登録し、候補線が通るセルの辺だけを調べる。
+    # - 候補線由来の辺（弦とその分割片）は閉曲線を横断する長い線分で、互いにほぼ全て交差するため
+    #   グリッドでは絞れない。こちらは id 順の一覧を線形に調べる。
+    # 両者の交点を辺 id 昇順にマージするので、全辺を走査した場合と同じ交点が同じ順で集まる。
+    use_grid = n >= GRID_MIN_BOUNDARY_EDGES
+    xmin = closed_curve[:, 0].min()
+    xmax = closed_curve[:, 0].max()
+    ymin = closed_curve[:, 1].min()
+    ymax = closed_curve[:, 1].max()
+    geom, head, grid_entries, grid_used = segment_grid_create(
+        xmin, ymin, xmax, ymax, n if use_grid else 1
+    )
+    if use_grid:
+        for e in range(n):
+            grid_entries = segment_grid_insert(
+                geom,
+                head,
+                grid_entries,
+                grid_used,
+                e,
+                nodes[edges[e, 0], 0],
+                nodes[edges[e, 0], 1],
+                nodes[edges[e, 1], 0],
+                nodes[edges[e, 1], 1],
+            )
+    stamps = np.full(max_edges, -1, dtype=np.int64)
+    is_chord = np.zeros(max_edges, dtype=np.bool_)
+    chord_ids = np.empty(max_edges, dtype=np.int64)
+    n_chord = 0
+    hit_e_g = np.empty(max_edges, dtype=np.int64)
+    hit_t_g = np.empty(max_edges, dtype=np.float64)
+    hit_x_g = np.empty(max_edges, dtype=np.float64)
+    hit_y_g = np.empty(max_edges, dtype=np.float64)
+    hit_e_c = np.empty(max_edges, dtype=np.int64)
+    hit_t_c = np.empty(max_edges, dtype=np.float64)
+    hit_x_c = np.empty(max_edges, dtype=np.float64)
+    hit_y_c = np.empty(max_edges, dtype=np.float64)
+
     for cl in range(num_candidate_lines):
         A_x, A_y, B_x, B_y = generate_best_candidate_line_from_curve_nb(
             closed_curve, cl, base_seed=0, n_attempts=2
@@ -524,24 +595,53 @@ def create_web_nb(closed_curve, num_candidate_lines, relaxation_iterations, step
         int_y = np.empty(max_int, dtype=np.float64)
         count = 0
 
-        for e in range(current_m):
-            if not valid_edges[e]:
-                continue
-            i = edges[e, 0]
-            j = edges[e, 1]
-            p0x = nodes[i, 0]
-            p0y = nodes[i, 1]
-            p1x = nodes[j, 0]
-            p1y = nodes[j, 1]
-            hit, t_val, ix, iy = line_segment_intersection_nb(
-                A_x, A_y, B_x, B_y, p0x, p0y, p1x, p1y
+        if use_grid:
+            grid_ids = segment_grid_query(
+                geom, head, grid_entries, A_x, A_y, B_x, B_y, stamps, cl
+            )
+            n_hit_g = _collect_hits(
+                grid_ids, grid_ids.shape[0], edges, valid_edges, nodes,
+                A_x, A_y, B_x, B_y, hit_e_g, hit_t_g, hit_x_g, hit_y_g,
             )
-            if hit and count < max_int:
-                t_vals[count] = t_val
-                edge_indices[count] = e
-                int_x[count] = ix
-                int_y[count] = iy
+            n_hit_c = _collect_hits(
+                chord_ids, n_chord, edges, valid_edges, nodes,
+                A_x, A_y, B_x, B_y, hit_e_c, hit_t_c, hit_x_c, hit_y_c,
+            )
+            gi = 0
+            ci = 0
+            while (gi < n_hit_g or ci < n_hit_c) and count < max_int:
+                if ci >= n_hit_c or (gi < n_hit_g and hit_e_g[gi] < hit_e_c[ci]):
+                    edge_indices[count] = hit_e_g[gi]
+                    t_vals[count] = hit_t_g[gi]
+                    int_x[count] = hit_x_g[gi]
+                    int_y[count] = hit_y_g[gi]
+                    gi += 1
+                else:
+                    edge_indices[count] = hit_e_c[ci]
+                    t_vals[count] = hit_t_c[ci]
+                    int_x[count] = hit_x_c[ci]
+                    int_y[count] = hit_y_c[ci]
+                    ci += 1
                 count += 1
+        else:
+            for e in range(current_m):
+                if not valid_edges[e]:
+                    continue
+                i = edges[e, 0]
+                j = edges[e, 1]
+                p0x = nodes[i, 0]
+                p0y = nodes[i, 1]
+                p1x = nodes[j, 0]
+                p1y = nodes[j, 1]
+                hit, t_val, ix, iy = segment_intersection(
+                    A_x, A_y, B_x, B_y, p0x, p0y, p1x, p1y
+                )
+                if hit and count < max_int:
+                    t_vals[count] = t_val
+                    edge_indices[count] = e
+                    int_x[count] = ix
+                    int_y[count] = iy
+                    count += 1
 
         if count >= 2:
             min1 = 1.0e9
@@ -600,6 +700,32 @@ def create_web_nb(closed_curve, num_candidate_lines, relaxation_iterations, step
                 valid_edges[current_m] = True
                 current_m += 1
 
+                if use_grid:
+                    # 分割片は元の辺の種別を引き継ぎ、新しい弦は候補線由来として扱う。
+                    is_chord[current_m - 5] = is_chord[e1]
+                    is_chord[current_m - 4] = is_chord[e1]
+                    is_chord[current_m - 3] = is_chord[e2]
+                    is_chord[current_m - 2] = is_chord[e2]
+                    is_chord[current_m - 1] = True
+                    for e_new in range(current_m - 5, current_m):
+                        if is_chord[e_new]:
+                            chord_ids[n_chord] = e_new
+                            n_chord += 1
+                            continue
+                        a = edges[e_new, 0]
+                        b = edges[e_new, 1]
+                        grid_entries = segment_grid_insert(
+                            geom,
+                            head,
+                            grid_entries,
+                            grid_used,
+                            e_new,
+                            nodes[a, 0],
+                            nodes[a, 1],
+                            nodes[b, 0],
+                            nodes[b, 1],
+                        )
+
     valid_count = 0
     for e in range(current_m):
         if valid_edges[e]:
@@ -0,0 +1,32 @@
+# どこで: `src/grafix/core/env.py`。
+# 何を: `GRAFIX_*` 環境変数のフラグ/整数の読み取りを提供する。
+# なぜ: effect やランタイムの切り替えで、同じ解釈（"0"/"false"/"off" 等は無効）を共有するため。
+
+from __future__ import annotations
+
+import os
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """環境変数 name を真偽値として読む。
+
+    未設定なら default。"", "0", "false", "no", "off"（大文字小文字無視）は False、それ以外は True。
+    """
+    value = os.environ.get(name)
+    if value is None:
+        return bool(default)
+    return str(value).strip().lower() not in {"", "0", "false", "no", "off"}
+
+
+def env_int(name: str, default: int) -> int:
+    """環境変数 name を整数として読む。未設定または解釈できなければ default。"""
+    value = os.environ.get(name)
+    if value is None:
+        return int(default)
+    try:
+        return int(value)
+    except ValueError:
+        return int(default)
+
+
+__all__ = ["env_flag", "env_int"]
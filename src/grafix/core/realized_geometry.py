@@ -3,7 +3,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
+from typing import Any
 
 import numpy as np
 
@@ -23,10 +25,12 @@ class RealizedGeometry:
     -----
     不変性を契約とし、配列は writeable=False で返す。
     offsets と coords の整合性はコンストラクタ内で検証する。
+    `_metrics` はポリライン集計値のメモ化用（`effects.polyline_metrics` が設定する）。
     """
 
     coords: np.ndarray
     offsets: np.ndarray
+    _metrics: Any = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """配列形状と整合性を検証し、不変条件を満たす形に固定する。"""
@@ -105,3 +109,92 @@ def concat_realized_geometries(*geometries: RealizedGeometry) -> RealizedGeometr
 
     new_offsets_array = np.asarray(new_offsets, dtype=np.int32)
     return RealizedGeometry(coords=total_coords, offsets=new_offsets_array)
+
+
+class InstancedGeometry(RealizedGeometry):
+    """base をインスタンスごとのアフィン変換で複製した実体ジオメトリ。
+
+    Parameters
+    ----------
+    base : RealizedGeometry
+        複製元の実体ジオメトリ。
+    transforms : np.ndarray
+        float64 型 shape (K, 3, 4) のアフィン変換列。各行列 `[A | b]` で
+        インスタンス k の頂点を `A @ p + b` に写す。
+
+    Notes
+    -----
+    `coords` / `offsets` は初回アクセス時に「インスタンス順に base を連結した」
+    平坦な配列へ展開してキャッシュする（export や下流 effect 向け）。
+    描画側は `base` と `transforms` を直接使えば展開を避けられる。
+    """
+
+    __slots__ = ("base", "transforms", "_expanded", "_expand_lock")
+
+    base: RealizedGeometry
+    transforms: np.ndarray
+
+    def __init__(self, base: RealizedGeometry, transforms: np.ndarray) -> None:
+        t = np.array(transforms, dtype=np.float64)
+        if t.ndim != 3 or t.shape[1:] != (3, 4):
+            raise ValueError("transforms は shape (K,3,4) の 3 次元配列である必要がある")
+        if t.shape[0] == 0:
+            raise ValueError("transforms は少なくとも 1 インスタンスを含む必要がある")
+        t.setflags(write=False)
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "transforms", t)
+        object.__setattr__(self, "_expanded", None)
+        object.__setattr__(self, "_metrics", None)
+        object.__setattr__(self, "_expand_lock", threading.Lock())
+
+    @property
+    def n_instances(self) -> int:
+        """インスタンス数。"""
+        return int(self.transforms.shape[0])
+
+    @property
+    def coords(self) -> np.ndarray:  # type: ignore[override]
+        return self.expand().coords
+
+    @property
+    def offsets(self) -> np.ndarray:  # type: ignore[override]
+        return self.expand().offsets
+
+    def expand(self) -> RealizedGeometry:
+        """全インスタンスを連結した平坦な RealizedGeometry を返す（初回のみ計算）。"""
+        expanded = self._expanded
+        if expanded is not None:
+            return expanded
+        with self._expand_lock:
+            expanded = self._expanded
+            if expanded is None:
+                expanded = _expand_instances(self.base, self.transforms)
+                object.__setattr__(self, "_expanded", expanded)
+        return expanded
+
+    def __repr__(self) -> str:
+        return (
+            f"InstancedGeometry(base_vertices={int(self.base.coords.shape[0])}, "
+            f"n_instances={self.n_instances})"
+        )
+
+    def __reduce__(self):  # type: ignore[no-untyped-def]
+        return (InstancedGeometry, (self.base, self.transforms))
+
+
+def _expand_instances(base: RealizedGeometry, transforms: np.ndarray) -> RealizedGeometry:
+    n_vertices = int(base.coords.shape[0])
+    n_instances = int(transforms.shape[0])
+    base64 = base.coords.astype(np.float64)
+
+    coords = np.empty((n_vertices * n_instances, 3), dtype=np.float32)
+    for k in range(n_instances):
+        linear = transforms[k, :, 0:3]
+        shift = transforms[k, :, 3]
+        coords[k * n_vertices : (k + 1) * n_vertices] = base64 @ linear.T + shift
+
+    tail = base.offsets[1:].astype(np.int64)
+    offsets = np.empty((tail.size * n_instances + 1,), dtype=np.int64)
+    offsets[0] = 0
+    offsets[1:] = (tail[None, :] + n_vertices * np.arange(n_instances)[:, None]).ravel()
+    return RealizedGeometry(coords=coords, offsets=offsets.astype(np.int32))
@@ -0,0 +1,100 @@
+# どこで: `src/grafix/interactive/gl/byte_lru.py`。
+# 何を: 要素ごとのバイト数の合計で上限を決める LRU キャッシュを提供する。
+# なぜ: GPU メッシュとインデックス配列はサイズの幅が大きく、件数上限では
+#       巨大な要素がメモリを食い潰し、小さな要素同士が無駄に追い出し合うため。
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ByteLRU(Generic[K, V]):
+    """バイト数の合計が `max_bytes` 以下になるよう、最も古い要素から追い出す LRU。
+
+    Notes
+    -----
+    - 種類の違う要素（GPU メッシュとインデックス配列など）を 1 つの予算で管理できるよう、
+      キーはタプル等で名前空間を分ける想定。
+    - 追い出した要素は `on_evict(key, value)` に渡す（GPU 資源の解放など）。
+      `pop` / `remove_if` で取り出した要素は渡さない（呼び出し側が扱う）。
+    - 直前に入れた要素は、単独で予算を超えていても追い出さない（そのフレームで使うため）。
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        *,
+        on_evict: Callable[[K, V], None] | None = None,
+    ) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._on_evict = on_evict
+        self._items: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    @property
+    def nbytes(self) -> int:
+        """保持している要素のバイト数の合計。"""
+        return self._nbytes
+
+    def get(self, key: K) -> V | None:
+        """値を返し、最近使った要素として末尾へ移す。無ければ None。"""
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key: K, value: V, nbytes: int) -> None:
+        """値を入れ、予算を超えた分を古い順に追い出す。"""
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._nbytes -= old[1]
+            if old[0] is not value:
+                self._evict(key, old[0])
+        size = max(0, int(nbytes))
+        self._items[key] = (value, size)
+        self._nbytes += size
+        while self._nbytes > self.max_bytes and len(self._items) > 1:
+            old_key, (old_value, old_size) = self._items.popitem(last=False)
+            self._nbytes -= old_size
+            self._evict(old_key, old_value)
+
+    def pop(self, key: K) -> V | None:
+        """要素を取り出して返す（`on_evict` は呼ばない）。無ければ None。"""
+        item = self._items.pop(key, None)
+        if item is None:
+            return None
+        self._nbytes -= item[1]
+        return item[0]
+
+    def remove_if(self, predicate: Callable[[K], bool]) -> list[V]:
+        """キーが predicate を満たす要素をすべて取り出して返す（`on_evict` は呼ばない）。"""
+        keys = [key for key in self._items if predicate(key)]
+        removed: list[V] = []
+        for key in keys:
+            value, size = self._items.pop(key)
+            self._nbytes -= size
+            removed.append(value)
+        return removed
+
+    def values(self) -> list[V]:
+        """保持している値を古い順に返す。"""
+        return [value for value, _ in self._items.values()]
+
+    def _evict(self, key: K, value: V) -> None:
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+
+__all__ = ["ByteLRU"]
@@ -5,34 +5,142 @@
 from __future__ import annotations
 
 from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import cast
 
 import moderngl
 import numpy as np
 from pyglet.window import Window
 
-from grafix.core.realized_geometry import RealizedGeometry
+from grafix.core.realized_geometry import InstancedGeometry, RealizedGeometry
 from grafix.interactive.gl import utils as render_utils
-from grafix.interactive.gl.line_mesh import LineMesh
+from grafix.interactive.gl.byte_lru import ByteLRU
+from grafix.interactive.gl.frame_cache import FrameCache
+from grafix.interactive.gl.index_buffer import (
+    LineIndexStats,
+    LineStrips,
+    build_line_indices_and_stats,
+    build_line_segments,
+)
+from grafix.interactive.gl.layer_batch import (
+    BatchedLayer,
+    BatchedLineMesh,
+    LayerStyleTable,
+    pack_layer_batch,
+    pack_layer_styles,
+    pack_segment_batch,
+)
+from grafix.interactive.gl.line_mesh import (
+    InstancedLineMesh,
+    LineMesh,
+    QuadLineMesh,
+    RingLineMesh,
+    RingQuadLineMesh,
+)
+from grafix.interactive.gl.upload_ring import UploadRing
+from grafix.interactive.gl.vertex_format import VERTEX_STRIDES, pack_vertices
 from grafix.interactive.render_settings import RenderSettings
 from grafix.interactive.gl.shader import Shader
+from grafix.interactive.runtime.perf import PerfCollector
+
+
+# 線の太さ付け方式。
+# - "geometry": LINE_STRIP をジオメトリシェーダで四角形へ展開する（既定）。
+# - "quad": 1 線分 = 1 インスタンスの四角形として描き、端点/継ぎ目を丸める。
+#   ジオメトリシェーダが遅いドライバ/ソフトウェアラスタライザ向け。
+#   InstancedGeometry（repeat/bold）は "quad" でもジオメトリシェーダ経路で描く。
+LINE_MODES = ("geometry", "quad")
+
+# 通常レイヤー（LINE_STRIP）の頂点形式（`vertex_format.VERTEX_FORMATS` 参照）。
+# InstancedGeometry は変換に z を使うため、常に "xyz32" で送る。
+LINE_VERTEX_FORMATS = ("xy32", "xy16")
+
+DrawMesh = LineMesh | QuadLineMesh | RingLineMesh | RingQuadLineMesh
+# GL_LINE_STRIP + primitive restart のインデックス配列、またはインデックスなしの strip 範囲。
+LineDraw = np.ndarray | LineStrips
+
+# GPU メッシュとインデックス配列が共有するキャッシュの予算（バイト）。
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class MeshCacheStats:
+    """直近フレームの GPU メッシュキャッシュの集計値。"""
+
+    hits: int
+    uploads: int
+    upload_bytes: int
+    resident_bytes: int
+    budget_bytes: int
 
 
 class DrawRenderer:
     """リアルタイム描画を担うシンプルなレンダラー。"""
 
-    def __init__(self, window: Window, settings: RenderSettings) -> None:
+    def __init__(
+        self,
+        window: Window,
+        settings: RenderSettings,
+        *,
+        line_mode: str = "geometry",
+        vertex_format: str = "xy32",
+        cache_max_bytes: int = CACHE_MAX_BYTES,
+        perf: PerfCollector | None = None,
+    ) -> None:
+        fmt = str(vertex_format).strip().lower()
+        if fmt not in LINE_VERTEX_FORMATS:
+            raise ValueError(
+                f"vertex_format は {LINE_VERTEX_FORMATS} のいずれか: {vertex_format!r}"
+            )
+        self._vertex_format = fmt
         window.switch_to()
+        self._perf = perf if perf is not None else PerfCollector(enabled=False)
         self.ctx = moderngl.create_context(require=410)
         self.program = Shader.create_shader(self.ctx)
+        # repeat/bold の InstancedGeometry は base + 変換列のまま GPU へ送る。
+        self.instanced_program = Shader.create_instanced_shader(self.ctx)
+        # 多レイヤーを 1 draw call にまとめるバッチ描画用（色/太さは頂点ごとのスタイル番号で引く）。
+        self.batched_program = Shader.create_batched_shader(self.ctx)
+        # line_mode="quad" 用（ジオメトリシェーダを使わないインスタンス四角形描画）。
+        self.quad_program = Shader.create_quad_shader(self.ctx)
+        self.quad_batched_program = Shader.create_quad_batched_shader(self.ctx)
         # 動的更新用（キャッシュに乗らないケース）に 1 つだけ使い回す。
-        self._scratch_mesh = LineMesh(self.ctx, self.program)
-        # 静的ジオメトリ用の GPU メッシュキャッシュ（LRU）。
-        self._mesh_cache: OrderedDict[str, LineMesh] = OrderedDict()
+        # 通常レイヤーはリングバッファへ sub-allocate し、レイヤーごとの orphan を避ける。
+        self._upload_ring = UploadRing(self.ctx)
+        self._scratch_mesh = RingLineMesh(
+            self.ctx, self.program, self._upload_ring, vertex_format=fmt
+        )
+        self._scratch_instanced_mesh = InstancedLineMesh(self.ctx, self.instanced_program)
+        self._scratch_quad_mesh = RingQuadLineMesh(self.ctx, self.quad_program, self._upload_ring)
+        self._batch_mesh = BatchedLineMesh(self.ctx, self.batched_program, vertex_format=fmt)
+        self._batch_quad_mesh = QuadLineMesh(
+            self.ctx,
+            self.quad_batched_program,
+            segment_format="4f 1u/i",
+            attributes=("in_segment", "in_style"),
+        )
+        self._batch_styles = LayerStyleTable(self.ctx)
+        # 内容が変わらないフレームを再提示するための保存先（画面と同じ MSAA サンプル数）。
+        config = getattr(window, "config", None)
+        self._frame_cache = FrameCache(self.ctx, samples=int(getattr(config, "samples", 0) or 0))
+        # 直近にバッチへ upload したレイヤー構成（geometry_id 列）。同じなら再転送を省く。
+        self._batch_key: tuple[str, ...] | None = None
+        # 静的ジオメトリ用のキャッシュ（バイト数上限の LRU）。
+        # キーは ("mesh", geometry_id) の GPU メッシュと
+        # ("indices", geometry_id) のインデックス配列で、1 つの予算を共有する。
+        self._cache: ByteLRU[tuple[str, str], DrawMesh | tuple[np.ndarray, LineIndexStats]] = (
+            ByteLRU(cache_max_bytes, on_evict=_release_evicted_mesh)
+        )
         # 初見を即キャッシュすると「毎フレーム別 id」ケースで逆効果になりうるため、
-        # 2 回目以降にキャッシュへ昇格させる。
-        self._mesh_candidates: OrderedDict[str, None] = OrderedDict()
-        self._mesh_cache_max_items = 256
+        # 何回か登場してからキャッシュへ昇格させる（値は登場回数。`_sightings_to_promote`）。
+        self._mesh_candidates: OrderedDict[str, int] = OrderedDict()
+        self._index_candidates: OrderedDict[str, None] = OrderedDict()
         self._mesh_candidates_max_items = 512
+        # フレーム内の集計（`cache_stats`）。begin_frame でリセットする。
+        self._frame_hits = 0
+        self._frame_uploads = 0
+        self._frame_upload_bytes = 0
         self._canvas_w, self._canvas_h = settings.canvas_size
         # 射影行列はキャンバス寸法にのみ依存するため初期化時に一度設定する。
         projection = render_utils.build_projection(
@@ -40,6 +148,71 @@ class DrawRenderer:
             float(self._canvas_h),
         )
         self.program["projection"].write(projection.tobytes())
+        self.instanced_program["projection"].write(projection.tobytes())
+        self.batched_program["projection"].write(projection.tobytes())
+        self.batched_program["styles"].value = 0
+        self.quad_program["projection"].write(projection.tobytes())
+        self.quad_batched_program["projection"].write(projection.tobytes())
+        self.quad_batched_program["styles"].value = 0
+        self._line_mode = "geometry"
+        self.set_line_mode(line_mode)
+
+    @property
+    def vertex_format(self) -> str:
+        """通常レイヤーの頂点形式（`LINE_VERTEX_FORMATS` のいずれか）。"""
+        return self._vertex_format
+
+    @property
+    def max_batch_layers(self) -> int:
+        """`render_layer_batch` に一度に渡せるレイヤー数の上限（スタイル表の最大幅）。"""
+        return self._batch_styles.max_styles
+
+    @property
+    def line_mode(self) -> str:
+        """現在の線の太さ付け方式（`LINE_MODES` のいずれか）。"""
+        return self._line_mode
+
+    def set_line_mode(self, line_mode: str) -> None:
+        """線の太さ付け方式を切り替える（GPU メッシュキャッシュは破棄する）。"""
+        mode = str(line_mode).strip().lower()
+        if mode not in LINE_MODES:
+            raise ValueError(f"line_mode は {LINE_MODES} のいずれか: {line_mode!r}")
+        if mode == self._line_mode:
+            return
+        self._line_mode = mode
+        # キャッシュ済みメッシュの形式（頂点列 / 線分列）が変わるため作り直す。
+        self._release_cached_meshes()
+        self._mesh_candidates.clear()
+        self._batch_key = None
+
+    def begin_frame(self) -> None:
+        """フレームの開始を通知する（リングバッファの再利用可能領域を進め、集計をリセットする）。"""
+        self._upload_ring.begin_frame()
+        self._frame_hits = 0
+        self._frame_uploads = 0
+        self._frame_upload_bytes = 0
+
+    def cache_stats(self) -> MeshCacheStats:
+        """begin_frame 以降のキャッシュ集計（ヒット/upload 回数、転送量、常駐量）を返す。"""
+        return MeshCacheStats(
+            hits=self._frame_hits,
+            uploads=self._frame_uploads,
+            upload_bytes=self._frame_upload_bytes,
+            resident_bytes=self._cache.nbytes,
+            budget_bytes=self._cache.max_bytes,
+        )
+
+    def store_frame(self, size: tuple[int, int]) -> None:
+        """画面に描いた現在のフレームを保存する（`present_cached_frame` で再提示できる）。"""
+        self._frame_cache.store(self.ctx.screen, size)
+
+    def present_cached_frame(self, size: tuple[int, int]) -> bool:
+        """保存したフレームを画面へコピーする。保存が無い/サイズが違うなら False。"""
+        return self._frame_cache.present(self.ctx.screen, size)
+
+    def invalidate_cached_frame(self) -> None:
+        """保存したフレームを無効にする。"""
+        self._frame_cache.invalidate()
 
     def viewport(self, width: int, height: int) -> None:
         """ビューポートをウィンドウサイズに合わせて更新する。"""
@@ -49,16 +222,45 @@ class DrawRenderer:
         """背景色でクリアする。"""
         self.ctx.clear(*color, 1.0)
 
+    def line_indices(
+        self, geometry_id: str, offsets: np.ndarray
+    ) -> tuple[np.ndarray, LineIndexStats]:
+        """GL_LINE_STRIP 用の indices と描画統計を返す（GeometryId 単位でキャッシュ）。
+
+        GeometryId は内容署名なので、同じ id なら offsets も同じ。キャッシュに乗った id は
+        offsets を読まずに返す。GPU メッシュと同じく 2 回目以降に登場した id だけをキャッシュし、
+        初見の id は offsets の内容をキーにした共有（`build_line_indices_and_stats`）に任せる。
+        """
+        key = ("indices", geometry_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cast("tuple[np.ndarray, LineIndexStats]", cached)
+        indices, stats = build_line_indices_and_stats(offsets)
+        candidates = self._index_candidates
+        if geometry_id in candidates:
+            candidates.pop(geometry_id, None)
+            self._cache.put(key, (indices, stats), int(indices.nbytes))
+        else:
+            candidates[geometry_id] = None
+            while len(candidates) > int(self._mesh_candidates_max_items):
+                candidates.popitem(last=False)
+        return indices, stats
+
     def render_layer(
         self,
         realized: RealizedGeometry,
-        indices: np.ndarray,
+        indices: LineDraw,
         *,
         geometry_id: str,
         color: tuple[float, float, float],
         thickness: float,
     ) -> None:
-        """RealizedGeometry をライン描画する。"""
+        """RealizedGeometry をライン描画する。
+
+        InstancedGeometry の場合、indices は base.offsets から作ったものを渡す。
+        indices の代わりに `LineStrips` を渡すと、IBO を使わず strip ごとの glDrawArrays で描く
+        （InstancedGeometry には使えない）。
+        """
         mesh = self.prepare_layer_mesh(realized, indices, geometry_id=geometry_id)
         if mesh is None:
             return
@@ -67,63 +269,219 @@ class DrawRenderer:
     def prepare_layer_mesh(
         self,
         realized: RealizedGeometry,
-        indices: np.ndarray,
+        indices: LineDraw,
         *,
         geometry_id: str,
-    ) -> LineMesh | None:
-        """upload（必要なら）を行い、描画に使う LineMesh を返す。"""
-        if indices.size == 0:
+    ) -> DrawMesh | None:
+        """upload（必要なら）を行い、描画に使う Mesh を返す。"""
+        if isinstance(indices, LineStrips):
+            if indices.n_strips == 0:
+                return None
+            if isinstance(realized, InstancedGeometry):
+                raise TypeError("InstancedGeometry は LineStrips で描けない")
+        elif indices.size == 0:
             return None
 
-        mesh = self._mesh_cache.get(geometry_id)
+        mesh = cast("DrawMesh | None", self._cache.get(("mesh", geometry_id)))
         if mesh is not None:
-            self._mesh_cache.move_to_end(geometry_id)
+            self._frame_hits += 1
         else:
-            if geometry_id in self._mesh_candidates:
-                # 2 回目以降の登場なのでキャッシュへ昇格し、以後の upload をスキップする。
-                self._mesh_candidates.pop(geometry_id, None)
-                reserve = max(int(realized.coords.nbytes), int(indices.nbytes), 4096)
-                mesh = LineMesh(self.ctx, self.program, initial_reserve=reserve)
-                mesh.upload(vertices=realized.coords, indices=indices)
-                self._mesh_cache[geometry_id] = mesh
-                while len(self._mesh_cache) > int(self._mesh_cache_max_items):
-                    _, evicted = self._mesh_cache.popitem(last=False)
-                    evicted.release()
+            candidates = self._mesh_candidates
+            sightings = candidates.pop(geometry_id, 0) + 1
+            required = self._sightings_to_promote(self._upload_cost(realized, indices))
+            if required is not None and sightings >= required:
+                # 十分な回数登場したのでキャッシュへ昇格し、以後の upload をスキップする。
+                mesh = self._new_mesh(realized, indices)
+                self._upload(mesh, realized, indices)
+                self._cache.put(("mesh", geometry_id), mesh, mesh.nbytes)
             else:
-                # 初見は候補として覚えておき、描画は scratch に upload して行う。
-                self._mesh_candidates[geometry_id] = None
-                self._mesh_candidates.move_to_end(geometry_id)
-                while len(self._mesh_candidates) > int(self._mesh_candidates_max_items):
-                    self._mesh_candidates.popitem(last=False)
-                mesh = self._scratch_mesh
-                mesh.upload(vertices=realized.coords, indices=indices)
+                # 候補として登場回数を覚えておき、描画は scratch に upload して行う。
+                candidates[geometry_id] = sightings
+                while len(candidates) > int(self._mesh_candidates_max_items):
+                    candidates.popitem(last=False)
+                if isinstance(realized, InstancedGeometry):
+                    mesh = self._scratch_instanced_mesh
+                elif self._line_mode == "quad":
+                    mesh = self._scratch_quad_mesh
+                else:
+                    mesh = self._scratch_mesh
+                self._upload(mesh, realized, indices)
 
         return mesh
 
+    def _sightings_to_promote(self, cost: int) -> int | None:
+        """upload 量 cost のメッシュをキャッシュへ昇格させるのに必要な登場回数を返す。
+
+        None は昇格しないことを表す。
+
+        予算に対して大きいメッシュは、昇格のたびに多くのメッシュを追い出すため慎重に扱う。
+        予算の半分を超えるものは毎フレーム scratch へ upload する。
+        """
+        budget = int(self._cache.max_bytes)
+        if cost > budget // 2:
+            return None
+        if cost > budget // 8:
+            return 3
+        return 2
+
+    def _upload_cost(self, realized: RealizedGeometry, indices: LineDraw) -> int:
+        """1 回の upload で転送するバイト数の見積もり。"""
+        index_bytes = 0 if isinstance(indices, LineStrips) else int(indices.nbytes)
+        if isinstance(realized, InstancedGeometry):
+            return int(realized.base.coords.nbytes) + index_bytes + int(realized.transforms.nbytes)
+        if self._line_mode == "quad":
+            return int(realized.coords.shape[0]) * 16
+        return int(realized.coords.shape[0]) * VERTEX_STRIDES[self._vertex_format] + index_bytes
+
+    def _release_cached_meshes(self) -> None:
+        for mesh in self._cache.remove_if(lambda key: key[0] == "mesh"):
+            cast("DrawMesh", mesh).release()
+
+    def _new_mesh(self, realized: RealizedGeometry, indices: LineDraw) -> DrawMesh:
+        """キャッシュ用に、ジオメトリの種類とサイズに合わせた Mesh を確保する。"""
+        if isinstance(realized, InstancedGeometry):
+            assert isinstance(indices, np.ndarray)
+            reserve = max(int(realized.base.coords.nbytes), int(indices.nbytes), 4096)
+            return InstancedLineMesh(
+                self.ctx,
+                self.instanced_program,
+                initial_reserve=reserve,
+                initial_instances=realized.n_instances,
+            )
+        if self._line_mode == "quad":
+            # 線分数 <= 頂点数、1 線分 16 bytes。
+            reserve = max(int(realized.coords.shape[0]) * 16, 4096)
+            return QuadLineMesh(self.ctx, self.quad_program, initial_reserve=reserve)
+        index_bytes = 0 if isinstance(indices, LineStrips) else int(indices.nbytes)
+        reserve = max(
+            int(realized.coords.shape[0]) * VERTEX_STRIDES[self._vertex_format],
+            index_bytes,
+            4096,
+        )
+        return LineMesh(
+            self.ctx, self.program, initial_reserve=reserve, vertex_format=self._vertex_format
+        )
+
+    def _upload(self, mesh: DrawMesh, realized: RealizedGeometry, indices: LineDraw) -> None:
+        # CPU 側の詰め替え（"pack"）と GPU への転送（"upload"）を分けて計測する
+        # （"upload" の MB/s が転送スループットになるように）。
+        perf = self._perf
+        if isinstance(mesh, (QuadLineMesh, RingQuadLineMesh)):
+            with perf.section("pack"):
+                segments = build_line_segments(realized.coords, realized.offsets)
+            with perf.section("upload", gpu=True):
+                nbytes = mesh.upload_segments(segments)
+        elif isinstance(realized, InstancedGeometry):
+            assert isinstance(mesh, InstancedLineMesh)
+            # 展開済み座標は作らず、base と変換列だけを送る。
+            with perf.section("upload", gpu=True):
+                nbytes = mesh.upload_instanced(
+                    vertices=realized.base.coords,
+                    indices=indices,
+                    transforms=realized.transforms,
+                )
+        else:
+            assert isinstance(mesh, (LineMesh, RingLineMesh))
+            with perf.section("pack"):
+                packed, dequant = pack_vertices(realized.coords, mesh.vertex_format)
+            with perf.section("upload", gpu=True):
+                if isinstance(indices, LineStrips):
+                    nbytes = mesh.upload_strips_packed(packed, dequant, indices)
+                else:
+                    nbytes = mesh.upload_packed(packed, dequant, indices)
+        self._count_upload(nbytes)
+
+    def _count_upload(self, nbytes: int) -> None:
+        self._frame_uploads += 1
+        self._frame_upload_bytes += int(nbytes)
+        self._perf.add_bytes("upload", nbytes)
+
     def draw_prepared_mesh(
         self,
-        mesh: LineMesh,
+        mesh: DrawMesh,
         *,
         color: tuple[float, float, float],
         thickness: float,
     ) -> None:
-        """LineMesh を draw call で描画する。"""
-        self.program["line_thickness"].value = float(thickness)
-        self.program["color"].value = (*color, 1.0)
+        """Mesh を draw call で描画する。"""
+        program = mesh.program
+        program["line_thickness"].value = float(thickness)
+        program["color"].value = (*color, 1.0)
 
         # ボトルネックになりやすい: 多レイヤー/多 draw call 時はここ（ドライバ/GL 呼び出し）が支配しやすい。
-        mesh.vao.render(mode=self.ctx.LINE_STRIP, vertices=mesh.index_count)
+        mesh.draw()
+
+    def render_layer_batch(self, layers: Sequence[BatchedLayer]) -> None:
+        """複数レイヤーを 1 本の VBO/IBO に詰め、1 回の draw call で描画する。
+
+        レイヤー間の描画順は並び順のまま保たれる。InstancedGeometry は渡さないこと。
+        geometry_id の並びが前回と同じなら頂点/インデックスの再転送を省き、
+        スタイル表（色/太さ）だけを書き換える。
+        """
+        if not layers:
+            return
+        key = tuple(layer.geometry_id for layer in layers)
+        if key == self._batch_key:
+            self._frame_hits += 1
+        mesh: DrawMesh
+        perf = self._perf
+        if self._line_mode == "quad":
+            mesh = self._batch_quad_mesh
+            if key != self._batch_key:
+                with perf.section("pack"):
+                    segments = pack_segment_batch(
+                        [
+                            build_line_segments(layer.realized.coords, layer.realized.offsets)
+                            for layer in layers
+                        ]
+                    )
+                with perf.section("upload", gpu=True):
+                    nbytes = mesh.upload_segments(segments)
+                self._count_upload(nbytes)
+        else:
+            mesh = self._batch_mesh
+            if key != self._batch_key:
+                with perf.section("pack"):
+                    vertices, indices, dequant = pack_layer_batch(
+                        [(layer.realized.coords, layer.indices) for layer in layers],
+                        self._vertex_format,
+                    )
+                with perf.section("upload", gpu=True):
+                    nbytes = mesh.upload_batch(vertices, indices, dequant)
+                self._count_upload(nbytes)
+        self._batch_key = key
+        self._batch_styles.write(pack_layer_styles(layers))
+        self._batch_styles.use(location=0)
+        mesh.draw()
 
     def release(self) -> None:
         """GPU リソースを解放する。"""
         self._scratch_mesh.release()
-        for mesh in self._mesh_cache.values():
-            mesh.release()
-        self._mesh_cache.clear()
+        self._scratch_instanced_mesh.release()
+        self._scratch_quad_mesh.release()
+        self._upload_ring.release()
+        self._batch_mesh.release()
+        self._batch_quad_mesh.release()
+        self._batch_styles.release()
+        self._frame_cache.release()
+        self._release_cached_meshes()
         self._mesh_candidates.clear()
+        self._index_candidates.clear()
         self.program.release()
+        self.instanced_program.release()
+        self.batched_program.release()
+        self.quad_program.release()
+        self.quad_batched_program.release()
         self.ctx.release()
 
     def finish(self) -> None:
         """GPU の完了を待つ（計測用）。"""
         self.ctx.finish()
+
+
+def _release_evicted_mesh(
+    key: tuple[str, str], value: DrawMesh | tuple[np.ndarray, LineIndexStats]
+) -> None:
+    """キャッシュから追い出された GPU メッシュを解放する（インデックス配列は何もしない）。"""
+    if key[0] == "mesh":
+        cast("DrawMesh", value).release()
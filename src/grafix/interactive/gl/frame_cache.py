@@ -0,0 +1,63 @@
+# どこで: `src/grafix/interactive/gl/frame_cache.py`。
+# 何を: 描画済みフレームをオフスクリーン framebuffer に保存し、そのまま再提示する。
+# なぜ: 内容が変わらない静的スケッチで、毎フレームの clear と全レイヤーの draw call を省くため。
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class FrameCache:
+    """1 フレーム分の色バッファを保持するオフスクリーン framebuffer。
+
+    Notes
+    -----
+    - 画面（default framebuffer）は flip 後に内容が不定になるため、保存先は別に持つ。
+    - MSAA の画面から blit するには同じサンプル数が必要なので、画面と同じ samples で作る
+      （resolve せずにコピーし、再提示でも同じ見た目になる）。
+    """
+
+    def __init__(self, ctx: Any, *, samples: int = 0) -> None:
+        self.ctx = ctx
+        self.samples = max(0, int(samples))
+        self._fbo: Any = None
+        self._size: tuple[int, int] | None = None
+        self._valid = False
+
+    def store(self, src: Any, size: tuple[int, int]) -> None:
+        """src（通常は画面）の内容を保存する。"""
+        size = (int(size[0]), int(size[1]))
+        if self._fbo is None or self._size != size:
+            self._release_fbo()
+            renderbuffer = self.ctx.renderbuffer(size, 4, samples=self.samples)
+            self._fbo = self.ctx.framebuffer(color_attachments=[renderbuffer])
+            self._size = size
+        self.ctx.copy_framebuffer(self._fbo, src)
+        self._valid = True
+
+    def present(self, dst: Any, size: tuple[int, int]) -> bool:
+        """保存したフレームを dst へコピーする。保存が無い/サイズが違うなら False。"""
+        if not self._valid or self._size != (int(size[0]), int(size[1])):
+            return False
+        self.ctx.copy_framebuffer(dst, self._fbo)
+        return True
+
+    def invalidate(self) -> None:
+        """保存したフレームを無効にする（次の store まで present しない）。"""
+        self._valid = False
+
+    def _release_fbo(self) -> None:
+        if self._fbo is None:
+            return
+        for attachment in self._fbo.color_attachments:
+            attachment.release()
+        self._fbo.release()
+        self._fbo = None
+        self._valid = False
+
+    def release(self) -> None:
+        """GPUのメモリを解放する（終了時に使う）"""
+        self._release_fbo()
+
+
+__all__ = ["FrameCache"]
@@ -1,5 +1,6 @@
 # どこで: `src/grafix/interactive/gl/index_buffer.py`。
-# 何を: RealizedGeometry.offsets から GL_LINE_STRIP 用インデックス配列を生成する。
+# 何を: RealizedGeometry.offsets から GL_LINE_STRIP 用インデックス配列
+#       （または strip 範囲）を生成する。
 # なぜ: インデックス生成を純粋関数として切り出し、テストしやすくするため。
 
 from __future__ import annotations
@@ -21,6 +22,54 @@ class LineIndexStats:
     draw_lines: int
 
 
+# ポリライン本数がこれ以下で、頂点数が DRAW_ARRAYS_MIN_VERTICES 以上のジオメトリは、
+# インデックスを作らずポリラインごとの glDrawArrays で描く（`LineStrips`）。
+# 本数が多いと draw call 数が支配的になるため、少数の長いポリラインに限る。
+DRAW_ARRAYS_MAX_STRIPS = 32
+DRAW_ARRAYS_MIN_VERTICES = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class LineStrips:
+    """インデックスなしで描く GL_LINE_STRIP の範囲列（glMultiDrawArrays の first/count 相当）。
+
+    頂点 2 未満のポリラインは含めない。
+    """
+
+    firsts: np.ndarray
+    counts: np.ndarray
+
+    @property
+    def n_strips(self) -> int:
+        """描画する strip 数。"""
+        return int(self.counts.size)
+
+
+def prefers_line_strips(offsets: np.ndarray) -> bool:
+    """offsets をインデックスなし（`LineStrips`）で描く方が有利かを返す。"""
+    n = int(offsets.size)
+    return 2 <= n <= DRAW_ARRAYS_MAX_STRIPS + 1 and int(offsets[-1]) >= DRAW_ARRAYS_MIN_VERTICES
+
+
+def build_line_strips_and_stats(offsets: np.ndarray) -> tuple[LineStrips, LineIndexStats]:
+    """RealizedGeometry.offsets から strip 範囲と描画統計をまとめて生成する。
+
+    Notes
+    -----
+    - first/count は offsets から直接求まるため、インデックス配列も IBO も要らない。
+    - 本数の少ない offsets（`prefers_line_strips`）向けなので、キャッシュはしない。
+    """
+    offsets_i64 = np.asarray(offsets, dtype=np.int64)
+    if offsets_i64.size < 2:
+        empty = np.zeros((0,), dtype=np.int64)
+        return LineStrips(firsts=empty, counts=empty), LineIndexStats(0, 0)
+    lengths = np.diff(offsets_i64)
+    keep = lengths >= 2
+    counts = lengths[keep]
+    strips = LineStrips(firsts=offsets_i64[:-1][keep], counts=counts)
+    return strips, LineIndexStats(draw_vertices=int(counts.sum()), draw_lines=int(counts.size))
+
+
 def build_line_indices(offsets: np.ndarray) -> np.ndarray:
     """RealizedGeometry.offsets から GL_LINE_STRIP 用インデックス配列を生成する。
 
@@ -44,6 +93,21 @@ def build_line_indices_and_stats(offsets: np.ndarray) -> tuple[np.ndarray, LineI
     return _build_line_strip_indices_and_stats_cached(offsets_i32.tobytes())
 
 
+def build_line_segments(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """RealizedGeometry の coords/offsets から線分の端点列 `[ax, ay, bx, by]` を生成する。
+
+    Notes
+    -----
+    - インスタンス四角形描画（1 インスタンス = 1 線分）の per-instance 属性として使う。
+    - 描画は xy のみなので z は捨てる。頂点 2 未満のポリラインは線分を持たない。
+    """
+    offsets_i32 = np.asarray(offsets, dtype=np.int32)
+    if offsets_i32.size < 2:
+        return np.zeros((0, 4), dtype=np.float32)
+    coords_f32 = np.ascontiguousarray(coords, dtype=np.float32)
+    return _build_line_segments_numba(coords_f32, offsets_i32)
+
+
 @lru_cache(maxsize=64)
 def _build_line_strip_indices_cached(offsets_bytes: bytes) -> np.ndarray:
     offsets = np.frombuffer(offsets_bytes, dtype=np.int32)
@@ -155,3 +219,27 @@ def _build_line_strip_indices_and_stats_numba(
         emitted_any = True
 
     return out, total_vertices, polyline_count
+
+
+@njit(cache=True)  # type: ignore[misc]
+def _build_line_segments_numba(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """ポリラインごとの隣接頂点ペアを (S, 4) の線分列にする（Numba 版）。"""
+    n = offsets.shape[0]
+    total = 0
+    for i in range(n - 1):
+        length = offsets[i + 1] - offsets[i]
+        if length >= 2:
+            total += length - 1
+
+    out = np.empty((total, 4), dtype=np.float32)
+    cursor = 0
+    for i in range(n - 1):
+        start = offsets[i]
+        end = offsets[i + 1]
+        for j in range(start, end - 1):
+            out[cursor, 0] = coords[j, 0]
+            out[cursor, 1] = coords[j, 1]
+            out[cursor, 2] = coords[j + 1, 0]
+            out[cursor, 3] = coords[j + 1, 1]
+            cursor += 1
+    return out
@@ -0,0 +1,231 @@
+# どこで: `src/grafix/interactive/gl/layer_batch.py`。
+# 何を: 複数レイヤーを 1 本の VBO/IBO と 1 回の draw call にまとめるバッチ描画を提供する。
+# なぜ: レイヤー数が多いシーンでは uniform 設定と draw call の回数
+#       （ドライバ呼び出し）が支配的になるため。
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from grafix.core.realized_geometry import RealizedGeometry
+from grafix.interactive.gl.line_mesh import LineMesh
+from grafix.interactive.gl.vertex_format import (
+    ATTRIBUTE_FORMATS,
+    IDENTITY_DEQUANT,
+    quantize_xy16_into,
+    xy16_dequant,
+    xy_bounds,
+)
+
+# 頂点形式ごとの 1 頂点 = 座標 + スタイル番号 (uint32)。
+BATCH_VERTEX_DTYPES = {
+    "xy32": np.dtype([("xy", "<f4", (2,)), ("style", "<u4")]),
+    "xy16": np.dtype([("xy", "<u2", (2,)), ("style", "<u4")]),
+}
+BATCH_VERTEX_DTYPE = BATCH_VERTEX_DTYPES["xy32"]
+# インスタンス四角形描画用の 1 線分 = [ax, ay, bx, by] (float32 x4) + スタイル番号 (uint32)。
+BATCH_SEGMENT_DTYPE = np.dtype([("segment", "<f4", (4,)), ("style", "<u4")])
+
+
+@dataclass(frozen=True, slots=True)
+class BatchedLayer:
+    """バッチ描画へ渡す 1 レイヤー分の入力。"""
+
+    realized: RealizedGeometry
+    indices: np.ndarray
+    geometry_id: str
+    color: tuple[float, float, float]
+    thickness: float
+
+
+def pack_layer_batch(
+    parts: Sequence[tuple[np.ndarray, np.ndarray]],
+    vertex_format: str = "xy32",
+) -> tuple[np.ndarray, np.ndarray, tuple[float, float, float, float]]:
+    """(coords, indices) の列を 1 本の頂点配列とインデックス配列へ詰める。
+
+    Parameters
+    ----------
+    parts : Sequence[tuple[np.ndarray, np.ndarray]]
+        レイヤーごとの `(coords, indices)`。coords は shape (N, 3)、
+        indices は GL_LINE_STRIP + primitive restart 形式の uint32 配列。
+    vertex_format : str
+        "xy32" または "xy16"。"xy16" は全レイヤーをまとめた xy bbox 基準で量子化する。
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, tuple[float, float, float, float]]
+        `(vertices, indices, dequant)`。vertices は `BATCH_VERTEX_DTYPES[vertex_format]`
+        の構造化配列で、style にはレイヤーの並び順（0 始まり）が入る。
+        indices は各レイヤーの頂点オフセット分ずらし、レイヤー間に restart を挟む。
+        dequant はシェーダの `dequant` uniform に渡す復元係数。
+    """
+    if vertex_format not in BATCH_VERTEX_DTYPES:
+        raise ValueError(f"vertex_format は xy32 / xy16 のいずれか: {vertex_format!r}")
+    restart = np.uint32(LineMesh.PRIMITIVE_RESTART_INDEX)
+    n_vertices = sum(int(coords.shape[0]) for coords, _ in parts)
+    nonempty = [k for k, (_, indices) in enumerate(parts) if int(indices.size) > 0]
+    n_indices = sum(int(parts[k][1].size) for k in nonempty) + max(0, len(nonempty) - 1)
+
+    vertices = np.empty((n_vertices,), dtype=BATCH_VERTEX_DTYPES[vertex_format])
+    out_indices = np.empty((n_indices,), dtype=np.uint32)
+
+    dequant = IDENTITY_DEQUANT
+    xy16: np.ndarray | None = None
+    if vertex_format == "xy16":
+        dequant = _batch_xy16_dequant([coords for coords, _ in parts])
+        xy16 = np.empty((n_vertices, 2), dtype=np.uint16)
+
+    base = 0
+    cursor = 0
+    for k, (coords, indices) in enumerate(parts):
+        n = int(coords.shape[0])
+        if xy16 is None:
+            vertices["xy"][base : base + n] = coords[:, :2]
+        elif n > 0:
+            quantize_xy16_into(coords, *dequant, xy16[base : base + n])
+        vertices["style"][base : base + n] = k
+        m = int(indices.size)
+        if m > 0:
+            if cursor > 0:
+                out_indices[cursor] = restart
+                cursor += 1
+            idx = np.asarray(indices, dtype=np.uint32)
+            dst = out_indices[cursor : cursor + m]
+            np.add(idx, np.uint32(base), out=dst)
+            dst[idx == restart] = restart
+            cursor += m
+        base += n
+    if xy16 is not None:
+        vertices["xy"] = xy16
+    return vertices, out_indices, dequant
+
+
+def _batch_xy16_dequant(coords_list: Sequence[np.ndarray]) -> tuple[float, float, float, float]:
+    """全レイヤーを覆う xy bbox から xy16 の復元係数を求める。"""
+    bounds = [xy_bounds(coords) for coords in coords_list if int(coords.shape[0]) > 0]
+    if not bounds:
+        return xy16_dequant(0.0, 0.0, 0.0, 0.0)
+    return xy16_dequant(
+        min(b[0] for b in bounds),
+        min(b[1] for b in bounds),
+        max(b[2] for b in bounds),
+        max(b[3] for b in bounds),
+    )
+
+
+def pack_segment_batch(parts: Sequence[np.ndarray]) -> np.ndarray:
+    """レイヤーごとの線分列 (S_k, 4) を `BATCH_SEGMENT_DTYPE` の 1 本の配列へ詰める。
+
+    style にはレイヤーの並び順（0 始まり）が入る。
+    """
+    n_segments = sum(int(segments.shape[0]) for segments in parts)
+    out = np.empty((n_segments,), dtype=BATCH_SEGMENT_DTYPE)
+    base = 0
+    for k, segments in enumerate(parts):
+        n = int(segments.shape[0])
+        out["segment"][base : base + n] = segments
+        out["style"][base : base + n] = k
+        base += n
+    return out
+
+
+def pack_layer_styles(layers: Sequence[BatchedLayer]) -> np.ndarray:
+    """レイヤーの (r, g, b, thickness) を float32 shape (K, 4) に詰める。"""
+    styles = np.empty((len(layers), 4), dtype=np.float32)
+    for k, layer in enumerate(layers):
+        styles[k, 0:3] = layer.color
+        styles[k, 3] = float(layer.thickness)
+    return styles
+
+
+class LayerStyleTable:
+    """レイヤーごとの (r, g, b, thickness) を保持する幅 K・高さ 1 の RGBA32F テクスチャ。
+
+    バッチ描画のシェーダが頂点（または線分）のスタイル番号で `texelFetch` する
+    （GL 4.1 では SSBO が使えないため）。
+    幅は GL_MAX_TEXTURE_SIZE（`max_styles`）までなので、1 回のバッチのレイヤー数もそこまで。
+    """
+
+    def __init__(self, ctx: Any, initial_styles: int = 256) -> None:
+        self.ctx = ctx
+        self.max_styles = max(1, int(ctx.info["GL_MAX_TEXTURE_SIZE"]))
+        self.texture = self._new_texture(min(int(initial_styles), self.max_styles))
+
+    def _new_texture(self, width: int) -> Any:
+        texture = self.ctx.texture((max(1, int(width)), 1), 4, dtype="f4")
+        texture.filter = (self.ctx.NEAREST, self.ctx.NEAREST)
+        return texture
+
+    def write(self, styles: np.ndarray) -> None:
+        """スタイル表 (K, 4) を書き込む（幅が足りなければテクスチャを作り直す）。"""
+        styles_f32 = np.ascontiguousarray(styles, dtype=np.float32)
+        n = int(styles_f32.shape[0])
+        if n > self.max_styles:
+            raise ValueError(
+                f"バッチのレイヤー数が GL_MAX_TEXTURE_SIZE を超えています: {n} > {self.max_styles}"
+            )
+        if n > self.texture.width:
+            width = min(max(n, 2 * int(self.texture.width)), self.max_styles)
+            self.texture.release()
+            self.texture = self._new_texture(width)
+        if n > 0:
+            self.texture.write(styles_f32.tobytes(), viewport=(0, 0, n, 1))
+
+    def use(self, location: int = 0) -> None:
+        """テクスチャユニットへ bind する。"""
+        self.texture.use(location=location)
+
+    def release(self) -> None:
+        """GPUのメモリを解放する（終了時に使う）"""
+        self.texture.release()
+
+
+class BatchedLineMesh(LineMesh):
+    """複数レイヤーを詰めた頂点列（xy + スタイル番号）を持つ LineMesh。"""
+
+    def _build_vao(self) -> Any:
+        return self.ctx.vertex_array(
+            self.program,
+            [(self.vbo, f"{ATTRIBUTE_FORMATS[self.vertex_format]} 1u", "in_vert", "in_style")],
+            index_buffer=self.ibo,
+        )
+
+    def upload_batch(
+        self,
+        vertices: np.ndarray,
+        indices: np.ndarray,
+        dequant: tuple[float, float, float, float] = IDENTITY_DEQUANT,
+    ) -> int:
+        """`pack_layer_batch` の結果を GPU へ送り込み、転送したバイト数を返す"""
+        self.dequant = dequant
+        # 構造化配列はバイト列としてそのまま書き込む（LineMesh.upload の float32 変換を通さない）。
+        vertices_bytes = np.ascontiguousarray(vertices)
+        indices_u32 = np.ascontiguousarray(indices, dtype=np.uint32)
+        self._ensure_capacity(vertices_bytes.nbytes, indices_u32.nbytes)
+
+        self.vbo.orphan()
+        self.vbo.write(vertices_bytes)
+
+        self.ibo.orphan()
+        self.ibo.write(indices_u32)
+
+        self.index_count = len(indices_u32)
+        return int(vertices_bytes.nbytes + indices_u32.nbytes)
+
+
+__all__ = [
+    "BATCH_SEGMENT_DTYPE",
+    "BATCH_VERTEX_DTYPE",
+    "BATCH_VERTEX_DTYPES",
+    "BatchedLayer",
+    "BatchedLineMesh",
+    "LayerStyleTable",
+    "pack_layer_batch",
+    "pack_segment_batch",
+    "pack_layer_styles",
+]
@@ -1,15 +1,33 @@
 """
 どこで: `src/grafix/interactive/gl/line_mesh.py`。
-何を: VBO/IBO/VAO の確保・更新・解放を担当し、描画可能な LineMesh を管理。
+何を: VBO/IBO/VAO の確保・更新・解放を担当し、描画可能な LineMesh / QuadLineMesh を管理。
 なぜ: GPU 転送の詳細を Renderer から切り離し、再確保や VAO の張り直しを一元化するため。
 """
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from grafix.interactive.gl.upload_ring import UploadRing
+from grafix.interactive.gl.vertex_format import (
+    ATTRIBUTE_FORMATS,
+    IDENTITY_DEQUANT,
+    VERTEX_FORMATS,
+    VERTEX_STRIDES,
+    pack_vertices,
+)
+
+if TYPE_CHECKING:
+    from grafix.interactive.gl.index_buffer import LineStrips
+
+
+def _render_strips(ctx: Any, vao: Any, strips: LineStrips) -> None:
+    """インデックスなしの VAO で、strip ごとに glDrawArrays する。"""
+    for first, count in zip(strips.firsts.tolist(), strips.counts.tolist()):
+        vao.render(mode=ctx.LINE_STRIP, vertices=count, first=first)
+
 
 class LineMesh:
     """
@@ -24,10 +42,12 @@ class LineMesh:
         program: Any,
         # 初期GPUメモリ確保量を抑制（既定: 8MB）。必要に応じて自動拡張。
         initial_reserve: int = 8 * 1024 * 1024,
+        vertex_format: str = "xy32",
     ):
         """
         ctx: GPUへの描画処理を行うためのモダンOpenGL（moderngl）コンテキスト
         program: GPU側で使うシェーダープログラム。
+        vertex_format: GPU 上の頂点形式（`vertex_format.VERTEX_FORMATS` のいずれか）。
         VBO (Vertex Buffer Object): GPUに送る「頂点データ」を格納するメモリ。
         IBO (Index Buffer Object): GPUに「頂点の順序（描画のための索引）」を送るメモリ。
         VAO (Vertex Array Object): VBOとIBOを関連付けて、描画命令をシンプルに管理する仕組み。
@@ -36,20 +56,34 @@ class LineMesh:
         self.ctx = ctx
         self.program = program
         self.initial_reserve = initial_reserve
+        if vertex_format not in VERTEX_FORMATS:
+            raise ValueError(f"vertex_format は {VERTEX_FORMATS} のいずれか: {vertex_format!r}")
+        self.vertex_format = vertex_format
+        # 量子化頂点の復元係数（シェーダの dequant uniform）。
+        self.dequant = IDENTITY_DEQUANT
         # 命名統一: primitive_restart_index に一本化
 
         # バッファ予約
         self.vbo = ctx.buffer(reserve=initial_reserve, dynamic=True)
         self.ibo = ctx.buffer(reserve=initial_reserve, dynamic=True)
-        self.vao = ctx.simple_vertex_array(
-            program, self.vbo, "in_vert", index_buffer=self.ibo
-        )
+        self.vao = self._build_vao()
+        # インデックスなし描画（`upload_strips`）用の VAO。初回に作る。
+        self._arrays_vao: Any = None
 
         # 描画ステート
         self.index_count: int = 0
+        self.instance_count: int = 1
+        self.strips: LineStrips | None = None
         self.ctx.primitive_restart = True  # type: ignore
         self.ctx.primitive_restart_index = self.PRIMITIVE_RESTART_INDEX  # type: ignore
 
+    def _build_vao(self) -> Any:
+        return self.ctx.vertex_array(
+            self.program,
+            [(self.vbo, ATTRIBUTE_FORMATS[self.vertex_format], "in_vert")],
+            index_buffer=self.ibo,
+        )
+
     # ---------- バッファ操作 ----------
     def _ensure_capacity(self, vbo_size: int, ibo_size: int) -> None:
         """データが大きくなったらGPUのバッファを再確保"""
@@ -71,26 +105,390 @@ class LineMesh:
         # VAO は VBO/IBO が差し替わるときだけ張り直す（毎フレーム/毎レイヤーは重い）。
         if vao_needs_rebuild:
             self.vao.release()
-            self.vao = self.ctx.simple_vertex_array(
-                self.program, self.vbo, "in_vert", index_buffer=self.ibo
-            )
+            self.vao = self._build_vao()
+            if self._arrays_vao is not None:
+                self._arrays_vao.release()
+                self._arrays_vao = None
 
-    def upload(self, vertices: np.ndarray, indices: np.ndarray) -> None:
-        """実際にデータをGPUへ送り込む"""
-        vertices_f32 = np.ascontiguousarray(vertices, dtype=np.float32)
+    def upload(self, vertices: np.ndarray, indices: np.ndarray) -> int:
+        """実際にデータをGPUへ送り込み、転送したバイト数を返す
+
+        vertices は (N, 3) の座標で、vertex_format の形式へ詰めてから送る。
+        """
+        packed, dequant = pack_vertices(vertices, self.vertex_format)
+        return self.upload_packed(packed, dequant, indices)
+
+    def upload_packed(
+        self,
+        packed: np.ndarray,
+        dequant: tuple[float, float, float, float],
+        indices: np.ndarray,
+    ) -> int:
+        """`pack_vertices` 済みの頂点とインデックスを GPU へ送り、転送したバイト数を返す"""
+        self.dequant = dequant
         indices_u32 = np.ascontiguousarray(indices, dtype=np.uint32)
-        self._ensure_capacity(vertices_f32.nbytes, indices_u32.nbytes)
+        self._ensure_capacity(packed.nbytes, indices_u32.nbytes)
 
         self.vbo.orphan()
-        self.vbo.write(vertices_f32)
+        self.vbo.write(packed)
 
         self.ibo.orphan()
         self.ibo.write(indices_u32)
 
         self.index_count = len(indices_u32)
+        self.strips = None
+        return int(packed.nbytes + indices_u32.nbytes)
+
+    def upload_strips(self, vertices: np.ndarray, strips: LineStrips) -> int:
+        """頂点だけを GPU へ送り（IBO は使わない）、転送したバイト数を返す"""
+        packed, dequant = pack_vertices(vertices, self.vertex_format)
+        return self.upload_strips_packed(packed, dequant, strips)
+
+    def upload_strips_packed(
+        self,
+        packed: np.ndarray,
+        dequant: tuple[float, float, float, float],
+        strips: LineStrips,
+    ) -> int:
+        """`pack_vertices` 済みの頂点だけを GPU へ送り、転送したバイト数を返す"""
+        self.dequant = dequant
+        self._ensure_capacity(packed.nbytes, 0)
+
+        self.vbo.orphan()
+        self.vbo.write(packed)
+
+        self.index_count = 0
+        self.strips = strips
+        return int(packed.nbytes)
+
+    def draw(self) -> None:
+        """GL_LINE_STRIP（primitive restart 区切り、または strip ごと）で描画する。"""
+        if self.strips is not None:
+            if self.vertex_format != "xyz32":
+                self.program["dequant"].value = self.dequant
+            if self._arrays_vao is None:
+                self._arrays_vao = self.ctx.vertex_array(
+                    self.program, [(self.vbo, ATTRIBUTE_FORMATS[self.vertex_format], "in_vert")]
+                )
+            _render_strips(self.ctx, self._arrays_vao, self.strips)
+            return
+        if self.index_count == 0:
+            return
+        if self.vertex_format != "xyz32":
+            self.program["dequant"].value = self.dequant
+        self.vao.render(
+            mode=self.ctx.LINE_STRIP,
+            vertices=self.index_count,
+            instances=self.instance_count,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """確保している GPU バッファのバイト数。"""
+        return int(self.vbo.size + self.ibo.size)
 
     def release(self) -> None:
         """GPUのメモリを解放する（終了時に使う）"""
         self.vbo.release()
         self.ibo.release()
         self.vao.release()
+        if self._arrays_vao is not None:
+            self._arrays_vao.release()
+
+
+class InstancedLineMesh(LineMesh):
+    """base の頂点/インデックスに、インスタンスごとのアフィン変換バッファを加えた LineMesh。
+
+    変換は float32 の (K, 3, 4) 行列列として 1 インスタンス 48 bytes で保持し、
+    頂点シェーダが xy に必要な 1, 2 行目だけを per-instance 属性として読む。
+    """
+
+    TRANSFORM_BYTES = 3 * 4 * 4
+
+    def __init__(
+        self,
+        ctx: Any,
+        program: Any,
+        initial_reserve: int = 8 * 1024 * 1024,
+        initial_instances: int = 256,
+    ):
+        self.instance_vbo = ctx.buffer(
+            reserve=int(initial_instances) * self.TRANSFORM_BYTES, dynamic=True
+        )
+        # 変換は z も使う（xy へ z が混ざる）ため、頂点は xyz のまま送る。
+        super().__init__(ctx, program, initial_reserve=initial_reserve, vertex_format="xyz32")
+
+    def _build_vao(self) -> Any:
+        return self.ctx.vertex_array(
+            self.program,
+            [
+                (self.vbo, "3f", "in_vert"),
+                (self.instance_vbo, "4f 4f 16x/i", "in_row0", "in_row1"),
+            ],
+            index_buffer=self.ibo,
+        )
+
+    def upload_instanced(
+        self, vertices: np.ndarray, indices: np.ndarray, transforms: np.ndarray
+    ) -> int:
+        """base の頂点/インデックスとインスタンス変換を GPU へ送り込み、転送したバイト数を返す"""
+        transforms_f32 = np.ascontiguousarray(transforms, dtype=np.float32)
+        if transforms_f32.nbytes > self.instance_vbo.size:
+            self.instance_vbo.release()
+            self.instance_vbo = self.ctx.buffer(reserve=transforms_f32.nbytes, dynamic=True)
+            self.vao.release()
+            self.vao = self._build_vao()
+
+        nbytes = self.upload(vertices=vertices, indices=indices)
+        self.instance_vbo.orphan()
+        self.instance_vbo.write(transforms_f32)
+        self.instance_count = int(transforms_f32.shape[0])
+        return nbytes + int(transforms_f32.nbytes)
+
+    @property
+    def nbytes(self) -> int:
+        """確保している GPU バッファのバイト数。"""
+        return super().nbytes + int(self.instance_vbo.size)
+
+    def release(self) -> None:
+        """GPUのメモリを解放する（終了時に使う）"""
+        super().release()
+        self.instance_vbo.release()
+
+
+class QuadLineMesh:
+    """線分列を per-instance 属性として持ち、1 インスタンス = 1 四角形で描く Mesh。
+
+    ジオメトリシェーダを使わない描画経路用。四角形の四隅は頂点シェーダが
+    gl_VertexID から作るため、頂点バッファ/インデックスバッファは持たない。
+
+    Parameters
+    ----------
+    ctx, program
+        LineMesh と同じ。
+    segment_format : str
+        線分バッファの 1 要素のフォーマット（moderngl 形式、per-instance 指定込み）。
+    attributes : tuple[str, ...]
+        segment_format の各要素に対応する頂点属性名。
+    """
+
+    VERTICES_PER_SEGMENT = 4
+
+    def __init__(
+        self,
+        ctx: Any,
+        program: Any,
+        initial_reserve: int = 8 * 1024 * 1024,
+        *,
+        segment_format: str = "4f/i",
+        attributes: tuple[str, ...] = ("in_segment",),
+    ):
+        self.ctx = ctx
+        self.program = program
+        self.initial_reserve = initial_reserve
+        self.segment_format = segment_format
+        self.attributes = attributes
+        self.vbo = ctx.buffer(reserve=initial_reserve, dynamic=True)
+        self.vao = self._build_vao()
+        self.instance_count: int = 0
+
+    def _build_vao(self) -> Any:
+        return self.ctx.vertex_array(
+            self.program, [(self.vbo, self.segment_format, *self.attributes)]
+        )
+
+    def upload_segments(self, segments: np.ndarray) -> int:
+        """線分列（float32 (S, 4) または同じ行レイアウトの構造化配列）を GPU へ送り込み、
+        転送したバイト数を返す"""
+        data = np.ascontiguousarray(segments)
+        if data.nbytes > self.vbo.size:
+            self.vbo.release()
+            self.vbo = self.ctx.buffer(
+                reserve=max(data.nbytes, self.initial_reserve), dynamic=True
+            )
+            self.vao.release()
+            self.vao = self._build_vao()
+
+        self.vbo.orphan()
+        self.vbo.write(data)
+        self.instance_count = int(data.shape[0])
+        return int(data.nbytes)
+
+    def draw(self) -> None:
+        """線分ごとに四角形（triangle strip 4 頂点）をインスタンス描画する。"""
+        if self.instance_count == 0:
+            return
+        self.vao.render(
+            mode=self.ctx.TRIANGLE_STRIP,
+            vertices=self.VERTICES_PER_SEGMENT,
+            instances=self.instance_count,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """確保している GPU バッファのバイト数。"""
+        return int(self.vbo.size)
+
+    def release(self) -> None:
+        """GPUのメモリを解放する（終了時に使う）"""
+        self.vbo.release()
+        self.vao.release()
+
+
+class RingLineMesh:
+    """UploadRing から切り出した領域に頂点/インデックスを置く、使い捨て描画用の LineMesh。
+
+    upload のたびに orphan せず、リング上の新しい領域へ書き込み、
+    頂点属性のオフセットと draw の開始インデックスをその領域へ向け直す。
+    upload した内容は次の upload までの 1 回の draw にだけ使う。
+    """
+
+    def __init__(
+        self, ctx: Any, program: Any, ring: UploadRing, *, vertex_format: str = "xy32"
+    ):
+        if vertex_format not in ("xy32", "xy16"):
+            raise ValueError(f"vertex_format は xy32 / xy16 のいずれか: {vertex_format!r}")
+        self.ctx = ctx
+        self.program = program
+        self.ring = ring
+        self.vertex_format = vertex_format
+        self.dequant = IDENTITY_DEQUANT
+        self._location = program["in_vert"].location
+        self._generation = -1
+        self.vao: Any = None
+        # インデックスなし描画（`upload_strips`）用。リング本体を index buffer に持たない。
+        self._arrays_vao: Any = None
+        self.index_count: int = 0
+        self.instance_count: int = 1
+        self.strips: LineStrips | None = None
+        self._first = 0
+
+    def _ensure_vao(self) -> None:
+        if self._generation == self.ring.generation:
+            return
+        for vao in (self.vao, self._arrays_vao):
+            if vao is not None:
+                vao.release()
+        buffer = self.ring.buffer
+        content = [(buffer, ATTRIBUTE_FORMATS[self.vertex_format], "in_vert")]
+        self.vao = self.ctx.vertex_array(self.program, content, index_buffer=buffer)
+        self._arrays_vao = self.ctx.vertex_array(self.program, content)
+        self._generation = self.ring.generation
+
+    def _bind_vertices(self, vao: Any, vertex_offset: int) -> None:
+        vao.bind(
+            self._location,
+            "f",
+            self.ring.buffer,
+            ATTRIBUTE_FORMATS[self.vertex_format],
+            offset=vertex_offset,
+            stride=VERTEX_STRIDES[self.vertex_format],
+        )
+
+    def upload(self, vertices: np.ndarray, indices: np.ndarray) -> int:
+        """リングへ頂点/インデックスを書き込み、転送したバイト数を返す"""
+        packed, dequant = pack_vertices(vertices, self.vertex_format)
+        return self.upload_packed(packed, dequant, indices)
+
+    def upload_packed(
+        self,
+        packed: np.ndarray,
+        dequant: tuple[float, float, float, float],
+        indices: np.ndarray,
+    ) -> int:
+        """`pack_vertices` 済みの頂点とインデックスをリングへ書き込み、転送したバイト数を返す"""
+        self.dequant = dequant
+        indices_u32 = np.ascontiguousarray(indices, dtype=np.uint32)
+        vertex_offset, index_offset = self.ring.write_many([packed, indices_u32])
+        self._ensure_vao()
+        self._bind_vertices(self.vao, vertex_offset)
+        self._first = index_offset // 4
+        self.index_count = len(indices_u32)
+        self.strips = None
+        return int(packed.nbytes + indices_u32.nbytes)
+
+    def upload_strips(self, vertices: np.ndarray, strips: LineStrips) -> int:
+        """リングへ頂点だけを書き込み、転送したバイト数を返す"""
+        packed, dequant = pack_vertices(vertices, self.vertex_format)
+        return self.upload_strips_packed(packed, dequant, strips)
+
+    def upload_strips_packed(
+        self,
+        packed: np.ndarray,
+        dequant: tuple[float, float, float, float],
+        strips: LineStrips,
+    ) -> int:
+        """`pack_vertices` 済みの頂点だけをリングへ書き込み、転送したバイト数を返す"""
+        self.dequant = dequant
+        vertex_offset = self.ring.write(packed)
+        self._ensure_vao()
+        self._bind_vertices(self._arrays_vao, vertex_offset)
+        self.index_count = 0
+        self.strips = strips
+        return int(packed.nbytes)
+
+    def draw(self) -> None:
+        """GL_LINE_STRIP（primitive restart 区切り、または strip ごと）で描画する。"""
+        if self.strips is not None:
+            self.program["dequant"].value = self.dequant
+            _render_strips(self.ctx, self._arrays_vao, self.strips)
+            return
+        if self.index_count == 0:
+            return
+        self.program["dequant"].value = self.dequant
+        self.vao.render(mode=self.ctx.LINE_STRIP, vertices=self.index_count, first=self._first)
+
+    def release(self) -> None:
+        """VAO を解放する（リング本体は所有者が解放する）"""
+        for vao in (self.vao, self._arrays_vao):
+            if vao is not None:
+                vao.release()
+
+
+class RingQuadLineMesh:
+    """UploadRing 上に線分列を置く、使い捨て描画用の QuadLineMesh。"""
+
+    VERTICES_PER_SEGMENT = QuadLineMesh.VERTICES_PER_SEGMENT
+
+    def __init__(self, ctx: Any, program: Any, ring: UploadRing):
+        self.ctx = ctx
+        self.program = program
+        self.ring = ring
+        self._location = program["in_segment"].location
+        self._generation = -1
+        self.vao: Any = None
+        self.instance_count: int = 0
+
+    def _ensure_vao(self) -> None:
+        if self._generation == self.ring.generation:
+            return
+        if self.vao is not None:
+            self.vao.release()
+        self.vao = self.ctx.vertex_array(self.program, [(self.ring.buffer, "4f/i", "in_segment")])
+        self._generation = self.ring.generation
+
+    def upload_segments(self, segments: np.ndarray) -> int:
+        """リングへ線分列 float32 (S, 4) を書き込み、転送したバイト数を返す"""
+        data = np.ascontiguousarray(segments, dtype=np.float32)
+        offset = self.ring.write(data)
+        self._ensure_vao()
+        self.vao.bind(
+            self._location, "f", self.ring.buffer, "4f", offset=offset, stride=16, divisor=1
+        )
+        self.instance_count = int(data.shape[0])
+        return int(data.nbytes)
+
+    def draw(self) -> None:
+        """線分ごとに四角形（triangle strip 4 頂点）をインスタンス描画する。"""
+        if self.instance_count == 0:
+            return
+        self.vao.render(
+            mode=self.ctx.TRIANGLE_STRIP,
+            vertices=self.VERTICES_PER_SEGMENT,
+            instances=self.instance_count,
+        )
+
+    def release(self) -> None:
+        """VAO を解放する（リング本体は所有者が解放する）"""
+        if self.vao is not None:
+            self.vao.release()
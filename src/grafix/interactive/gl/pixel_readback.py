@@ -0,0 +1,65 @@
+# どこで: `src/grafix/interactive/gl/pixel_readback.py`。
+# 何を: framebuffer の RGB 画素を pixel pack buffer（PBO）の輪番で非同期に読み戻す。
+# なぜ: `Framebuffer.read()` は GPU の描画完了まで CPU を止め、
+#       録画中の fps が大きく落ちるため。
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+
+class PixelReadbackRing:
+    """`depth` 本の PBO を輪番で使い、`depth - 1` フレーム遅れで画素を受け取るリング。
+
+    Notes
+    -----
+    - `push()` は `read_into` で PBO への転送を発行するだけで、GPU の完了を待たない。
+      CPU 側へ写すのは `depth - 1` フレーム後（その頃には転送が終わっている想定）。
+    - moderngl は fence（glFenceSync）を公開していないため、完了判定はフレーム数で代用する
+      （`UploadRing` と同じ考え方）。`depth=1` は従来の同期読み出しと同じ振る舞いになる。
+    - 残りのフレームは `drain()` で取り出す（録画停止時に使う）。
+    """
+
+    def __init__(self, ctx: Any, size: tuple[int, int], *, depth: int = 3) -> None:
+        self.ctx = ctx
+        self.size = (int(size[0]), int(size[1]))
+        self.depth = max(1, int(depth))
+        self.frame_bytes = self.size[0] * self.size[1] * 3
+        self._free: list[Any] = [
+            ctx.buffer(reserve=self.frame_bytes, dynamic=True) for _ in range(self.depth)
+        ]
+        self._pending: deque[Any] = deque()
+
+    def push(self, framebuffer: Any) -> bytes | None:
+        """framebuffer の読み出しを発行し、`depth - 1` フレーム前の画素があれば返す。"""
+        buffer = self._free.pop()
+        w, h = self.size
+        framebuffer.read_into(buffer, viewport=(0, 0, w, h), components=3, alignment=1)
+        self._pending.append(buffer)
+        if len(self._pending) < self.depth:
+            return None
+        return self._take_oldest()
+
+    def drain(self) -> list[bytes]:
+        """読み出し待ちのフレームを古い順にすべて返す。"""
+        frames: list[bytes] = []
+        while self._pending:
+            frames.append(self._take_oldest())
+        return frames
+
+    def _take_oldest(self) -> bytes:
+        buffer = self._pending.popleft()
+        data = buffer.read(size=self.frame_bytes)
+        self._free.append(buffer)
+        return data
+
+    def release(self) -> None:
+        """GPUのメモリを解放する（終了時に使う）"""
+        for buffer in [*self._pending, *self._free]:
+            buffer.release()
+        self._pending.clear()
+        self._free.clear()
+
+
+__all__ = ["PixelReadbackRing"]
@@ -1,17 +1,50 @@
 """
 どこで: `src/grafix/interactive/gl/shader.py`。
-何を: 線の太さをジオメトリシェーダで表現する最小頂点/ジオメトリ/フラグメントのセットを提供。
+何を: 線の太さをジオメトリシェーダ、またはインスタンス四角形で表現するシェーダのセットを提供。
 なぜ: 単純なラインを太さ付き四角形に展開し、視認性を高めるため。
 """
 
 
 class Shader:
+    # 頂点は xy のみ（float32、または bbox 基準で量子化した uint16）。
+    # dequant = (x0, y0, step_x, step_y) で `xy = dequant.xy + in_vert * dequant.zw` と復元する。
     VERTEX_SHADER = """
     #version 410
     uniform mat4 projection;
+    uniform vec4 dequant = vec4(0.0, 0.0, 1.0, 1.0);
+    in vec2 in_vert;
+    void main() {
+        vec2 xy = dequant.xy + in_vert * dequant.zw;
+        gl_Position = projection * vec4(xy, 0.0, 1.0);
+    }
+    """
+    # インスタンス描画用（repeat/bold の InstancedGeometry）。
+    # インスタンスごとのアフィン変換 [A | b] の 1, 2 行目を属性で受け取り、xy だけ求める。
+    INSTANCED_VERTEX_SHADER = """
+    #version 410
+    uniform mat4 projection;
     in vec3 in_vert;
+    in vec4 in_row0;
+    in vec4 in_row1;
     void main() {
-        gl_Position = projection * vec4(in_vert.xy, 0.0, 1.0);
+        vec4 p = vec4(in_vert, 1.0);
+        vec2 xy = vec2(dot(in_row0, p), dot(in_row1, p));
+        gl_Position = projection * vec4(xy, 0.0, 1.0);
+    }
+    """
+    # レイヤーバッチ描画用。頂点ごとのスタイル番号でスタイル表 (r, g, b, thickness) を引く。
+    BATCHED_VERTEX_SHADER = """
+    #version 410
+    uniform mat4 projection;
+    uniform sampler2D styles;
+    uniform vec4 dequant = vec4(0.0, 0.0, 1.0, 1.0);
+    in vec2 in_vert;
+    in uint in_style;
+    out vec4 v_style;
+    void main() {
+        v_style = texelFetch(styles, ivec2(int(in_style), 0), 0);
+        vec2 xy = dequant.xy + in_vert * dequant.zw;
+        gl_Position = projection * vec4(xy, 0.0, 1.0);
     }
     """
     GEOMETRY_SHADER = """
@@ -38,6 +71,105 @@ class Shader:
             EndPrimitive();
         }
     """
+    # バッチ描画用。線分の太さと色を頂点シェーダから受け取る（restart でレイヤーは跨がない）。
+    BATCHED_GEOMETRY_SHADER = """
+        #version 410
+        layout(lines) in;
+        layout(triangle_strip, max_vertices = 4) out;
+        in vec4 v_style[];
+        flat out vec4 g_color;
+        void main() {
+            float thickness = v_style[0].a;
+            vec2 dir = normalize(gl_in[1].gl_Position.xy - gl_in[0].gl_Position.xy);
+            vec2 offset = vec2(-dir.y, dir.x) * thickness / 2.0;
+            g_color = vec4(v_style[0].rgb, 1.0);
+            gl_Position = vec4(gl_in[0].gl_Position.xy + offset, 0.0, 1.0);
+            EmitVertex();
+            gl_Position = vec4(gl_in[0].gl_Position.xy - offset, 0.0, 1.0);
+            EmitVertex();
+            gl_Position = vec4(gl_in[1].gl_Position.xy + offset, 0.0, 1.0);
+            EmitVertex();
+            gl_Position = vec4(gl_in[1].gl_Position.xy - offset, 0.0, 1.0);
+            EmitVertex();
+            EndPrimitive();
+        }
+    """
+    # インスタンス四角形描画用（ジオメトリシェーダを使わない代替経路）。
+    # 1 インスタンス = 1 線分。per-instance 属性 in_segment = (ax, ay, bx, by) を受け取り、
+    # gl_VertexID 0..3 から triangle strip の四隅を作る。四角形は両端を半径ぶん延長し、
+    # フラグメント側でカプセル外を捨てることで丸い端点（= 隣接線分との丸い継ぎ目）にする。
+    QUAD_VERTEX_SHADER = """
+    #version 410
+    uniform mat4 projection;
+    uniform float line_thickness = 0.0006;
+    uniform vec4 color = vec4(0.0, 0.0, 0.0, 1.0);
+    in vec4 in_segment;
+    out vec2 v_local;
+    flat out float v_length;
+    flat out float v_radius;
+    flat out vec4 v_color;
+    void main() {
+        vec2 a = (projection * vec4(in_segment.xy, 0.0, 1.0)).xy;
+        vec2 b = (projection * vec4(in_segment.zw, 0.0, 1.0)).xy;
+        float r = line_thickness / 2.0;
+        float len = length(b - a);
+        vec2 dir = len > 0.0 ? (b - a) / len : vec2(1.0, 0.0);
+        vec2 nrm = vec2(-dir.y, dir.x);
+        float t = float(gl_VertexID >> 1);
+        float side = (gl_VertexID & 1) == 0 ? 1.0 : -1.0;
+        float along = t * len + (2.0 * t - 1.0) * r;
+        v_local = vec2(along, side * r);
+        v_length = len;
+        v_radius = r;
+        v_color = color;
+        gl_Position = vec4(a + dir * along + nrm * (side * r), 0.0, 1.0);
+    }
+    """
+    # インスタンス四角形のバッチ描画用。色/太さはスタイル表から線分ごとに引く。
+    QUAD_BATCHED_VERTEX_SHADER = """
+    #version 410
+    uniform mat4 projection;
+    uniform sampler2D styles;
+    in vec4 in_segment;
+    in uint in_style;
+    out vec2 v_local;
+    flat out float v_length;
+    flat out float v_radius;
+    flat out vec4 v_color;
+    void main() {
+        vec4 style = texelFetch(styles, ivec2(int(in_style), 0), 0);
+        vec2 a = (projection * vec4(in_segment.xy, 0.0, 1.0)).xy;
+        vec2 b = (projection * vec4(in_segment.zw, 0.0, 1.0)).xy;
+        float r = style.a / 2.0;
+        float len = length(b - a);
+        vec2 dir = len > 0.0 ? (b - a) / len : vec2(1.0, 0.0);
+        vec2 nrm = vec2(-dir.y, dir.x);
+        float t = float(gl_VertexID >> 1);
+        float side = (gl_VertexID & 1) == 0 ? 1.0 : -1.0;
+        float along = t * len + (2.0 * t - 1.0) * r;
+        v_local = vec2(along, side * r);
+        v_length = len;
+        v_radius = r;
+        v_color = vec4(style.rgb, 1.0);
+        gl_Position = vec4(a + dir * along + nrm * (side * r), 0.0, 1.0);
+    }
+    """
+    QUAD_FRAGMENT_SHADER = """
+        #version 410
+        in vec2 v_local;
+        flat in float v_length;
+        flat in float v_radius;
+        flat in vec4 v_color;
+        out vec4 fragColor;
+        void main() {
+            // 線分の外側（延長した端部）では端点からの距離で丸く切り抜く。
+            float dx = v_local.x < 0.0 ? v_local.x : max(v_local.x - v_length, 0.0);
+            if (dx * dx + v_local.y * v_local.y > v_radius * v_radius) {
+                discard;
+            }
+            fragColor = v_color;
+        }
+    """
     FRAGMENT_SHADER = """
         #version 410
         uniform vec4 color = vec4(0.0, 0.0, 0.0, 1.0);
@@ -46,6 +178,14 @@ class Shader:
             fragColor = color;
         }
     """
+    BATCHED_FRAGMENT_SHADER = """
+        #version 410
+        flat in vec4 g_color;
+        out vec4 fragColor;
+        void main() {
+            fragColor = g_color;
+        }
+    """
 
     @classmethod
     def create_shader(cls, mgl_context):
@@ -55,3 +195,37 @@ class Shader:
             fragment_shader=Shader.FRAGMENT_SHADER,
         )
         return line_program
+
+    @classmethod
+    def create_instanced_shader(cls, mgl_context):
+        instanced_program = mgl_context.program(
+            vertex_shader=Shader.INSTANCED_VERTEX_SHADER,
+            geometry_shader=Shader.GEOMETRY_SHADER,
+            fragment_shader=Shader.FRAGMENT_SHADER,
+        )
+        return instanced_program
+
+    @classmethod
+    def create_batched_shader(cls, mgl_context):
+        batched_program = mgl_context.program(
+            vertex_shader=Shader.BATCHED_VERTEX_SHADER,
+            geometry_shader=Shader.BATCHED_GEOMETRY_SHADER,
+            fragment_shader=Shader.BATCHED_FRAGMENT_SHADER,
+        )
+        return batched_program
+
+    @classmethod
+    def create_quad_shader(cls, mgl_context):
+        quad_program = mgl_context.program(
+            vertex_shader=Shader.QUAD_VERTEX_SHADER,
+            fragment_shader=Shader.QUAD_FRAGMENT_SHADER,
+        )
+        return quad_program
+
+    @classmethod
+    def create_quad_batched_shader(cls, mgl_context):
+        quad_batched_program = mgl_context.program(
+            vertex_shader=Shader.QUAD_BATCHED_VERTEX_SHADER,
+            fragment_shader=Shader.QUAD_FRAGMENT_SHADER,
+        )
+        return quad_batched_program
@@ -0,0 +1,111 @@
+# どこで: `src/grafix/interactive/gl/upload_ring.py`。
+# 何を: 1 本の大きな動的バッファを先頭から順に切り出す upload 用リングバッファを提供する。
+# なぜ: キャッシュに乗らないレイヤーを毎回 orphan + 全面書き換えすると、
+#       ドライバ側で直列化しやすいため。
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+import numpy as np
+
+
+class UploadRing:
+    """フレームごとの一時データを sub-allocate するリングバッファ。
+
+    Notes
+    -----
+    - `begin_frame()` ごとに書き込み位置を記録し、直近 `frames_in_flight` フレーム分の
+      領域は上書きしない（GPU がまだ読んでいる可能性があるため）。
+    - moderngl は fence（glFenceSync）を公開していないため、完了判定はフレーム数で代用する。
+      ドライバが先行できるフレーム数は通常 2〜3 なので、既定は 3 フレーム。
+    - 空きが足りなければバッファを倍々で作り直す（古いバッファは GL 側で使用完了まで保持される）。
+    """
+
+    # 頂点属性/インデックスのオフセットとして使えるよう、割り当て位置を揃える。
+    ALIGN = 16
+
+    def __init__(
+        self,
+        ctx: Any,
+        capacity: int = 32 * 1024 * 1024,
+        frames_in_flight: int = 3,
+    ) -> None:
+        self.ctx = ctx
+        self.capacity = max(int(capacity), self.ALIGN)
+        self.frames_in_flight = max(1, int(frames_in_flight))
+        self.buffer = ctx.buffer(reserve=self.capacity, dynamic=True)
+        # バッファを作り直すたびに増える（VAO の張り直し判定に使う）。
+        self.generation = 0
+        self._head = 0
+        self._frame_starts: deque[int] = deque(maxlen=self.frames_in_flight)
+        self.bytes_written = 0
+
+    def begin_frame(self) -> None:
+        """新しいフレームの開始を記録する（最古のフレーム領域が再利用可能になる）。"""
+        self._frame_starts.append(self._head)
+
+    def write(self, data: np.ndarray) -> int:
+        """data を空き領域へ書き込み、バッファ内のバイトオフセットを返す。"""
+        return self.write_many([data])[0]
+
+    def write_many(self, arrays: list[np.ndarray]) -> list[int]:
+        """複数の配列を 1 回の割り当てで連続して書き込み、各バイトオフセットを返す。
+
+        途中でバッファが作り直されて先に書いた配列だけ古いバッファに残る、ということが起きない。
+        """
+        payloads = [np.ascontiguousarray(a) for a in arrays]
+        sizes = [self._aligned(int(p.nbytes)) for p in payloads]
+        base = self._allocate(sum(sizes))
+        offsets: list[int] = []
+        cursor = base
+        for payload, size in zip(payloads, sizes):
+            if payload.nbytes > 0:
+                self.buffer.write(payload, offset=cursor)
+            offsets.append(cursor)
+            self.bytes_written += int(payload.nbytes)
+            cursor += size
+        return offsets
+
+    def _aligned(self, nbytes: int) -> int:
+        return (int(nbytes) + self.ALIGN - 1) // self.ALIGN * self.ALIGN
+
+    def _allocate(self, nbytes: int) -> int:
+        size = self._aligned(nbytes)
+        head = self._head
+        # 使用中領域は [tail, head)（折り返しあり）。head == tail は「使用中なし」。
+        tail = self._frame_starts[0] if self._frame_starts else head
+        if head >= tail:
+            if head + size <= self.capacity:
+                self._head = head + size
+                return head
+            # 末尾に入らなければ先頭へ折り返す（tail に触れないよう厳密に小さいこと）。
+            if size < tail:
+                self._head = size
+                return 0
+        elif head + size < tail:
+            self._head = head + size
+            return head
+        self._grow(size)
+        self._head = size
+        return 0
+
+    def _grow(self, size: int) -> None:
+        capacity = self.capacity
+        while capacity < size * self.frames_in_flight:
+            capacity *= 2
+        self.capacity = max(capacity, 2 * self.capacity)
+        self.buffer.release()
+        self.buffer = self.ctx.buffer(reserve=self.capacity, dynamic=True)
+        self.generation += 1
+        # 新しいバッファには使用中の領域がない。現在フレームは先頭から始まる扱いにする。
+        self._frame_starts.clear()
+        self._frame_starts.append(0)
+
+    def release(self) -> None:
+        """GPUのメモリを解放する（終了時に使う）"""
+        self.buffer.release()
+
+
+__all__ = ["UploadRing"]
@@ -1,6 +1,6 @@
 # どこで: `src/grafix/interactive/parameter_gui/monitor_bar.py`。
 # 何を: Parameter GUI 上部に表示する監視バー（テキスト 1 行）を描画する。
-# なぜ: 実行中の負荷（FPS/CPU/Mem/頂点/ライン）を即座に把握できるようにするため。
+# なぜ: 実行中の負荷（FPS/CPU/Mem/頂点/ライン/GPU 転送）を即座に把握できるようにするため。
 
 from __future__ import annotations
 
@@ -21,10 +21,16 @@ def render_monitor_bar(
     rss_mb = float(snapshot.rss_mb)
     vertices = int(snapshot.vertices)
     lines = int(snapshot.lines)
+    gpu_hits = int(snapshot.gpu_hits)
+    gpu_uploads = int(snapshot.gpu_uploads)
+    gpu_upload_mb = float(snapshot.gpu_upload_mb)
+    gpu_resident_mb = float(snapshot.gpu_resident_mb)
 
     text = (
         f"FPS: {fps:5.1f} | CPU: {cpu_percent:5.1f}% | MEM: {rss_mb:,.0f}MB"
         f" | Vtx {_fmt_int(vertices)} | Lines {_fmt_int(lines)}"
+        f" | GPU {gpu_resident_mb:,.0f}MB hit {gpu_hits}/{gpu_hits + gpu_uploads}"
+        f" up {gpu_upload_mb:.2f}MB"
     )
     if midi_port_name is not None:
         text += f" | MIDI: {midi_port_name}"
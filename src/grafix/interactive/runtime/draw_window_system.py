@@ -5,12 +5,14 @@
 from __future__ import annotations
 
 import logging
+import os
 import time
 from pathlib import Path
 from typing import TYPE_CHECKING, Callable
 
 from pyglet.window import key
 
+from grafix.core.env import env_flag
 from grafix.core.parameters import ParamStore
 from grafix.core.layer import LayerStyleDefaults
 from grafix.core.pipeline import RealizedLayer
@@ -22,9 +24,20 @@ from grafix.export.image import (
     rasterize_svg_to_png,
 )
 from grafix.interactive.draw_window import create_draw_window
-from grafix.interactive.gl.draw_renderer import DrawRenderer
-from grafix.interactive.gl.index_buffer import build_line_indices_and_stats
+from grafix.interactive.gl.draw_renderer import (
+    CACHE_MAX_BYTES,
+    LINE_MODES,
+    LINE_VERTEX_FORMATS,
+    DrawRenderer,
+)
+from grafix.interactive.gl.index_buffer import (
+    LineStrips,
+    build_line_strips_and_stats,
+    prefers_line_strips,
+)
+from grafix.interactive.gl.layer_batch import BatchedLayer
 from grafix.interactive.render_settings import RenderSettings
+from grafix.core.realized_geometry import InstancedGeometry
 from grafix.core.scene import SceneItem
 from grafix.interactive.runtime.perf import PerfCollector
 from grafix.interactive.midi import MidiController
@@ -39,6 +52,17 @@ _logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from grafix.interactive.runtime.monitor import RuntimeMonitor
 
+# 連続する（インスタンスでない）レイヤーを 1 draw call にまとめて描くかどうか。
+BATCH_LAYERS_ENV = "GRAFIX_BATCH_LAYERS"
+# 起動時の線の太さ付け方式（"geometry" / "quad"）。実行中は L キーで切り替えられる。
+LINE_MODE_ENV = "GRAFIX_LINE_MODE"
+# 通常レイヤーの GPU 頂点形式（"xy32" / "xy16"）。"xy16" は uint16 量子化で転送量を半分にする。
+VERTEX_FORMAT_ENV = "GRAFIX_VERTEX_FORMAT"
+# 内容が前フレームと同じとき、保存したフレームを再提示して描画を省くかどうか（既定: 有効）。
+REUSE_FRAMES_ENV = "GRAFIX_REUSE_FRAMES"
+# GPU メッシュ/インデックスキャッシュの予算（MB）。
+GPU_CACHE_MB_ENV = "GRAFIX_GPU_CACHE_MB"
+
 
 class DrawWindowSystem:
     """描画（メインウィンドウ）のサブシステム。"""
@@ -77,7 +101,31 @@ class DrawWindowSystem:
 
         # 描画用の pyglet window を作成し、その window の OpenGL コンテキストに紐づく renderer を作る。
         self.window = create_draw_window(settings)
-        self._renderer = DrawRenderer(self.window, settings)
+        line_mode = os.environ.get(LINE_MODE_ENV, "geometry").strip().lower()
+        if line_mode not in LINE_MODES:
+            _logger.warning("Unknown %s=%r; using 'geometry'", LINE_MODE_ENV, line_mode)
+            line_mode = "geometry"
+        vertex_format = os.environ.get(VERTEX_FORMAT_ENV, "xy32").strip().lower()
+        if vertex_format not in LINE_VERTEX_FORMATS:
+            _logger.warning("Unknown %s=%r; using 'xy32'", VERTEX_FORMAT_ENV, vertex_format)
+            vertex_format = "xy32"
+        cache_max_bytes = CACHE_MAX_BYTES
+        cache_mb = os.environ.get(GPU_CACHE_MB_ENV)
+        if cache_mb is not None:
+            try:
+                cache_max_bytes = max(0, int(float(cache_mb) * 1024 * 1024))
+            except ValueError:
+                _logger.warning("Invalid %s=%r; using default", GPU_CACHE_MB_ENV, cache_mb)
+        self._perf = PerfCollector.from_env()
+        self._renderer = DrawRenderer(
+            self.window,
+            settings,
+            line_mode=line_mode,
+            vertex_format=vertex_format,
+            cache_max_bytes=cache_max_bytes,
+            perf=self._perf,
+        )
+        self._perf.attach_gpu_timer(self._renderer.ctx)
 
         self._svg_output_path = output_path_for_draw(
             kind="svg", ext="svg", draw=draw, run_id=run_id
@@ -92,7 +140,11 @@ class DrawWindowSystem:
         # draw(t) に渡す t の基準時刻。
         start_time = time.perf_counter()
         self._clock = RealTimeClock(start_time=start_time)
-        self._perf = PerfCollector.from_env()
+        self._batch_layers = env_flag(BATCH_LAYERS_ENV)
+        self._reuse_frames = env_flag(REUSE_FRAMES_ENV, default=True)
+        # 直近フレームの内容の指紋と描画統計（内容が同じフレームの再提示に使う）。
+        self._last_fingerprint: tuple[object, ...] | None = None
+        self._last_draw_counts: tuple[int, int] = (0, 0)
         self._scene_runner = SceneRunner(draw, perf=self._perf, n_worker=int(n_worker))
 
     def _on_key_press(self, symbol: int, _modifiers: int) -> None:
@@ -108,6 +160,13 @@ class DrawWindowSystem:
                 self.start_video_recording()
             else:
                 self.stop_video_recording()
+            return
+        if symbol == key.L:
+            modes = LINE_MODES
+            current = self._renderer.line_mode
+            next_mode = modes[(modes.index(current) + 1) % len(modes)]
+            self._renderer.set_line_mode(next_mode)
+            print(f"Line mode: {next_mode}")
 
     def save_svg(self) -> Path:
         """最後に描画したフレームを SVG として保存し、保存先パスを返す。"""
@@ -153,6 +212,7 @@ class DrawWindowSystem:
             # さらに、録画の read などで framebuffer binding が揺れるケースに備え、
             # 毎フレーム「screen」を明示的に bind してから描画を始める。
             self._renderer.ctx.screen.use()
+            self._renderer.begin_frame()
 
             # --- 1) ビューポート更新 ---
             #
@@ -165,19 +225,14 @@ class DrawWindowSystem:
             # --- 2) Style（背景色 / グローバル線幅 / グローバル線色）の確定 ---
             style = self._style.resolve()
 
-            # --- 3) 背景クリア ---
-            #
-            # まず背景色でクリアしてから、このフレームのシーンを描く。
-            self._renderer.clear(style.bg_color_rgb01)
-
-            # --- 4) 時刻 t の算出 ---
+            # --- 3) 時刻 t の算出 ---
             #
             # draw(t) は “開始時刻からの経過秒” を受け取る。
             # これを使ってユーザー側でアニメーション等を表現できる。
             recording = self._recording.is_recording
             t = self._recording.t() if recording else self._clock.t()
 
-            # --- 5) Geometry の param 解決 + 描画 ---
+            # --- 4) Geometry の param 解決 ---
             #
             effective_defaults = LayerStyleDefaults(
                 color=style.global_line_color_rgb01,
@@ -191,28 +246,55 @@ class DrawWindowSystem:
                 recording=recording,
             )
             self._last_realized_layers = realized_layers
-            frame_vertices = 0
-            frame_lines = 0
-            for item in realized_layers:
-                with perf.section("indices"):
-                    indices, stats = build_line_indices_and_stats(item.realized.offsets)
-                frame_vertices += int(stats.draw_vertices)
-                frame_lines += int(stats.draw_lines)
-                with perf.section("render_layer"):
-                    self._renderer.render_layer(
-                        realized=item.realized,
-                        indices=indices,
-                        geometry_id=item.layer.geometry.id,
-                        color=item.color,
-                        thickness=item.thickness,
-                    )
+
+            # --- 5) 背景クリア + 描画 ---
+            #
+            # レイヤーの GeometryId/スタイル・背景色・画面サイズが前フレームと同じなら、
+            # 保存しておいたフレームを再提示して clear と draw call を丸ごと省く。
+            # 同じ内容が 2 フレーム続いたときに保存し、3 フレーム目から再提示する
+            # （アニメーション中は保存のコピーも発生しない）。録画中は常に描く。
+            fingerprint = (
+                (int(fb_w), int(fb_h)),
+                tuple(style.bg_color_rgb01),
+                self._renderer.line_mode,
+                tuple(
+                    (item.layer.geometry.id, tuple(item.color), float(item.thickness))
+                    for item in realized_layers
+                ),
+            )
+            unchanged = (
+                self._reuse_frames and not recording and fingerprint == self._last_fingerprint
+            )
+            if not unchanged:
+                self._renderer.invalidate_cached_frame()
+            self._last_fingerprint = fingerprint
+            if unchanged and self._renderer.present_cached_frame((fb_w, fb_h)):
+                perf.add_count("frame_reused", 1)
+                frame_vertices, frame_lines = self._last_draw_counts
+            else:
+                self._renderer.clear(style.bg_color_rgb01)
+                frame_vertices, frame_lines = self._render_layers(realized_layers)
+                self._last_draw_counts = (frame_vertices, frame_lines)
+                if unchanged:
+                    self._renderer.store_frame((fb_w, fb_h))
+
+            cache_stats = self._renderer.cache_stats()
+            perf.add_count("cache_hit", cache_stats.hits)
+            perf.add_count("cache_upload", cache_stats.uploads)
+            perf.set_gauge("cache_resident_mb", cache_stats.resident_bytes / (1024.0 * 1024.0))
 
             monitor = self._monitor
             if monitor is not None:
                 monitor.set_draw_counts(vertices=int(frame_vertices), lines=int(frame_lines))
+                monitor.set_gpu_cache_counts(
+                    hits=cache_stats.hits,
+                    uploads=cache_stats.uploads,
+                    upload_bytes=cache_stats.upload_bytes,
+                    resident_bytes=cache_stats.resident_bytes,
+                )
 
             if recording:
-                with perf.section("video"):
+                with perf.section("video", gpu=True):
                     self._recording.write_frame(self._renderer.ctx.screen)
 
             if self._pending_png_save:
@@ -234,6 +316,82 @@ class DrawWindowSystem:
                 with perf.section("gpu_finish"):
                     self._renderer.finish()
 
+    def _render_layers(self, realized_layers: list[RealizedLayer]) -> tuple[int, int]:
+        """レイヤーを順に描画し、描画した (頂点数, ライン数) を返す。"""
+        perf = self._perf
+        frame_vertices = 0
+        frame_lines = 0
+        # バッチ描画時は、連続する通常レイヤーを溜めてまとめて描く（描画順は保つ）。
+        pending: list[BatchedLayer] = []
+        for item in realized_layers:
+            realized = item.realized
+            # InstancedGeometry は展開せず、base の indices を全インスタンスで共有する。
+            if isinstance(realized, InstancedGeometry):
+                draw_offsets = realized.base.offsets
+                n_instances = realized.n_instances
+            else:
+                draw_offsets = realized.offsets
+                n_instances = 1
+            instanced = isinstance(realized, InstancedGeometry)
+            batched = self._batch_layers and not instanced
+            with perf.section("indices"):
+                if not instanced and not batched and prefers_line_strips(draw_offsets):
+                    # 少数の長いポリラインは、インデックスを作らず strip ごとに描く。
+                    line_draw, stats = build_line_strips_and_stats(draw_offsets)
+                else:
+                    line_draw, stats = self._renderer.line_indices(
+                        item.layer.geometry.id, draw_offsets
+                    )
+            frame_vertices += int(stats.draw_vertices) * n_instances
+            frame_lines += int(stats.draw_lines) * n_instances
+            if batched:
+                assert not isinstance(line_draw, LineStrips)
+                if len(pending) >= self._renderer.max_batch_layers:
+                    # スタイル表（1 行のテクスチャ）に入りきらない分は次のバッチへ回す。
+                    self._flush_layer_batch(pending)
+                pending.append(
+                    BatchedLayer(
+                        realized=realized,
+                        indices=line_draw,
+                        geometry_id=item.layer.geometry.id,
+                        color=item.color,
+                        thickness=item.thickness,
+                    )
+                )
+                continue
+            self._flush_layer_batch(pending)
+            with perf.section("render_layer", gpu=True):
+                self._renderer.render_layer(
+                    realized=realized,
+                    indices=line_draw,
+                    geometry_id=item.layer.geometry.id,
+                    color=item.color,
+                    thickness=item.thickness,
+                )
+        self._flush_layer_batch(pending)
+        return frame_vertices, frame_lines
+
+    def _flush_layer_batch(self, pending: list[BatchedLayer]) -> None:
+        """溜めたレイヤーを描画して pending を空にする。"""
+        if not pending:
+            return
+        perf = self._perf
+        if len(pending) == 1:
+            # 1 枚だけなら GPU メッシュキャッシュが効く通常経路の方が有利。
+            layer = pending[0]
+            with perf.section("render_layer", gpu=True):
+                self._renderer.render_layer(
+                    realized=layer.realized,
+                    indices=layer.indices,
+                    geometry_id=layer.geometry_id,
+                    color=layer.color,
+                    thickness=layer.thickness,
+                )
+        else:
+            with perf.section("render_layer_batch", gpu=True):
+                self._renderer.render_layer_batch(pending)
+        pending.clear()
+
     def close(self) -> None:
         """GPU / window 資源を解放する。"""
 
@@ -256,5 +414,6 @@ class DrawWindowSystem:
         self._scene_runner.close()
 
         # renderer が保持している GPU リソースを破棄してから window を閉じる。
+        self._perf.detach_gpu_timer()
         self._renderer.release()
         self.window.close()
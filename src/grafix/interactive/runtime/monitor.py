@@ -1,5 +1,6 @@
 # どこで: `src/grafix/interactive/runtime/monitor.py`。
-# 何を: interactive 実行中の軽量メトリクス（FPS/CPU/RSS/頂点/ライン）を計測し、GUI 表示用スナップショットを提供する。
+# 何を: interactive 実行中の軽量メトリクス（FPS/CPU/RSS/頂点/ライン/GPU キャッシュ）を計測し、
+#       GUI 表示用スナップショットを提供する。
 # なぜ: Parameter GUI 上で描画負荷を即座に把握できるようにするため。
 
 from __future__ import annotations
@@ -18,6 +19,10 @@ class MonitorSnapshot:
     rss_mb: float
     vertices: int
     lines: int
+    gpu_hits: int = 0
+    gpu_uploads: int = 0
+    gpu_upload_mb: float = 0.0
+    gpu_resident_mb: float = 0.0
 
 
 class RuntimeMonitor:
@@ -54,6 +59,11 @@ class RuntimeMonitor:
         self._vertices = 0
         self._lines = 0
 
+        self._gpu_hits = 0
+        self._gpu_uploads = 0
+        self._gpu_upload_mb = 0.0
+        self._gpu_resident_mb = 0.0
+
         try:
             import psutil  # type: ignore[import-untyped]
         except Exception as exc:
@@ -114,6 +124,19 @@ class RuntimeMonitor:
         self._vertices = int(vertices)
         self._lines = int(lines)
 
+    def set_gpu_cache_counts(
+        self, *, hits: int, uploads: int, upload_bytes: int, resident_bytes: int
+    ) -> None:
+        """直近フレームの GPU メッシュキャッシュ集計を設定する。
+
+        ヒット/upload 回数、転送量、常駐量を受け取る。
+        """
+
+        self._gpu_hits = int(hits)
+        self._gpu_uploads = int(uploads)
+        self._gpu_upload_mb = float(upload_bytes) / (1024.0 * 1024.0)
+        self._gpu_resident_mb = float(resident_bytes) / (1024.0 * 1024.0)
+
     def snapshot(self) -> MonitorSnapshot:
         """現在の監視値をスナップショットとして返す。"""
 
@@ -123,6 +146,10 @@ class RuntimeMonitor:
             rss_mb=float(self._rss_mb),
             vertices=int(self._vertices),
             lines=int(self._lines),
+            gpu_hits=int(self._gpu_hits),
+            gpu_uploads=int(self._gpu_uploads),
+            gpu_upload_mb=float(self._gpu_upload_mb),
+            gpu_resident_mb=float(self._gpu_resident_mb),
         )
 
     def _cpu_times_s(self, proc) -> float:
@@ -7,40 +7,92 @@
 from __future__ import annotations
 
 import contextlib
-import os
 import time
+from collections import deque
 from collections.abc import Iterator
+from typing import Any
 
+from grafix.core.env import env_flag, env_int
 
-def _env_flag(name: str) -> bool:
-    value = os.environ.get(name)
-    if value is None:
-        return False
-    return str(value).strip().lower() not in {"", "0", "false", "no", "off"}
 
+_GPU_ELAPSED_INVALID = 0xFFFFFFFF
 
-def _env_int(name: str, default: int) -> int:
-    value = os.environ.get(name)
-    if value is None:
-        return int(default)
-    try:
-        return int(value)
-    except Exception:
-        return int(default)
+
+class _GpuTimer:
+    """GL_TIME_ELAPSED クエリで区間ごとの GPU 時間を測り、数フレーム後に回収する。
+
+    Notes
+    -----
+    - GL_TIME_ELAPSED は入れ子にできず、moderngl は glQueryCounter（タイムスタンプ）を
+      公開していない。そのため入れ子の区間では外側のクエリをいったん閉じて内側を測り、
+      終わったら外側を測り直す。各区間の GPU 時間は内側の区間を除いた分になる。
+    - 結果は `latency` フレーム後に読む（その頃には GPU が終えている想定）。
+      moderngl は結果の準備完了を問い合わせられないため、完了判定はフレーム数で代用する。
+    """
+
+    def __init__(self, ctx: Any, *, latency: int = 3) -> None:
+        self.ctx = ctx
+        self.latency = max(1, int(latency))
+        self._free: list[Any] = []
+        self._stack: list[str] = []
+        self._active: Any = None
+        self._frame: list[tuple[str, Any]] = []
+        self._in_flight: deque[list[tuple[str, Any]]] = deque()
+
+    def push(self, name: str) -> None:
+        self._switch_to(name)
+        self._stack.append(name)
+
+    def pop(self) -> None:
+        self._stack.pop()
+        self._switch_to(self._stack[-1] if self._stack else None)
+
+    def _switch_to(self, name: str | None) -> None:
+        if self._active is not None:
+            self._active.__exit__(None, None, None)
+            self._active = None
+        if name is None:
+            return
+        query = self._free.pop() if self._free else self.ctx.query(time=True)
+        query.__enter__()
+        self._active = query
+        self._frame.append((name, query))
+
+    def end_frame(self) -> list[tuple[str, int]]:
+        """フレームを締め、`latency` フレーム前の `(区間名, GPU ns)` を返す。"""
+        self._in_flight.append(self._frame)
+        self._frame = []
+        results: list[tuple[str, int]] = []
+        while len(self._in_flight) > self.latency:
+            for name, query in self._in_flight.popleft():
+                elapsed = int(query.elapsed)
+                # moderngl は結果を 32bit で読む。ドライバによっては最初のクエリが
+                # 0xFFFFFFFF（未確定）を返すので捨てる。
+                if elapsed != _GPU_ELAPSED_INVALID:
+                    results.append((name, elapsed))
+                self._free.append(query)
+        return results
 
 
 class _PerfSection:
-    def __init__(self, perf: "PerfCollector", name: str) -> None:
+    def __init__(
+        self, perf: "PerfCollector", name: str, gpu_timer: _GpuTimer | None = None
+    ) -> None:
         self._perf = perf
         self._name = str(name)
+        self._gpu_timer = gpu_timer
         self._t0_ns = 0
 
     def __enter__(self) -> None:
+        if self._gpu_timer is not None:
+            self._gpu_timer.push(self._name)
         self._t0_ns = time.perf_counter_ns()
 
     def __exit__(self, _exc_type: object, _exc: object, _tb: object) -> None:
         dt = time.perf_counter_ns() - self._t0_ns
         self._perf._add(self._name, int(dt))
+        if self._gpu_timer is not None:
+            self._gpu_timer.pop()
 
 
 class PerfCollector:
@@ -57,14 +109,21 @@ class PerfCollector:
         enabled: bool,
         print_every: int = 60,
         gpu_finish: bool = False,
+        gpu_timer: bool = False,
     ) -> None:
         self.enabled = bool(enabled)
         self.print_every = int(print_every) if int(print_every) > 0 else 60
         self.gpu_finish = bool(gpu_finish)
+        self.gpu_timer = bool(gpu_timer)
+        self._gpu: _GpuTimer | None = None
 
         self._window_frames = 0
         self._sum_ns: dict[str, int] = {}
         self._calls: dict[str, int] = {}
+        self._bytes: dict[str, int] = {}
+        self._counts: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._gpu_sum_ns: dict[str, int] = {}
 
     @classmethod
     def from_env(cls) -> "PerfCollector":
@@ -73,18 +132,54 @@ class PerfCollector:
         - `GRAFIX_PERF=1` で有効化する。
         - `GRAFIX_PERF_EVERY=60` で何フレームごとに出力するかを指定する。
         - `GRAFIX_PERF_GPU_FINISH=1` で `ctx.finish()` を含む GPU 同期計測を有効化する。
+        - `GRAFIX_PERF_GPU_TIMER=0` で GPU タイマークエリ（既定で有効）を無効化する。
         """
         return cls(
-            enabled=_env_flag("GRAFIX_PERF"),
-            print_every=_env_int("GRAFIX_PERF_EVERY", 60),
-            gpu_finish=_env_flag("GRAFIX_PERF_GPU_FINISH"),
+            enabled=env_flag("GRAFIX_PERF"),
+            print_every=env_int("GRAFIX_PERF_EVERY", 60),
+            gpu_finish=env_flag("GRAFIX_PERF_GPU_FINISH"),
+            gpu_timer=env_flag("GRAFIX_PERF_GPU_TIMER", default=True),
         )
 
-    def section(self, name: str) -> contextlib.AbstractContextManager[None]:
-        """`with` で囲った区間の時間を加算する。"""
+    def attach_gpu_timer(self, ctx: Any) -> None:
+        """ctx の GL_TIME_ELAPSED クエリで `section(..., gpu=True)` の GPU 時間も測る。
+
+        計測が無効、または `gpu_timer=False` のときは何もしない。
+        """
+        if not self.enabled or not self.gpu_timer:
+            return
+        self._gpu = _GpuTimer(ctx)
+
+    def detach_gpu_timer(self) -> None:
+        """GPU タイマーを外す（GL context を破棄する前に使う）。回収前の結果は捨てる。"""
+        self._gpu = None
+
+    def section(self, name: str, *, gpu: bool = False) -> contextlib.AbstractContextManager[None]:
+        """`with` で囲った区間の時間を加算する。
+
+        gpu=True なら、GPU タイマーが付いているときに区間内の GPU 時間も測る。
+        """
         if not self.enabled:
             return contextlib.nullcontext()
-        return _PerfSection(self, str(name))
+        return _PerfSection(self, str(name), self._gpu if gpu else None)
+
+    def add_bytes(self, name: str, nbytes: int) -> None:
+        """区間 name で転送したバイト数を加算する（同名 section の時間からスループットを出す）。"""
+        if not self.enabled:
+            return
+        self._bytes[name] = int(self._bytes.get(name, 0)) + int(nbytes)
+
+    def add_count(self, name: str, n: int = 1) -> None:
+        """回数カウンタ name に n を加算する（出力は 1 フレームあたりの平均）。"""
+        if not self.enabled:
+            return
+        self._counts[name] = int(self._counts.get(name, 0)) + int(n)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """その時点の値 name を記録する（出力は最後に記録した値）。"""
+        if not self.enabled:
+            return
+        self._gauges[name] = float(value)
 
     @contextlib.contextmanager
     def frame(self) -> Iterator[None]:
@@ -98,6 +193,9 @@ class PerfCollector:
             yield
         finally:
             self._add("frame", int(time.perf_counter_ns() - t0))
+            if self._gpu is not None:
+                for name, dt_ns in self._gpu.end_frame():
+                    self._gpu_sum_ns[name] = int(self._gpu_sum_ns.get(name, 0)) + dt_ns
             self._window_frames += 1
             if self._window_frames % self.print_every == 0:
                 self._print_and_reset()
@@ -123,12 +221,32 @@ class PerfCollector:
             calls = int(self._calls.get(name, 0))
             calls_per_frame = float(calls) / float(frames)
             if calls_per_frame >= 1.5:
-                parts.append(f"{name}={_ms(total_ns):.3f}ms ({calls_per_frame:.1f}x)")
+                part = f"{name}={_ms(total_ns):.3f}ms ({calls_per_frame:.1f}x)"
             else:
-                parts.append(f"{name}={_ms(total_ns):.3f}ms")
+                part = f"{name}={_ms(total_ns):.3f}ms"
+            total_bytes = self._bytes.get(name)
+            if total_bytes is not None:
+                mb_per_frame = float(total_bytes) / float(frames) / 1_000_000.0
+                part += f" {mb_per_frame:.2f}MB/f"
+                if total_ns > 0:
+                    mb_per_s = float(total_bytes) / (float(total_ns) / 1e9) / 1_000_000.0
+                    part += f" {mb_per_s:.0f}MB/s"
+            parts.append(part)
+            gpu_ns = self._gpu_sum_ns.get(name)
+            if gpu_ns is not None:
+                parts.append(f"{name}[gpu]={_ms(gpu_ns):.3f}ms")
+
+        for name in sorted(self._counts.keys()):
+            parts.append(f"{name}={float(self._counts[name]) / float(frames):.1f}/f")
+        for name in sorted(self._gauges.keys()):
+            parts.append(f"{name}={self._gauges[name]:.1f}")
 
         print("[grafix-perf]", " ".join(parts))
 
         self._window_frames = 0
         self._sum_ns.clear()
         self._calls.clear()
+        self._bytes.clear()
+        self._counts.clear()
+        self._gauges.clear()
+        self._gpu_sum_ns.clear()
@@ -6,17 +6,36 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from grafix.interactive.gl.pixel_readback import PixelReadbackRing
 from grafix.interactive.runtime.frame_clock import RecordingClock
-from grafix.interactive.runtime.video_recorder import VideoRecorder
+from grafix.interactive.runtime.video_recorder import VideoFrameWriter, VideoRecorder
 
 
 class VideoRecordingSystem:
-    """動画録画の最小ステートマシン。"""
-
-    def __init__(self, *, output_path: Path, fps: float) -> None:
+    """動画録画の最小ステートマシン。
+
+    Notes
+    -----
+    - 画素は `PixelReadbackRing` で `readback_depth - 1` フレーム遅れに読み戻す
+      （GPU の描画完了を描画スレッドで待たない）。
+    - ffmpeg への書き込みは `VideoFrameWriter` の別スレッドで行う
+      （キューは `max_pending_frames` フレームまで）。
+    """
+
+    def __init__(
+        self,
+        *,
+        output_path: Path,
+        fps: float,
+        readback_depth: int = 3,
+        max_pending_frames: int = 8,
+    ) -> None:
         self._output_path = Path(output_path)
         self._fps = float(fps)
-        self._recorder: VideoRecorder | None = None
+        self._readback_depth = max(1, int(readback_depth))
+        self._max_pending_frames = max(1, int(max_pending_frames))
+        self._writer: VideoFrameWriter | None = None
+        self._readback: PixelReadbackRing | None = None
         self._clock: RecordingClock | None = None
         self._size = (0, 0)
 
@@ -24,7 +43,7 @@ class VideoRecordingSystem:
     def is_recording(self) -> bool:
         """録画中なら True を返す。"""
 
-        return self._recorder is not None
+        return self._writer is not None
 
     def t(self) -> float:
         """録画タイムライン上の `t`（秒）を返す。"""
@@ -37,53 +56,70 @@ class VideoRecordingSystem:
     def start(self, *, framebuffer_size: tuple[int, int], t0: float) -> None:
         """録画を開始する。"""
 
-        if self._recorder is not None:
+        if self._writer is not None:
             return
         if self._fps <= 0:
             raise ValueError("録画には fps > 0 が必要です")
 
         w, h = framebuffer_size
         self._size = (int(w), int(h))
-        self._recorder = VideoRecorder(
+        recorder = VideoRecorder(
             output_path=self._output_path,
             size=self._size,
             fps=self._fps,
         )
+        self._writer = VideoFrameWriter(recorder, max_pending=self._max_pending_frames)
         self._clock = RecordingClock(t0=float(t0), fps=self._fps)
         print(f"Started video recording: {self._output_path} (fps={self._fps:g})")
 
     def write_frame(self, screen: object) -> None:
-        """現在の screen 内容を 1 フレームとして書き込む。"""
+        """現在の screen 内容を 1 フレームとして書き込む。
+
+        読み出しは非同期に発行し、書き込みは数フレーム前の画素から順に行う。
+        """
 
-        recorder = self._recorder
+        writer = self._writer
         clock = self._clock
-        if recorder is None or clock is None:
+        if writer is None or clock is None:
             return
 
-        w, h = self._size
-        frame = screen.read(  # type: ignore[attr-defined]
-            viewport=(0, 0, int(w), int(h)),
-            components=3,
-            alignment=1,
-        )
-        recorder.write_frame_rgb24(frame)
+        readback = self._readback
+        if readback is None:
+            readback = PixelReadbackRing(
+                screen.ctx,  # type: ignore[attr-defined]
+                self._size,
+                depth=self._readback_depth,
+            )
+            self._readback = readback
+        frame = readback.push(screen)
+        if frame is not None:
+            writer.submit(frame)
         clock.tick()
 
     def stop(self) -> None:
-        """録画を終了する。"""
+        """録画を終了する（読み出し待ち・書き込み待ちのフレームを書き切ってから閉じる）。"""
 
-        recorder = self._recorder
+        writer = self._writer
         clock = self._clock
-        if recorder is None or clock is None:
+        if writer is None or clock is None:
             return
 
-        self._recorder = None
+        self._writer = None
+        readback = self._readback
+        self._readback = None
         frames = int(clock.frame_index)
         seconds = frames / float(self._fps) if self._fps > 0 else 0.0
         try:
-            recorder.close()
+            if readback is not None:
+                try:
+                    for frame in readback.drain():
+                        writer.submit(frame)
+                finally:
+                    readback.release()
         finally:
-            self._clock = None
-            self._size = (0, 0)
-        print(f"Saved video: {recorder.path} (frames={frames}, seconds={seconds:.3f})")
-
+            try:
+                writer.close()
+            finally:
+                self._clock = None
+                self._size = (0, 0)
+        print(f"Saved video: {writer.recorder.path} (frames={frames}, seconds={seconds:.3f})")
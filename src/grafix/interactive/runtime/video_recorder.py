@@ -4,7 +4,9 @@
 
 from __future__ import annotations
 
+import queue
 import subprocess
+import threading
 from collections.abc import Callable
 from pathlib import Path
 
@@ -139,3 +141,72 @@ class VideoRecorder:
             raise RuntimeError(
                 f"ffmpeg が失敗しました (code={proc.returncode}). {details}".strip()
             )
+
+
+class VideoFrameWriter:
+    """別スレッドで `VideoRecorder` へフレームを書き込む、上限付きキューの書き込み器。
+
+    Notes
+    -----
+    - ffmpeg の stdin への書き込み（エンコードが追いつかないと pipe で待たされる）を
+      描画スレッドから外すためのもの。
+    - キューが `max_pending` フレームで埋まると `submit()` は空くまで待つ
+      （録画はフレームを落とさない。メモリも `max_pending` フレーム分で頭打ちになる）。
+    - 書き込みスレッドで起きた例外は、次の `submit()` か `close()` で呼び出し側へ送り直す。
+    """
+
+    _STOP = None
+
+    def __init__(self, recorder: VideoRecorder, *, max_pending: int = 8) -> None:
+        self.recorder = recorder
+        self._queue: queue.Queue[bytes | None] = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="grafix-video-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, frame: bytes) -> None:
+        """1 フレーム分の RGB24 バイト列を書き込み待ちに積む。"""
+
+        if self._closed:
+            raise RuntimeError("録画は終了しています")
+        self._raise_pending_error()
+        while True:
+            try:
+                self._queue.put(frame, timeout=0.1)
+                return
+            except queue.Full:
+                # 書き込みスレッドが落ちているとキューは空かないので、待ち続けない。
+                self._raise_pending_error()
+
+    def close(self) -> None:
+        """積まれたフレームを書き終えるまで待ち、録画器を閉じる。"""
+
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        try:
+            self._raise_pending_error()
+        finally:
+            self.recorder.close()
+
+    def _raise_pending_error(self) -> None:
+        error = self._error
+        if error is not None:
+            raise RuntimeError(f"動画フレームの書き込みに失敗しました: {error}") from error
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is self._STOP:
+                return
+            try:
+                self.recorder.write_frame_rgb24(frame)
+            except BaseException as e:
+                self._error = e
+                return
@@ -75,3 +75,58 @@ def test_buffer_preserves_plane_for_xz_segment() -> None:
 
     ys = realized.coords[:, 1]
     np.testing.assert_allclose(ys, 0.0, rtol=0.0, atol=1e-6)
+
+
+def test_buffer_batch_matches_per_line_results() -> None:
+    from grafix.core.effects.buffer import buffer as buffer_impl
+
+    rng = np.random.default_rng(5)
+    lines = [rng.normal(size=(int(n), 3)).astype(np.float32) * 10.0 for n in (2, 4, 1, 3, 5)]
+    lines[1][:, 2] = 0.0
+    offsets = np.zeros(len(lines) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum([line.shape[0] for line in lines])
+    base = RealizedGeometry(coords=np.concatenate(lines), offsets=offsets)
+
+    for planar in (False, True):
+        if planar:
+            coords = base.coords.copy()
+            coords[:, 2] = 0.0
+            base = RealizedGeometry(coords=coords, offsets=offsets)
+        batched = buffer_impl([base], distance=1.5, quad_segs=4)
+
+        expected_coords = []
+        expected_counts: list[int] = []
+        for i in range(len(lines)):
+            line = base.coords[offsets[i] : offsets[i + 1]]
+            if line.shape[0] < 2:
+                continue
+            single = buffer_impl(
+                [RealizedGeometry(coords=line, offsets=np.array([0, line.shape[0]]))],
+                distance=1.5,
+                quad_segs=4,
+            )
+            expected_coords.append(single.coords)
+            expected_counts.extend(np.diff(single.offsets).tolist())
+
+        assert np.diff(batched.offsets).tolist() == expected_counts
+        np.testing.assert_allclose(
+            batched.coords, np.concatenate(expected_coords), rtol=0.0, atol=1e-4
+        )
+
+
+def test_buffer_uses_per_line_plane_for_coplanar_segments() -> None:
+    from grafix.core.effects.buffer import buffer as buffer_impl
+
+    # 傾いた平面 y=z 上の平行な 2 線分。union=False では線ごとの平面（ここでは xy）で buffer する。
+    coords = np.array(
+        [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [0.0, 2.0, 2.0], [10.0, 2.0, 2.0]],
+        dtype=np.float32,
+    )
+    base = RealizedGeometry(coords=coords, offsets=np.array([0, 2, 4], dtype=np.int32))
+    out = buffer_impl([base], distance=1.0, quad_segs=4)
+
+    assert out.offsets.size - 1 == 2
+    for i, z in enumerate((0.0, 2.0)):
+        ring = out.coords[out.offsets[i] : out.offsets[i + 1]]
+        np.testing.assert_allclose(ring[:, 2], z, rtol=0.0, atol=1e-6)
+    np.testing.assert_allclose(np.ptp(out.coords, axis=0), [12.0, 4.0, 2.0], atol=1e-5)
@@ -129,3 +129,72 @@ def test_clip_draw_outline_returns_outline_when_result_empty() -> None:
     ring = out.coords[s0:e0]
     assert ring.shape[0] >= 4
     np.testing.assert_allclose(ring[0], ring[-1], rtol=0.0, atol=1e-6)
+
+
+@pytest.mark.skipif(pyclipper is None, reason="pyclipper が未インストール")  # type: ignore[arg-type]
+def test_clip_reuses_prepared_mask_for_same_mask_geometry(monkeypatch) -> None:
+    from grafix.core.effects import clip as clip_module
+
+    calls: list[int] = []
+    prepare = clip_module._prepare_mask
+
+    def counting_prepare(mask, scale):  # type: ignore[no-untyped-def]
+        calls.append(1)
+        return prepare(mask, scale)
+
+    monkeypatch.setattr(clip_module, "_prepare_mask", counting_prepare)
+    clip_module._mask_cache.clear()
+
+    b = G.polygon(n_sides=6, scale=3.0)
+    for phase in (0.0, 0.5, 1.0):
+        a = E.translate(delta=(phase, 0.0, 0.0))(G.grid(nx=11, ny=11, scale=10.0))
+        out = realize(E.clip(mode="inside")(a, b))
+        assert out.coords.shape[0] > 0
+
+    assert len(calls) == 1
+
+
+@pytest.mark.skipif(pyclipper is None, reason="pyclipper が未インストール")  # type: ignore[arg-type]
+def test_clip_builds_mask_outline_only_when_drawn() -> None:
+    from grafix.core.effects import clip as clip_module
+
+    clip_module._mask_cache.clear()
+    # realize キャッシュに乗っていない（他のテストと重ならない）入力にする。
+    a = G.grid(nx=13, ny=13, scale=10.0)
+    b = G.polygon(n_sides=7, scale=3.25)
+
+    realize(E.clip(mode="inside")(a, b))
+    ((_mask, prepared),) = clip_module._mask_cache.values()
+    assert prepared is not None and prepared._outline is None
+
+    out = realize(E.clip(mode="inside", draw_outline=True)(a, b))
+    assert prepared._outline is not None
+    assert out.offsets.size >= 2
+
+
+def test_clip_int_paths_drop_duplicates_and_closing_points() -> None:
+    from grafix.core.effects.clip import _to_int_paths
+
+    xy = np.array(
+        [
+            [0.0, 0.0],
+            [0.0001, 0.0],  # scale=1000 で直前と同じ整数点
+            [1.0, 0.0],
+            [1.0, 1.0],
+            [0.0, 0.0],  # 閉じ点
+            [5.0, 5.0],  # 1 点だけの線
+            [2.0, 2.0],
+            [3.0, 2.0],
+        ],
+        dtype=np.float64,
+    )
+    offsets = np.array([0, 5, 6, 8], dtype=np.int32)
+
+    rings = _to_int_paths(xy, offsets, 1000, min_points=3)
+    assert [r.tolist() for r in rings] == [[[0, 0], [1000, 0], [1000, 1000]]]
+
+    opens = _to_int_paths(xy, offsets, 1000, min_points=2)
+    assert [p.tolist() for p in opens] == [
+        [[0, 0], [1000, 0], [1000, 1000]],
+        [[2000, 2000], [3000, 2000]],
+    ]
@@ -142,3 +142,38 @@ def test_dash_empty_geometry_is_noop() -> None:
 
     assert realized.coords.shape == (0, 3)
     assert realized.offsets.tolist() == [0]
+
+
+def _many_short_polylines(n_lines: int) -> RealizedGeometry:
+    rng = np.random.default_rng(7)
+    counts = rng.integers(1, 6, size=n_lines)
+    offsets = np.zeros(n_lines + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum(counts)
+    coords = (rng.normal(size=(int(offsets[-1]), 3)) * 5.0).astype(np.float32)
+    # 全長 0 の線も混ぜる（原線維持の分岐）。
+    coords[offsets[3] : offsets[4]] = coords[offsets[3]]
+    return RealizedGeometry(coords=coords, offsets=offsets)
+
+
+def test_dash_multi_polyline_matches_per_line_results() -> None:
+    from grafix.core.effects.dash import dash as dash_impl
+
+    base = _many_short_polylines(200)
+    kwargs = {"dash_length": (1.0, 2.5), "gap_length": 0.75, "offset": (0.0, 1.2)}
+    dashed = dash_impl([base], **kwargs)
+
+    expected_coords = []
+    expected_counts = []
+    for li, line in enumerate(_iter_polylines(base)):
+        offsets = np.array([0, line.shape[0]], dtype=np.int32)
+        single = dash_impl(
+            [RealizedGeometry(coords=line.copy(), offsets=offsets)],
+            dash_length=kwargs["dash_length"],
+            gap_length=kwargs["gap_length"],
+            offset=kwargs["offset"][li % 2],
+        )
+        expected_coords.append(single.coords)
+        expected_counts.extend(np.diff(single.offsets).tolist())
+
+    np.testing.assert_array_equal(dashed.coords, np.concatenate(expected_coords))
+    assert np.diff(dashed.offsets).tolist() == expected_counts
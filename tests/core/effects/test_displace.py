@@ -121,3 +121,100 @@ def test_displace_empty_geometry_is_noop() -> None:
     )
     assert out.coords.shape == (0, 3)
     assert out.offsets.tolist() == [0]
+
+
+def _dense_coords(n: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.uniform(-100.0, 100.0, size=(n, 3)).astype(np.float32)
+
+
+def test_displace_parallel_kernel_matches_serial(monkeypatch) -> None:
+    from grafix.core.effects import displace as displace_module
+
+    monkeypatch.setattr(displace_module, "PARALLEL_MIN_VERTICES", 0)
+    coords = _dense_coords(2_000)
+    args = (
+        coords,
+        (8.0, 8.0, 8.0),
+        (1.0, -2.0, 0.0),
+        (0.04, 0.04, 0.04),
+        (0.5, 0.0, 1.0),
+        0.3,
+        0.1,
+        2.0,
+        displace_module.NOISE_PERMUTATION_TABLE,
+        displace_module.NOISE_GRADIENTS_3D,
+    )
+
+    for precision in ("float64", "float32"):
+        serial = displace_module._apply_noise_to_coords(
+            *args, parallel=False, precision=precision
+        )
+        parallel = displace_module._apply_noise_to_coords(
+            *args, parallel=True, precision=precision
+        )
+        np.testing.assert_array_equal(parallel, serial)
+
+
+def test_displace_float32_env_switch_stays_close(monkeypatch) -> None:
+    from grafix.core.effects import displace as displace_module
+
+    coords = _dense_coords(500)
+    base = RealizedGeometry(
+        coords=coords, offsets=np.array([0, coords.shape[0]], dtype=np.int32)
+    )
+
+    monkeypatch.delenv(displace_module.PRECISION_ENV, raising=False)
+    out64 = displace_impl([base], amplitude=(8.0, 8.0, 8.0), t=0.25)
+    monkeypatch.setenv(displace_module.PRECISION_ENV, "float32")
+    monkeypatch.setenv(displace_module.PARALLEL_ENV, "1")
+    out32 = displace_impl([base], amplitude=(8.0, 8.0, 8.0), t=0.25)
+
+    assert out32.coords.dtype == np.float32
+    assert out32.offsets.tolist() == out64.offsets.tolist()
+    np.testing.assert_allclose(out32.coords, out64.coords, rtol=0.0, atol=0.05)
+
+
+def _dense_grid_geometry(n_side: int) -> RealizedGeometry:
+    xs = np.linspace(-100.0, 100.0, n_side, dtype=np.float32)
+    x, y = np.meshgrid(xs, xs)
+    coords = np.stack([x.ravel(), y.ravel(), np.zeros(x.size, dtype=np.float32)], axis=1)
+    offsets = np.arange(0, coords.shape[0] + 1, n_side, dtype=np.int32)
+    return RealizedGeometry(coords=coords, offsets=offsets)
+
+
+def test_displace_lattice_stays_within_documented_bound() -> None:
+    base = _dense_grid_geometry(250)
+    amplitude = (8.0, 8.0, 8.0)
+
+    for resolution in (4, 6):
+        for t in (0.0, 0.07, 0.13):
+            exact = displace_impl([base], amplitude=amplitude, t=t)
+            approx = displace_impl([base], amplitude=amplitude, t=t, lattice_resolution=resolution)
+            bound = 8.0 * 4.5 / float(resolution * resolution)
+            err = float(np.max(np.abs(approx.coords - exact.coords)))
+            assert 0.0 < err <= bound
+
+
+def test_displace_lattice_is_reused_across_frames() -> None:
+    from grafix.core.effects import displace as displace_module
+
+    base = _dense_grid_geometry(150)
+    displace_module._lattice_cache.clear()
+
+    displace_impl([base], t=0.0, lattice_resolution=4)
+    assert len(displace_module._lattice_cache) == 1
+    lattice = next(iter(displace_module._lattice_cache.values()))
+
+    displace_impl([base], t=0.05, lattice_resolution=4)
+    assert len(displace_module._lattice_cache) == 1
+    assert next(iter(displace_module._lattice_cache.values())) is lattice
+
+
+def test_displace_lattice_falls_back_to_exact_for_small_inputs() -> None:
+    g = G.displace_test_polyline()
+    base = realize(g)
+
+    exact = displace_impl([base], t=0.3)
+    approx = displace_impl([base], t=0.3, lattice_resolution=8)
+    np.testing.assert_array_equal(approx.coords, exact.coords)
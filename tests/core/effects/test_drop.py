@@ -335,3 +335,20 @@ def test_drop_probability_position_gradient_by_x() -> None:
     )
     np.testing.assert_allclose(realized.coords, expected_coords, rtol=0.0, atol=1e-6)
     assert realized.offsets.tolist() == [0, 2]
+
+
+def test_drop_skips_empty_polylines_and_keeps_line_indexing() -> None:
+    coords = np.array(
+        [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 2.0, 0.0], [0.0, 3.0, 0.0]],
+        dtype=np.float32,
+    )
+    # line 1 は空。interval は空行も 1 行として数える。
+    base = RealizedGeometry(coords=coords, offsets=np.array([0, 2, 2, 3, 5], dtype=np.int32))
+
+    out = drop_impl([base], interval=2, keep_mode="drop")
+
+    assert out.offsets.tolist() == [0, 2]
+    np.testing.assert_allclose(out.coords, [[0.0, 2.0, 0.0], [0.0, 3.0, 0.0]], rtol=0.0, atol=0.0)
+
+    out_keep = drop_impl([base], interval=2, keep_mode="keep")
+    assert out_keep.offsets.tolist() == [0, 2, 3]
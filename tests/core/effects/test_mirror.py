@@ -92,3 +92,36 @@ def test_mirror_n3_produces_2n_polylines() -> None:
     assert len(polylines) == 6
     assert all(p.shape == (2, 3) for p in polylines)
 
+
+@primitive
+def mirror_test_on_x_axis() -> RealizedGeometry:
+    """x=0 面上に乗る 2 点ポリラインを返す（反転しても同じ線になる）。"""
+    coords = np.array([[0.0, 1.0, 0.0], [0.0, 3.0, 0.0]], dtype=np.float32)
+    offsets = np.array([0, 2], dtype=np.int32)
+    return RealizedGeometry(coords=coords, offsets=offsets)
+
+
+def test_mirror_n1_dedups_line_on_mirror_plane() -> None:
+    g = G.mirror_test_on_x_axis()
+    mirrored = realize(E.mirror(n_mirror=1, cx=0.0, show_planes=False)(g))
+
+    assert mirrored.offsets.tolist() == [0, 2]
+    np.testing.assert_allclose(mirrored.coords, [[0.0, 1.0, 0.0], [0.0, 3.0, 0.0]], atol=1e-6)
+
+
+def test_unique_polyline_mask_compares_content_on_hash_collision(monkeypatch) -> None:
+    from grafix.core.effects import util
+
+    q = np.array(
+        [[0, 0, 0], [1, 0, 0], [0, 0, 0], [2, 0, 0], [0, 0, 0], [1, 0, 0], [5, 5, 5]],
+        dtype=np.int64,
+    )
+    offsets = np.array([0, 2, 4, 4, 6, 7], dtype=np.int32)
+    expected = [True, True, False, False, True]
+    assert util.unique_polyline_mask(q, offsets).tolist() == expected
+
+    # 全ポリラインを同一ハッシュにしても、内容比較で同じ結果になる。
+    monkeypatch.setattr(
+        util, "_polyline_hashes", lambda q, o: np.zeros(o.size - 1, dtype=np.uint64)
+    )
+    assert util.unique_polyline_mask(q, offsets).tolist() == expected
@@ -157,3 +157,55 @@ def test_mirror3d_show_planes_adds_lines() -> None:
     n0 = len(list(_iter_polylines(out0)))
     n1 = len(list(_iter_polylines(out1)))
     assert n1 > n0
+
+
+def test_mirror3d_clip_halfspaces_keeps_depth_first_piece_order() -> None:
+    from grafix.core.effects.mirror3d import _clip_halfspaces
+
+    # 1 本目は x=0 を 2 回跨ぐ（x>=0 側の 2 断片）、2 本目は全体が内側。
+    coords = np.array(
+        [
+            [1.0, 0.0, 0.0],
+            [-1.0, 0.0, 0.0],
+            [1.0, 1.0, 0.0],
+            [2.0, 0.0, 0.0],
+            [3.0, 0.0, 0.0],
+        ],
+        dtype=np.float32,
+    )
+    offsets = np.array([0, 3, 5], dtype=np.int32)
+    out_c, out_o = _clip_halfspaces(
+        coords,
+        offsets,
+        normals=(np.array([1.0, 0.0, 0.0], dtype=np.float32),),
+        center=np.zeros(3, dtype=np.float32),
+    )
+
+    assert out_o.tolist() == [0, 2, 4, 6]
+    np.testing.assert_allclose(
+        out_c,
+        [
+            [1.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0],
+            [0.0, 0.5, 0.0],
+            [1.0, 1.0, 0.0],
+            [2.0, 0.0, 0.0],
+            [3.0, 0.0, 0.0],
+        ],
+        atol=1e-6,
+    )
+
+
+def test_mirror3d_polyhedral_copies_are_rotations_of_source() -> None:
+    g = G.mirror3d_test_line_pos_octant()
+    out = realize(E.mirror3d(mode="polyhedral", group="O", center=(0.0, 0.0, 0.0))(g))
+
+    src = realize(g).coords.astype(np.float64)
+    for p in _iter_polylines(out):
+        # 回転なので原点からの距離と線分長が保たれる。
+        np.testing.assert_allclose(
+            np.linalg.norm(p, axis=1), np.linalg.norm(src, axis=1), atol=1e-5
+        )
+        np.testing.assert_allclose(
+            np.linalg.norm(p[1] - p[0]), np.linalg.norm(src[1] - src[0]), atol=1e-5
+        )
@@ -0,0 +1,83 @@
+"""`GRAFIX_*_PARALLEL` で切り替える並列カーネルが直列版と同じ出力を返すことをテスト。"""
+
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+
+import numpy as np
+import pytest
+
+from grafix.core.realized_geometry import RealizedGeometry
+
+
+def _random_polylines() -> RealizedGeometry:
+    rng = np.random.default_rng(7)
+    counts = rng.integers(1, 6, size=500)
+    offsets = np.zeros(counts.size + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum(counts)
+    coords = (rng.normal(size=(int(offsets[-1]), 3)) * 5.0).astype(np.float32)
+    # 全長 0 の線も混ぜる。
+    coords[offsets[3] : offsets[4]] = coords[offsets[3]]
+    return RealizedGeometry(coords=coords, offsets=offsets)
+
+
+def _mixed_lines() -> RealizedGeometry:
+    coords = np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [10.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.04, 1.0, 0.0],
+            [5.0, 5.0, 5.0],
+            [0.0, 2.0, 0.0],
+            [1.0, 2.0, 0.0],
+            [1.0, 3.0, 0.0],
+        ],
+        dtype=np.float32,
+    )
+    return RealizedGeometry(coords=coords, offsets=np.array([0, 2, 4, 5, 8], dtype=np.int32))
+
+
+def _squares_and_open_line() -> RealizedGeometry:
+    square = np.array(
+        [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [10.0, 10.0, 0.0], [0.0, 10.0, 0.0], [0.0, 0.0, 0.0]],
+        dtype=np.float32,
+    )
+    parts = [square + np.array([20.0 * k, 0.0, 0.0], dtype=np.float32) for k in range(3)]
+    open_line = np.array([[0.0, -5.0, 0.0], [5.0, -5.0, 0.0]], dtype=np.float32)
+    coords = np.concatenate([parts[0], open_line, parts[1], parts[2]], axis=0)
+    return RealizedGeometry(coords=coords, offsets=np.array([0, 5, 7, 12, 17], dtype=np.int32))
+
+
+# (effect モジュール名, 並列化の下限定数, 入力, effect の引数)
+_CASES: list[tuple[str, str, Callable[[], RealizedGeometry], dict[str, object]]] = [
+    (
+        "dash",
+        "PARALLEL_MIN_LINES",
+        _random_polylines,
+        {"dash_length": 1.5, "gap_length": 0.5, "offset_jitter": 0.8},
+    ),
+    ("displace", "PARALLEL_MIN_VERTICES", _random_polylines, {"amplitude": (8.0, 8.0, 8.0)}),
+    ("subdivide", "PARALLEL_MIN_VERTICES", _mixed_lines, {"subdivisions": 4}),
+    ("weave", "PARALLEL_MIN_CURVES", _squares_and_open_line, {"num_candidate_lines": 20}),
+]
+
+
+@pytest.mark.parametrize(
+    ("name", "min_attr", "make_input", "kwargs"), _CASES, ids=[c[0] for c in _CASES]
+)
+def test_parallel_env_matches_serial(monkeypatch, name, min_attr, make_input, kwargs) -> None:
+    module = importlib.import_module(f"grafix.core.effects.{name}")
+    effect_impl = getattr(module, name)
+    base = make_input()
+
+    monkeypatch.delenv(module.PARALLEL_ENV, raising=False)
+    serial = effect_impl([base], **kwargs)
+
+    monkeypatch.setattr(module, min_attr, 0)
+    monkeypatch.setenv(module.PARALLEL_ENV, "1")
+    parallel = effect_impl([base], **kwargs)
+
+    np.testing.assert_array_equal(parallel.coords, serial.coords)
+    assert parallel.offsets.tolist() == serial.offsets.tolist()
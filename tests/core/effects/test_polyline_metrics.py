@@ -0,0 +1,64 @@
+"""polyline_metrics（ポリライン単位の集計値）のテスト群。"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from grafix.core.effects.bold import bold
+from grafix.core.effects.polyline_metrics import polyline_metrics
+from grafix.core.realized_geometry import RealizedGeometry
+
+
+def _geometry() -> RealizedGeometry:
+    coords = np.array(
+        [
+            # 0: 閉じた正方形（5 点）
+            [0.0, 0.0, 0.0],
+            [2.0, 0.0, 0.0],
+            [2.0, 2.0, 0.0],
+            [0.0, 2.0, 0.0],
+            [0.0, 0.0, 0.0],
+            # 2: 開いた 3-4-5 の 2 点線（1 は空）
+            [0.0, 0.0, 1.0],
+            [3.0, 4.0, 1.0],
+            # 3: 1 点
+            [7.0, 8.0, 9.0],
+        ],
+        dtype=np.float32,
+    )
+    offsets = np.array([0, 5, 5, 7, 8], dtype=np.int32)
+    return RealizedGeometry(coords=coords, offsets=offsets)
+
+
+def test_polyline_metrics_values() -> None:
+    m = polyline_metrics(_geometry())
+
+    assert m.counts.tolist() == [5, 0, 2, 1]
+    np.testing.assert_allclose(m.lengths, [8.0, 0.0, 5.0, 0.0])
+    np.testing.assert_allclose(m.closing_lengths, [0.0, 0.0, 5.0, 0.0])
+    assert m.is_closed(1e-6).tolist() == [True, False, False, False]
+
+    np.testing.assert_allclose(m.bbox_min[[0, 2, 3]], [[0, 0, 0], [0, 0, 1], [7, 8, 9]])
+    np.testing.assert_allclose(m.bbox_max[[0, 2, 3]], [[2, 2, 0], [3, 4, 1], [7, 8, 9]])
+    np.testing.assert_allclose(
+        m.centroids[[0, 2, 3]], [[0.8, 0.8, 0.0], [1.5, 2.0, 1.0], [7, 8, 9]]
+    )
+    assert np.all(np.isnan(m.bbox_min[1])) and np.all(np.isnan(m.centroids[1]))
+    assert m.lengths.flags.writeable is False
+
+
+def test_polyline_metrics_is_memoized_per_instance() -> None:
+    g = _geometry()
+    m = polyline_metrics(g)
+    assert polyline_metrics(g) is m
+    assert m.lengths is polyline_metrics(g).lengths
+
+    other = RealizedGeometry(coords=g.coords, offsets=g.offsets)
+    assert polyline_metrics(other) is not m
+
+
+def test_polyline_metrics_of_instanced_geometry_uses_expansion() -> None:
+    out = bold([_geometry()], count=3, radius=1.0, seed=0)
+    m = polyline_metrics(out)
+    assert m.counts.tolist() == [5, 0, 2, 1] * 3
+    np.testing.assert_allclose(m.lengths, [8.0, 0.0, 5.0, 0.0] * 3, rtol=1e-6)
@@ -73,3 +73,41 @@ def test_relax_keeps_shared_points_identical() -> None:
     np.testing.assert_allclose(out.coords[1], [0.0, 0.5, 0.0], rtol=0.0, atol=1e-6)
     assert out.offsets.tolist() == [0, 2, 5]
 
+
+def test_relax_graph_construction_merges_nodes_in_first_seen_order() -> None:
+    from grafix.core.effects.relax import _build_edges, _build_nodes
+
+    coords = np.array(
+        [
+            [2.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0],
+            [-0.0, 0.0, 0.0],  # 0.0 と同一点
+            [2.0, 0.0, 0.0],
+            [1.0, 1.0, 0.0],
+            [0.0, 0.0, 0.0],
+        ],
+        dtype=np.float32,
+    )
+    offsets = np.array([0, 2, 4, 6], dtype=np.int32)
+
+    nodes, vertex_to_node = _build_nodes(coords)
+    assert nodes.tolist() == [[2.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.0, 1.0, 0.0]]
+    assert vertex_to_node.tolist() == [0, 1, 1, 0, 2, 1]
+
+    # 線の境界をまたぐ対と、同一ノード間・重複辺は含めない。
+    edges = _build_edges(offsets, vertex_to_node)
+    assert edges.tolist() == [[0, 1], [1, 2]]
+
+
+def test_relax_fixes_first_visited_extreme_among_ties() -> None:
+    from grafix.core.effects.relax import _compute_fixed
+
+    # 閉じた矩形の 4 隅 + 辺上の中点（DFS は 0 → 4 → 3 → 2 → 1 の順に訪問する）。
+    nodes = np.array(
+        [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 1.0, 0.0], [0.0, 1.0, 0.0]]
+    )
+    edges = np.array([[0, 1], [0, 4], [1, 2], [2, 3], [3, 4]], dtype=np.int64)
+
+    fixed = _compute_fixed(nodes, edges)
+    # 全ノード次数 2。x 最大は 3 と 2 が同値で、先に訪問した 3 を固定する。
+    assert fixed.tolist() == [True, False, False, True, True]
@@ -7,7 +7,7 @@ import numpy as np
 from grafix.api import E, G
 from grafix.core.primitive_registry import primitive
 from grafix.core.realize import realize
-from grafix.core.realized_geometry import RealizedGeometry
+from grafix.core.realized_geometry import InstancedGeometry, RealizedGeometry
 
 
 @primitive
@@ -117,3 +117,25 @@ def test_repeat_preserves_polyline_boundaries() -> None:
         rtol=0.0,
         atol=1e-6,
     )
+
+
+def test_repeat_returns_instanced_geometry_sharing_base() -> None:
+    g = G.repeat_test_two_polylines()
+    base = realize(g)
+    out = realize(E.repeat(count=3, offset=(10.0, 0.0, 0.0))(g))
+
+    assert isinstance(out, InstancedGeometry)
+    assert out.base is base
+    assert out.n_instances == 4
+    assert out.transforms.shape == (4, 3, 4)
+    np.testing.assert_array_equal(out.transforms[0], np.eye(3, 4))
+
+    expanded = out.expand()
+    assert out.expand() is expanded
+    assert out.offsets.tolist() == [0, 2, 5, 7, 10, 12, 15, 17, 20]
+    np.testing.assert_allclose(
+        out.coords[-base.coords.shape[0] :],
+        base.coords + np.array([10.0, 0.0, 0.0], dtype=np.float32),
+        rtol=0.0,
+        atol=1e-6,
+    )
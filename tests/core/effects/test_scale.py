@@ -130,3 +130,34 @@ def test_scale_by_face_scales_each_closed_polyline_and_keeps_open_ones() -> None
     )
     np.testing.assert_allclose(realized.coords, expected, rtol=0.0, atol=1e-6)
     assert realized.offsets.tolist() == [0, 2, 7]
+
+
+def test_scale_by_line_and_by_face_match_per_line_mean_exactly() -> None:
+    from grafix.core.effects.scale import scale as scale_impl
+
+    rng = np.random.default_rng(11)
+    lines = []
+    # 丸めの差は float32 へ戻すと稀にしか表れないので、線を多めに用意する。
+    for k in range(6000):
+        line = rng.normal(size=(int(rng.integers(2, 12)), 3)) * 100.0 + 1000.0
+        if k % 2 == 0:
+            line[-1] = line[0]
+        lines.append(line.astype(np.float32))
+    offsets = np.zeros(len(lines) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum([line.shape[0] for line in lines])
+    base = RealizedGeometry(coords=np.concatenate(lines), offsets=offsets)
+    factors = np.array([0.3, 1.7, 0.9])
+
+    for mode in ("by_line", "by_face"):
+        out = scale_impl([base], mode=mode, scale=tuple(factors))
+
+        expected = []
+        for k, line in enumerate(lines):
+            v = line.astype(np.float64)
+            closed = k % 2 == 0
+            if closed != (mode == "by_face"):
+                expected.append(line)
+                continue
+            center = v[:-1].mean(axis=0) if closed else v.mean(axis=0)
+            expected.append(((v - center) * factors + center).astype(np.float32))
+        np.testing.assert_array_equal(out.coords, np.concatenate(expected))
@@ -0,0 +1,72 @@
+"""segment_grid（一様グリッドによる線分交差の絞り込み）のテスト群。"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from grafix.core.effects.segment_grid import (
+    segment_grid_create,
+    segment_grid_insert,
+    segment_grid_query,
+    segment_intersection,
+    segment_intersections,
+)
+
+
+def _brute_force(a: np.ndarray, b: np.ndarray) -> list[tuple[int, int]]:
+    pairs = []
+    for i in range(a.shape[0]):
+        for j in range(b.shape[0]):
+            hit, _t, _x, _y = segment_intersection(*a[i], *b[j])
+            if hit:
+                pairs.append((i, j))
+    return pairs
+
+
+def test_segment_intersections_matches_brute_force() -> None:
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(-10.0, 10.0, size=(300, 2))
+    # 短い線分（境界辺相当）と長い線分（弦相当）を混ぜる。
+    short = np.concatenate([starts[:200], starts[:200] + rng.normal(0.0, 0.5, (200, 2))], axis=1)
+    long = np.concatenate([starts[200:], -starts[200:]], axis=1)
+    b = np.concatenate([short, long], axis=0)
+    a = rng.uniform(-10.0, 10.0, size=(40, 4))
+
+    index_a, index_b, points = segment_intersections(a, b)
+
+    assert list(zip(index_a.tolist(), index_b.tolist())) == _brute_force(a, b)
+    for i, j, p in zip(index_a, index_b, points):
+        _hit, _t, x, y = segment_intersection(*a[i], *b[j])
+        assert (x, y) == (p[0], p[1])
+
+
+def test_segment_grid_query_returns_sorted_unique_candidates_including_hits() -> None:
+    geom, head, entries, used = segment_grid_create(0.0, 0.0, 10.0, 10.0, 4)
+    segments = [
+        (0.0, 0.0, 10.0, 10.0),  # 対角線: 多数のセルにまたがる
+        (9.0, 0.5, 9.5, 0.5),  # 右下隅の短い線分
+        (0.0, 10.0, 10.0, 0.0),  # 逆対角線
+    ]
+    for sid, (ax, ay, bx, by) in enumerate(segments):
+        entries = segment_grid_insert(geom, head, entries, used, sid, ax, ay, bx, by)
+    stamps = np.full(len(segments), -1, dtype=np.int64)
+
+    ids = segment_grid_query(geom, head, entries, 0.0, 5.0, 10.0, 5.0, stamps, 0)
+    assert ids.tolist() == sorted(set(ids.tolist()))
+    assert {0, 2} <= set(ids.tolist())
+
+    # 左上隅の短い問い合わせは右下隅の線分を候補に含めない。
+    ids = segment_grid_query(geom, head, entries, 0.5, 9.0, 1.0, 9.5, stamps, 1)
+    assert 1 not in ids.tolist()
+
+
+def test_segment_grid_grows_entries_beyond_initial_capacity() -> None:
+    geom, head, entries, used = segment_grid_create(0.0, 0.0, 1.0, 1.0, 1)
+    capacity = entries.shape[0]
+    for sid in range(capacity + 5):
+        entries = segment_grid_insert(geom, head, entries, used, sid, 0.0, 0.0, 1.0, 1.0)
+
+    assert used[0] >= capacity + 5
+    stamps = np.full(capacity + 5, -1, dtype=np.int64)
+    ids = segment_grid_query(geom, head, entries, 0.0, 1.0, 1.0, 0.0, stamps, 0)
+    assert ids.tolist() == list(range(capacity + 5))
@@ -116,3 +116,84 @@ def test_subdivide_empty_geometry_is_noop() -> None:
     assert realized.coords.shape == (0, 3)
     assert realized.offsets.tolist() == [0]
 
+
+def _mixed_lines() -> RealizedGeometry:
+    coords = np.array(
+        [
+            [0.0, 0.0, 0.0],  # 長さ 10（上限まで細分）
+            [10.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],  # 長さ 0.04（2 回で最短長ガードに達する）
+            [0.04, 1.0, 0.0],
+            [5.0, 5.0, 5.0],  # 1 点の線
+            [0.0, 2.0, 0.0],  # 3 点の線
+            [1.0, 2.0, 0.0],
+            [1.0, 3.0, 0.0],
+        ],
+        dtype=np.float32,
+    )
+    offsets = np.array([0, 2, 4, 5, 8], dtype=np.int32)
+    return RealizedGeometry(coords=coords, offsets=offsets)
+
+
+def test_subdivide_stops_each_line_at_its_own_level() -> None:
+    from grafix.core.effects.subdivide import subdivide as subdivide_impl
+
+    out = subdivide_impl([_mixed_lines()], subdivisions=3)
+
+    assert np.diff(out.offsets).tolist() == [9, 5, 1, 17]
+    np.testing.assert_allclose(
+        out.coords[9:14, 0], [0.0, 0.01, 0.02, 0.03, 0.04], rtol=0.0, atol=1e-6
+    )
+
+
+def test_subdivide_respects_total_vertex_cap(monkeypatch) -> None:
+    from grafix.core.effects import subdivide as subdivide_module
+
+    monkeypatch.setattr(subdivide_module, "MAX_TOTAL_VERTICES", 14)
+    out = subdivide_module.subdivide([_mixed_lines()], subdivisions=3)
+
+    # 1 本目は 9 点、2 本目は残り 5 点で 2 回、3 本目は上限到達で以降を出力しない。
+    assert np.diff(out.offsets).tolist() == [9, 5]
+
+
+def _reference_subdivide_line(line: np.ndarray, subdivisions: int) -> np.ndarray:
+    """旧実装と同じ手順（1 段ずつ中点を挿入し、その都度最短セグメント長を測る）。"""
+    from grafix.core.effects.subdivide import MIN_SEG_LEN_SQ
+
+    d = np.diff(line, axis=0)
+    if line.shape[0] < 2 or float(np.min(np.sum(d * d, axis=1))) < MIN_SEG_LEN_SQ:
+        return line
+    result = line
+    for _ in range(subdivisions):
+        out = np.empty((2 * result.shape[0] - 1, 3), dtype=np.float32)
+        out[::2] = result
+        out[1::2] = (result[:-1] + result[1:]) / np.float32(2.0)
+        result = out
+        d = np.diff(result, axis=0)
+        if float(np.min(np.sum(d * d, axis=1))) < MIN_SEG_LEN_SQ:
+            break
+    return result
+
+
+def test_subdivide_matches_stepwise_guard_near_min_seg_len() -> None:
+    from grafix.core.effects.subdivide import MIN_SEG_LEN, subdivide as subdivide_impl
+
+    rng = np.random.default_rng(3)
+    lines: list[np.ndarray] = []
+    for k in range(1, 8):
+        for origin in (0.0, 1.0, 1000.0):
+            for rel in (-1e-6, -1e-7, 0.0, 1e-7, 1e-6):
+                length = MIN_SEG_LEN * 2**k * (1.0 + rel)
+                direction = rng.normal(size=3)
+                direction /= np.linalg.norm(direction)
+                start = origin + rng.normal(size=3)
+                lines.append(np.stack([start, start + direction * length]).astype(np.float32))
+    offsets = np.zeros(len(lines) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum([line.shape[0] for line in lines])
+    base = RealizedGeometry(coords=np.concatenate(lines), offsets=offsets)
+
+    out = subdivide_impl([base], subdivisions=10)
+
+    expected = [_reference_subdivide_line(line, 10) for line in lines]
+    assert np.diff(out.offsets).tolist() == [e.shape[0] for e in expected]
+    np.testing.assert_array_equal(out.coords, np.concatenate(expected))
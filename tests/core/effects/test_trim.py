@@ -126,3 +126,31 @@ def test_trim_noop_when_all_lines_would_disappear() -> None:
 
     np.testing.assert_allclose(out.coords, base.coords, rtol=0.0, atol=0.0)
     assert out.offsets.tolist() == base.offsets.tolist()
+
+
+def test_trim_mixed_polylines_keep_short_and_drop_vanishing_lines() -> None:
+    from grafix.core.effects.trim import trim as trim_impl
+
+    coords = np.array(
+        [
+            [0.0, 0.0, 0.0],  # 1 点の線（そのまま残す）
+            [0.0, 0.0, 0.0],  # 全長 0 の線（そのまま残す）
+            [0.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0],  # 極短の線（トリム後 2 点未満で捨てる）
+            [1e-9, 0.0, 0.0],
+            [0.0, 0.0, 0.0],  # 折れ線（内部頂点を含む）
+            [4.0, 0.0, 0.0],
+            [4.0, 4.0, 0.0],
+        ],
+        dtype=np.float32,
+    )
+    offsets = np.array([0, 1, 3, 3, 5, 8], dtype=np.int32)
+    base = RealizedGeometry(coords=coords, offsets=offsets)
+
+    out = trim_impl([base], start_param=0.25, end_param=0.75)
+
+    assert out.offsets.tolist() == [0, 1, 3, 3, 6]
+    np.testing.assert_allclose(out.coords[0:3], coords[0:3], rtol=0.0, atol=0.0)
+    np.testing.assert_allclose(
+        out.coords[3:6], [[2.0, 0.0, 0.0], [4.0, 0.0, 0.0], [4.0, 2.0, 0.0]], rtol=0.0, atol=1e-6
+    )
@@ -88,3 +88,20 @@ def test_weave_clamps_parameters_without_crashing() -> None:
     assert np.isfinite(out.coords).all()
     assert out.offsets[0] == 0
     assert out.offsets[-1] == out.coords.shape[0]
+
+
+def test_weave_dense_ring_uses_edge_grid_without_crashing() -> None:
+    from grafix.core.effects import weave as weave_module
+
+    n = weave_module.GRID_MIN_BOUNDARY_EDGES + 200
+    t = np.linspace(0.0, 2.0 * np.pi, n)
+    r = 20.0 + 3.0 * np.sin(5.0 * t)
+    ring = np.stack([np.cos(t) * r, np.sin(t) * r, np.zeros_like(t)], axis=1).astype(np.float32)
+    ring[-1] = ring[0]
+    base = RealizedGeometry(coords=ring, offsets=np.array([0, n], dtype=np.int32))
+
+    out = weave_module.weave([base], num_candidate_lines=50, relaxation_iterations=0)
+
+    assert np.isfinite(out.coords).all()
+    assert (len(out.offsets) - 1) > 1
+    assert out.offsets[-1] == out.coords.shape[0]
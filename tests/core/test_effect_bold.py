@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import pickle
+
 import numpy as np
 
 from grafix.core.effects.bold import bold
-from grafix.core.realized_geometry import RealizedGeometry
+from grafix.core.realized_geometry import InstancedGeometry, RealizedGeometry
 
 
 def _geometry(*, coords: list[tuple[float, float, float]], offsets: list[int]) -> RealizedGeometry:
@@ -81,3 +83,19 @@ def test_bold_is_deterministic_for_same_seed() -> None:
 
     assert out1.offsets.tolist() == out2.offsets.tolist()
     assert np.allclose(out1.coords, out2.coords, atol=0.0)
+
+
+def test_bold_returns_instanced_geometry_with_translation_transforms() -> None:
+    base = _geometry(coords=[(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)], offsets=[0, 2])
+    out = bold([base], count=4, radius=1.0, seed=7)
+
+    assert isinstance(out, InstancedGeometry)
+    assert out.base is base
+    assert out.n_instances == 4
+    np.testing.assert_array_equal(out.transforms[:, :, :3], np.broadcast_to(np.eye(3), (4, 3, 3)))
+    assert np.all(out.transforms[:, 2, 3] == 0.0)
+
+    restored = pickle.loads(pickle.dumps(out))
+    assert isinstance(restored, InstancedGeometry)
+    np.testing.assert_array_equal(restored.coords, out.coords)
+    assert restored.offsets.tolist() == out.offsets.tolist()
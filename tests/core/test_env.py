@@ -0,0 +1,27 @@
+"""grafix.core.env の環境変数の解釈をテスト。"""
+
+from __future__ import annotations
+
+from grafix.core.env import env_flag, env_int
+
+
+def test_env_flag_parses_falsy_words_and_default(monkeypatch) -> None:
+    monkeypatch.delenv("GRAFIX_TEST_FLAG", raising=False)
+    assert env_flag("GRAFIX_TEST_FLAG") is False
+    assert env_flag("GRAFIX_TEST_FLAG", default=True) is True
+
+    for value in ("", "0", "false", "No", " OFF "):
+        monkeypatch.setenv("GRAFIX_TEST_FLAG", value)
+        assert env_flag("GRAFIX_TEST_FLAG", default=True) is False
+    for value in ("1", "yes", "on", "true"):
+        monkeypatch.setenv("GRAFIX_TEST_FLAG", value)
+        assert env_flag("GRAFIX_TEST_FLAG") is True
+
+
+def test_env_int_falls_back_to_default(monkeypatch) -> None:
+    monkeypatch.delenv("GRAFIX_TEST_INT", raising=False)
+    assert env_int("GRAFIX_TEST_INT", 60) == 60
+    monkeypatch.setenv("GRAFIX_TEST_INT", "12")
+    assert env_int("GRAFIX_TEST_INT", 60) == 12
+    monkeypatch.setenv("GRAFIX_TEST_INT", "x")
+    assert env_int("GRAFIX_TEST_INT", 60) == 60
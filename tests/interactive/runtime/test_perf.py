@@ -0,0 +1,112 @@
+"""interactive.runtime.perf の集計出力をテスト。"""
+
+from __future__ import annotations
+
+from grafix.interactive.runtime.perf import PerfCollector
+
+
+def test_perf_reports_bytes_per_frame_for_sections(capsys) -> None:
+    perf = PerfCollector(enabled=True, print_every=2)
+    for _ in range(2):
+        with perf.frame():
+            with perf.section("upload"):
+                pass
+            perf.add_bytes("upload", 3_000_000)
+
+    out = capsys.readouterr().out
+    assert out.startswith("[grafix-perf] frame=")
+    assert " 3.00MB/f " in out + " "
+
+
+def test_perf_disabled_ignores_bytes() -> None:
+    perf = PerfCollector(enabled=False)
+    perf.add_bytes("upload", 123)
+    assert perf._bytes == {}
+
+
+def test_perf_reports_counts_per_frame_and_last_gauge(capsys) -> None:
+    perf = PerfCollector(enabled=True, print_every=2)
+    for k in range(2):
+        with perf.frame():
+            perf.add_count("cache_hit", 3 + k)
+            perf.set_gauge("cache_resident_mb", 10.0 * (k + 1))
+
+    out = capsys.readouterr().out
+    assert " cache_hit=3.5/f" in out
+    assert out.rstrip().endswith(" cache_resident_mb=20.0")
+
+
+class _FakeQuery:
+    def __init__(self, ctx: "_FakeQueryContext") -> None:
+        self._ctx = ctx
+        self.elapsed = 0
+
+    def __enter__(self) -> "_FakeQuery":
+        self._ctx.log.append("begin")
+        self._ctx.active = self
+        self.elapsed = 0
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._ctx.log.append("end")
+        self._ctx.active = None
+
+
+class _FakeQueryContext:
+    def __init__(self) -> None:
+        self.log: list[str] = []
+        self.active: _FakeQuery | None = None
+        self.created = 0
+
+    def query(self, time: bool = False) -> _FakeQuery:
+        assert time
+        self.created += 1
+        return _FakeQuery(self)
+
+    def gpu_work(self, ns: int) -> None:
+        if self.active is not None:
+            self.active.elapsed += ns
+
+
+def test_perf_gpu_timer_reports_exclusive_time_a_few_frames_later(capsys) -> None:
+    ctx = _FakeQueryContext()
+    perf = PerfCollector(enabled=True, print_every=4, gpu_timer=True)
+    perf.attach_gpu_timer(ctx)
+
+    def run_frame() -> None:
+        with perf.frame():
+            with perf.section("render_layer", gpu=True):
+                ctx.gpu_work(1_000_000)
+                with perf.section("upload", gpu=True):
+                    ctx.gpu_work(500_000)
+                ctx.gpu_work(1_000_000)
+            with perf.section("indices"):
+                ctx.gpu_work(9_000_000)
+
+    for _ in range(4):
+        run_frame()
+
+    # GL_TIME_ELAPSED は入れ子にできないので、クエリは常に閉じてから開き直す。
+    assert "begin begin" not in " ".join(ctx.log)
+    out = capsys.readouterr().out
+    # 3 フレーム遅れで回収するので、4 フレーム中 1 フレーム分だけが入る（/4 フレーム）。
+    assert " render_layer[gpu]=0.500ms" in out
+    assert " upload[gpu]=0.125ms" in out
+    assert "indices[gpu]" not in out
+    # 回収したクエリは使い回す（5 フレーム目は 1 フレーム目のクエリを再利用する）。
+    assert ctx.created == 12
+    run_frame()
+    assert ctx.created == 12
+
+
+def test_perf_gpu_timer_is_not_attached_when_disabled() -> None:
+    ctx = _FakeQueryContext()
+    for perf in (
+        PerfCollector(enabled=False, gpu_timer=True),
+        PerfCollector(enabled=True, gpu_timer=False),
+    ):
+        perf.attach_gpu_timer(ctx)
+        with perf.frame():
+            with perf.section("render_layer", gpu=True):
+                pass
+    assert ctx.created == 0
@@ -1,6 +1,12 @@
 from pathlib import Path
 
-from grafix.interactive.runtime.video_recorder import _ffmpeg_command, default_video_output_path
+import pytest
+
+from grafix.interactive.runtime.video_recorder import (
+    VideoFrameWriter,
+    _ffmpeg_command,
+    default_video_output_path,
+)
 
 
 def test_default_video_output_path_uses_data_dir_and_script_stem():
@@ -30,3 +36,45 @@ def test_ffmpeg_command_contains_expected_rawvideo_args():
     assert "-vf" in cmd
     assert "vflip" in cmd
     assert cmd[-1] == "out.mp4"
+
+
+class _FakeRecorder:
+    def __init__(self, *, fail_on: int | None = None) -> None:
+        self.path = Path("out.mp4")
+        self.frames: list[bytes] = []
+        self.closed = False
+        self._fail_on = fail_on
+
+    def write_frame_rgb24(self, frame: bytes) -> None:
+        if self._fail_on is not None and len(self.frames) == self._fail_on:
+            raise BrokenPipeError("ffmpeg exited")
+        self.frames.append(frame)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_video_frame_writer_writes_frames_in_order_on_close():
+    recorder = _FakeRecorder()
+    writer = VideoFrameWriter(recorder, max_pending=2)  # type: ignore[arg-type]
+
+    for k in range(10):
+        writer.submit(bytes([k]))
+    writer.close()
+
+    assert recorder.frames == [bytes([k]) for k in range(10)]
+    assert recorder.closed
+    with pytest.raises(RuntimeError):
+        writer.submit(b"x")
+
+
+def test_video_frame_writer_reraises_writer_thread_error():
+    recorder = _FakeRecorder(fail_on=1)
+    writer = VideoFrameWriter(recorder, max_pending=1)  # type: ignore[arg-type]
+
+    with pytest.raises(RuntimeError, match="書き込みに失敗"):
+        for k in range(10):
+            writer.submit(bytes([k]))
+    with pytest.raises(RuntimeError, match="書き込みに失敗"):
+        writer.close()
+    assert recorder.closed
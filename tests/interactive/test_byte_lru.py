@@ -0,0 +1,58 @@
+"""interactive.gl.byte_lru の `ByteLRU` をテスト。"""
+
+from __future__ import annotations
+
+from grafix.interactive.gl.byte_lru import ByteLRU
+
+
+def test_evicts_oldest_until_within_budget() -> None:
+    evicted: list[str] = []
+    cache: ByteLRU[str, str] = ByteLRU(100, on_evict=lambda key, _: evicted.append(key))
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"  # a を最近使った側へ
+    cache.put("c", "C", 40)
+
+    assert evicted == ["b"]
+    assert "b" not in cache
+    assert cache.nbytes == 80
+
+
+def test_large_item_evicts_everything_else_but_stays() -> None:
+    evicted: list[str] = []
+    cache: ByteLRU[str, str] = ByteLRU(100, on_evict=lambda key, _: evicted.append(key))
+    cache.put("a", "A", 10)
+    cache.put("b", "B", 10)
+    cache.put("huge", "H", 500)
+
+    assert evicted == ["a", "b"]
+    assert cache.get("huge") == "H"
+    assert cache.nbytes == 500
+
+
+def test_replacing_a_key_updates_size_and_evicts_old_value() -> None:
+    evicted: list[str] = []
+    cache: ByteLRU[str, str] = ByteLRU(100, on_evict=lambda _, value: evicted.append(value))
+    cache.put("a", "A1", 30)
+    cache.put("a", "A2", 50)
+
+    assert evicted == ["A1"]
+    assert cache.get("a") == "A2"
+    assert cache.nbytes == 50
+
+
+def test_pop_and_remove_if_do_not_call_on_evict() -> None:
+    evicted: list[str] = []
+    cache: ByteLRU[tuple[str, str], int] = ByteLRU(
+        1000, on_evict=lambda key, _: evicted.append(key[1])
+    )
+    cache.put(("mesh", "a"), 1, 10)
+    cache.put(("indices", "a"), 2, 20)
+    cache.put(("mesh", "b"), 3, 30)
+
+    assert cache.remove_if(lambda key: key[0] == "mesh") == [1, 3]
+    assert cache.pop(("indices", "a")) == 2
+    assert cache.pop(("indices", "a")) is None
+    assert evicted == []
+    assert len(cache) == 0
+    assert cache.nbytes == 0
@@ -0,0 +1,81 @@
+"""interactive.gl.frame_cache の保存/再提示をテスト。"""
+
+from __future__ import annotations
+
+from grafix.interactive.gl.frame_cache import FrameCache
+
+
+class _FakeRenderbuffer:
+    def __init__(self, size: tuple[int, int], samples: int) -> None:
+        self.size = size
+        self.samples = samples
+        self.released = False
+
+    def release(self) -> None:
+        self.released = True
+
+
+class _FakeFramebuffer:
+    def __init__(self, color_attachments: list[_FakeRenderbuffer]) -> None:
+        self.color_attachments = color_attachments
+        self.content: object = None
+        self.released = False
+
+    def release(self) -> None:
+        self.released = True
+
+
+class _FakeContext:
+    def __init__(self) -> None:
+        self.framebuffers: list[_FakeFramebuffer] = []
+
+    def renderbuffer(self, size: tuple[int, int], components: int, samples: int = 0):
+        return _FakeRenderbuffer(size, samples)
+
+    def framebuffer(self, color_attachments: list[_FakeRenderbuffer]) -> _FakeFramebuffer:
+        fbo = _FakeFramebuffer(color_attachments)
+        self.framebuffers.append(fbo)
+        return fbo
+
+    def copy_framebuffer(self, dst: _FakeFramebuffer, src: _FakeFramebuffer) -> None:
+        dst.content = src.content
+
+
+def test_present_returns_stored_frame() -> None:
+    ctx = _FakeContext()
+    cache = FrameCache(ctx, samples=4)
+    screen = _FakeFramebuffer([])
+
+    assert not cache.present(screen, (64, 48))
+    screen.content = "frame-1"
+    cache.store(screen, (64, 48))
+    screen.content = None
+
+    assert cache.present(screen, (64, 48))
+    assert screen.content == "frame-1"
+    assert ctx.framebuffers[0].color_attachments[0].samples == 4
+
+
+def test_present_refuses_after_invalidate_or_resize() -> None:
+    ctx = _FakeContext()
+    cache = FrameCache(ctx)
+    screen = _FakeFramebuffer([])
+    cache.store(screen, (64, 48))
+
+    assert not cache.present(screen, (32, 48))
+    cache.invalidate()
+    assert not cache.present(screen, (64, 48))
+
+
+def test_store_with_new_size_recreates_and_releases_old_buffer() -> None:
+    ctx = _FakeContext()
+    cache = FrameCache(ctx)
+    screen = _FakeFramebuffer([])
+    cache.store(screen, (64, 48))
+    cache.store(screen, (64, 48))
+    assert len(ctx.framebuffers) == 1
+
+    cache.store(screen, (128, 96))
+    old = ctx.framebuffers[0]
+    assert len(ctx.framebuffers) == 2
+    assert old.released and old.color_attachments[0].released
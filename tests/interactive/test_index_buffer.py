@@ -6,6 +6,9 @@ import numpy as np
 
 from grafix.interactive.gl.index_buffer import build_line_indices
 from grafix.interactive.gl.index_buffer import build_line_indices_and_stats
+from grafix.interactive.gl.index_buffer import build_line_segments
+from grafix.interactive.gl.index_buffer import build_line_strips_and_stats
+from grafix.interactive.gl.index_buffer import prefers_line_strips
 from grafix.interactive.gl.line_mesh import LineMesh
 
 
@@ -81,3 +84,39 @@ def test_build_line_indices_and_stats_multiple_polylines_with_restart() -> None:
     ]
     assert stats.draw_vertices == 5
     assert stats.draw_lines == 2
+
+
+def test_build_line_segments_pairs_neighbours_within_polylines() -> None:
+    # [0, 3) は 2 線分、[3, 4) は 1 頂点なので線分なし、[4, 6) は 1 線分
+    coords = np.arange(18, dtype=np.float32).reshape(6, 3)
+    offsets = np.array([0, 3, 4, 6], dtype=np.int32)
+    segments = build_line_segments(coords, offsets)
+    assert segments.dtype == np.float32
+    assert segments.tolist() == [
+        [0.0, 1.0, 3.0, 4.0],
+        [3.0, 4.0, 6.0, 7.0],
+        [12.0, 13.0, 15.0, 16.0],
+    ]
+
+
+def test_build_line_segments_empty() -> None:
+    segments = build_line_segments(np.zeros((0, 3), dtype=np.float32), np.array([0], np.int32))
+    assert segments.shape == (0, 4)
+
+
+def test_build_line_strips_and_stats_matches_indices() -> None:
+    offsets = np.array([0, 3, 4, 4, 9], dtype=np.int32)
+    strips, stats = build_line_strips_and_stats(offsets)
+    _, index_stats = build_line_indices_and_stats(offsets)
+
+    assert strips.firsts.tolist() == [0, 4]
+    assert strips.counts.tolist() == [3, 5]
+    assert strips.n_strips == 2
+    assert stats == index_stats
+
+
+def test_prefers_line_strips_only_for_few_long_polylines() -> None:
+    assert prefers_line_strips(np.array([0, 100_000], dtype=np.int32))
+    assert not prefers_line_strips(np.array([0, 10], dtype=np.int32))
+    assert not prefers_line_strips(np.arange(0, 100_001, 100, dtype=np.int32))
+    assert not prefers_line_strips(np.array([0], dtype=np.int32))
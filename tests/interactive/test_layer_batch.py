@@ -0,0 +1,131 @@
+"""interactive.gl.layer_batch のパック処理をテスト。"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from grafix.core.realized_geometry import RealizedGeometry
+from grafix.interactive.gl.index_buffer import build_line_indices
+from grafix.interactive.gl.layer_batch import (
+    BatchedLayer,
+    LayerStyleTable,
+    pack_layer_batch,
+    pack_layer_styles,
+    pack_segment_batch,
+)
+from grafix.interactive.gl.line_mesh import LineMesh
+
+R = LineMesh.PRIMITIVE_RESTART_INDEX
+
+
+def _coords(n: int, z: float) -> np.ndarray:
+    coords = np.zeros((n, 3), dtype=np.float32)
+    coords[:, 0] = np.arange(n, dtype=np.float32)
+    coords[:, 2] = z
+    return coords
+
+
+def test_pack_layer_batch_rebases_indices_and_tags_styles() -> None:
+    off_a = np.array([0, 2, 5], dtype=np.int32)
+    off_b = np.array([0, 3], dtype=np.int32)
+    parts = [
+        (_coords(5, 0.0), build_line_indices(off_a)),
+        (_coords(1, 1.0), build_line_indices(np.array([0, 1], dtype=np.int32))),  # 描画なし
+        (_coords(3, 2.0), build_line_indices(off_b)),
+    ]
+
+    vertices, indices, dequant = pack_layer_batch(parts)
+
+    assert vertices.shape == (9,)
+    assert vertices["style"].tolist() == [0, 0, 0, 0, 0, 1, 2, 2, 2]
+    np.testing.assert_array_equal(vertices["xy"][6:], parts[2][0][:, :2])
+    assert indices.dtype == np.uint32
+    assert indices.tolist() == [0, 1, R, 2, 3, 4, R, 6, 7, 8]
+    assert dequant == (0.0, 0.0, 1.0, 1.0)
+
+
+def test_pack_layer_batch_xy16_shares_one_bbox() -> None:
+    a = np.array([[0.0, 0.0, 0.0], [10.0, 5.0, 0.0]], dtype=np.float32)
+    b = np.array([[2.5, 20.0, 3.0], [7.5, 10.0, 3.0]], dtype=np.float32)
+    parts = [
+        (a, build_line_indices(np.array([0, 2], dtype=np.int32))),
+        (b, build_line_indices(np.array([0, 2], dtype=np.int32))),
+    ]
+
+    vertices, _, dequant = pack_layer_batch(parts, "xy16")
+
+    assert vertices.dtype.itemsize == 8
+    assert dequant == (0.0, 0.0, 10.0 / 65535.0, 20.0 / 65535.0)
+    x0, y0, step_x, step_y = dequant
+    restored = vertices["xy"].astype(np.float64) * (step_x, step_y) + (x0, y0)
+    np.testing.assert_allclose(restored, np.concatenate([a, b])[:, :2], atol=20.0 / 65535.0)
+
+
+def test_pack_layer_batch_empty() -> None:
+    vertices, indices, _ = pack_layer_batch([])
+    assert vertices.shape == (0,)
+    assert indices.shape == (0,)
+
+
+def test_pack_segment_batch_tags_styles_in_layer_order() -> None:
+    a = np.array([[0.0, 0.0, 1.0, 0.0], [1.0, 0.0, 1.0, 1.0]], dtype=np.float32)
+    b = np.zeros((0, 4), dtype=np.float32)
+    c = np.array([[5.0, 5.0, 6.0, 6.0]], dtype=np.float32)
+
+    out = pack_segment_batch([a, b, c])
+
+    assert out.dtype.itemsize == 20
+    assert out["style"].tolist() == [0, 0, 2]
+    np.testing.assert_array_equal(out["segment"], np.concatenate([a, c]))
+
+
+def test_pack_layer_styles_packs_color_and_thickness() -> None:
+    g = RealizedGeometry(coords=_coords(2, 0.0), offsets=np.array([0, 2], dtype=np.int32))
+    indices = build_line_indices(g.offsets)
+    layers = [
+        BatchedLayer(g, indices, "a", color=(1.0, 0.5, 0.0), thickness=0.01),
+        BatchedLayer(g, indices, "b", color=(0.0, 0.0, 1.0), thickness=0.02),
+    ]
+
+    styles = pack_layer_styles(layers)
+
+    assert styles.dtype == np.float32
+    np.testing.assert_allclose(styles, [[1.0, 0.5, 0.0, 0.01], [0.0, 0.0, 1.0, 0.02]])
+
+
+class _FakeTexture:
+    def __init__(self, size: tuple[int, int]) -> None:
+        self.width = size[0]
+        self.filter = None
+        self.released = False
+
+    def write(self, data: bytes, viewport: tuple[int, int, int, int]) -> None:
+        assert viewport[2] <= self.width
+
+    def release(self) -> None:
+        self.released = True
+
+
+class _FakeTextureContext:
+    NEAREST = 0
+
+    def __init__(self, max_texture_size: int) -> None:
+        self.info = {"GL_MAX_TEXTURE_SIZE": max_texture_size}
+
+    def texture(self, size: tuple[int, int], components: int, dtype: str) -> _FakeTexture:
+        return _FakeTexture(size)
+
+
+def test_layer_style_table_grows_up_to_max_texture_size() -> None:
+    table = LayerStyleTable(_FakeTextureContext(max_texture_size=12), initial_styles=4)
+
+    table.write(np.zeros((5, 4), dtype=np.float32))
+    assert table.texture.width == 8
+    # 倍々に伸ばしても GL_MAX_TEXTURE_SIZE は超えない。
+    table.write(np.zeros((9, 4), dtype=np.float32))
+    assert table.texture.width == 12
+    assert table.max_styles == 12
+
+    with pytest.raises(ValueError):
+        table.write(np.zeros((13, 4), dtype=np.float32))
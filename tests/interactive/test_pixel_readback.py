@@ -0,0 +1,72 @@
+"""interactive.gl.pixel_readback の遅延読み出しをテスト。"""
+
+from __future__ import annotations
+
+from grafix.interactive.gl.pixel_readback import PixelReadbackRing
+
+
+class _FakeBuffer:
+    def __init__(self, reserve: int) -> None:
+        self.data = bytes(reserve)
+        self.released = False
+
+    def read(self, size: int = -1) -> bytes:
+        return self.data[:size]
+
+    def release(self) -> None:
+        self.released = True
+
+
+class _FakeContext:
+    def __init__(self) -> None:
+        self.buffers: list[_FakeBuffer] = []
+
+    def buffer(self, reserve: int = 0, dynamic: bool = False) -> _FakeBuffer:
+        buffer = _FakeBuffer(reserve)
+        self.buffers.append(buffer)
+        return buffer
+
+
+class _FakeScreen:
+    def __init__(self) -> None:
+        self.frame = 0
+        self.viewports: list[tuple[int, int, int, int]] = []
+
+    def read_into(self, buffer, viewport, components, alignment) -> None:
+        assert components == 3 and alignment == 1
+        self.viewports.append(viewport)
+        w, h = viewport[2], viewport[3]
+        buffer.data = bytes([self.frame]) * (w * h * 3)
+
+
+def test_readback_ring_returns_frames_depth_minus_one_frames_late():
+    ctx = _FakeContext()
+    ring = PixelReadbackRing(ctx, (4, 2), depth=3)
+    screen = _FakeScreen()
+
+    got: list[bytes | None] = []
+    for frame in range(5):
+        screen.frame = frame
+        got.append(ring.push(screen))
+
+    assert got[:2] == [None, None]
+    assert [g[0] for g in got[2:] if g is not None] == [0, 1, 2]
+    assert all(g is None or len(g) == 4 * 2 * 3 for g in got)
+    assert [d[0] for d in ring.drain()] == [3, 4]
+    assert ring.drain() == []
+    # 輪番なのでバッファは depth 本から増えない。
+    assert len(ctx.buffers) == 3
+    assert screen.viewports[0] == (0, 0, 4, 2)
+
+
+def test_readback_ring_depth_one_reads_immediately_and_release_frees_buffers():
+    ctx = _FakeContext()
+    ring = PixelReadbackRing(ctx, (2, 2), depth=1)
+    screen = _FakeScreen()
+    screen.frame = 7
+
+    frame = ring.push(screen)
+
+    assert frame is not None and frame[0] == 7
+    ring.release()
+    assert all(buffer.released for buffer in ctx.buffers)
@@ -0,0 +1,81 @@
+"""interactive.gl.upload_ring の割り当て（フレーム保護・折り返し・拡張）をテスト。"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from grafix.interactive.gl.upload_ring import UploadRing
+
+
+class _FakeBuffer:
+    def __init__(self, reserve: int) -> None:
+        self.size = int(reserve)
+        self.data = bytearray(self.size)
+        self.released = False
+
+    def write(self, data: np.ndarray, offset: int = 0) -> None:
+        raw = np.ascontiguousarray(data).tobytes()
+        assert offset + len(raw) <= self.size
+        self.data[offset : offset + len(raw)] = raw
+
+    def release(self) -> None:
+        self.released = True
+
+
+class _FakeContext:
+    def buffer(self, reserve: int, dynamic: bool = False) -> _FakeBuffer:
+        return _FakeBuffer(reserve)
+
+
+def _chunk(nbytes: int) -> np.ndarray:
+    return np.zeros((nbytes,), dtype=np.uint8)
+
+
+def test_upload_ring_does_not_overwrite_frames_in_flight() -> None:
+    ring = UploadRing(_FakeContext(), capacity=1024, frames_in_flight=2)
+
+    ring.begin_frame()
+    a = ring.write(_chunk(400))
+    ring.begin_frame()
+    b = ring.write(_chunk(400))
+    ring.begin_frame()
+    # 末尾 [800, 1024) には入らない。1 フレーム目の [0, 400) は 2 フレーム前なので再利用できる。
+    c = ring.write(_chunk(300))
+
+    assert (a, b, c) == (0, 400, 0)
+    assert ring.generation == 0
+
+
+def test_upload_ring_grows_instead_of_overwriting() -> None:
+    ring = UploadRing(_FakeContext(), capacity=1024, frames_in_flight=3)
+    old_buffer = ring.buffer
+
+    ring.begin_frame()
+    ring.write(_chunk(400))
+    ring.begin_frame()
+    ring.write(_chunk(400))
+    ring.begin_frame()
+    # 末尾にも先頭にも空きがない（先頭は 3 フレーム以内に使用中）。
+    offset = ring.write(_chunk(400))
+
+    assert offset == 0
+    assert ring.generation == 1
+    assert old_buffer.released
+    assert ring.capacity >= 3 * 400
+
+
+def test_upload_ring_write_many_is_contiguous_and_aligned() -> None:
+    ring = UploadRing(_FakeContext(), capacity=1024)
+    ring.begin_frame()
+    vertices = np.arange(9, dtype=np.float32).reshape(3, 3)
+    indices = np.array([0, 1, 2], dtype=np.uint32)
+
+    v_off, i_off = ring.write_many([vertices, indices])
+
+    assert v_off % UploadRing.ALIGN == 0
+    assert i_off % UploadRing.ALIGN == 0
+    assert i_off >= v_off + vertices.nbytes
+    raw = bytes(ring.buffer.data)
+    assert raw[v_off : v_off + vertices.nbytes] == vertices.tobytes()
+    assert raw[i_off : i_off + indices.nbytes] == indices.tobytes()
+    assert ring.bytes_written == vertices.nbytes + indices.nbytes
@@ -0,0 +1,53 @@
+"""interactive.gl.vertex_format の頂点パックをテスト。"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from grafix.interactive.gl.vertex_format import VERTEX_STRIDES, pack_vertices
+
+
+def _coords() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(-50.0, 250.0, size=(1000, 3)).astype(np.float32)
+    return coords
+
+
+def test_xyz32_keeps_coords() -> None:
+    coords = _coords()
+    vertices, dequant = pack_vertices(coords, "xyz32")
+    np.testing.assert_array_equal(vertices, coords)
+    assert dequant == (0.0, 0.0, 1.0, 1.0)
+
+
+def test_xy32_drops_z() -> None:
+    coords = _coords()
+    vertices, dequant = pack_vertices(coords, "xy32")
+    assert vertices.dtype == np.float32
+    assert vertices.nbytes == coords.shape[0] * VERTEX_STRIDES["xy32"]
+    np.testing.assert_array_equal(vertices, coords[:, :2])
+    assert dequant == (0.0, 0.0, 1.0, 1.0)
+
+
+def test_xy16_round_trip_within_one_step() -> None:
+    coords = _coords()
+    vertices, (x0, y0, step_x, step_y) = pack_vertices(coords, "xy16")
+    assert vertices.dtype == np.uint16
+    assert vertices.nbytes == coords.shape[0] * VERTEX_STRIDES["xy16"]
+
+    # シェーダの復元式 `dequant.xy + in_vert * dequant.zw` と同じ計算。
+    restored = vertices.astype(np.float64) * (step_x, step_y) + (x0, y0)
+    assert np.max(np.abs(restored - coords[:, :2])) <= max(step_x, step_y)
+
+
+def test_xy16_degenerate_extent() -> None:
+    coords = np.array([[3.0, 4.0, 0.0], [3.0, 4.0, 1.0]], dtype=np.float32)
+    vertices, dequant = pack_vertices(coords, "xy16")
+    assert vertices.tolist() == [[0, 0], [0, 0]]
+    assert dequant[:2] == (3.0, 4.0)
+
+
+def test_unknown_format_raises() -> None:
+    with pytest.raises(ValueError):
+        pack_vertices(_coords(), "xy8")
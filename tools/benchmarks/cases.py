@@ -112,6 +112,23 @@ def build_default_cases(*, seed: int) -> list[BenchmarkCase]:
     return cases
 
 
+def build_dense_mesh_case(*, n_vertices: int = 500_000) -> BenchmarkCase:
+    """頂点数の多い細分化メッシュ相当のケースを返す。
+
+    Notes
+    -----
+    既定ケース列には含めない（全 effect に流すと重すぎる）。
+    displace のスレッド数比較など、頂点並列 effect の個別ベンチで使う。
+    """
+    n = int(n_vertices)
+    return BenchmarkCase(
+        case_id="mesh_dense",
+        label=f"dense mesh ({n // 1000}k verts)",
+        description="subdivide 後を想定した高密度の格子状ポリライン群",
+        geometry=_dense_grid_lines(n_vertices=n),
+    )
+
+
 def _line_segment() -> RealizedGeometry:
     coords = np.asarray([[0.0, 0.0, 0.0], [100.0, 0.0, 0.0]], dtype=np.float32)
     offsets = np.asarray([0, 2], dtype=np.int32)
@@ -181,3 +198,21 @@ def _two_rings(*, outer_sides: int, inner_sides: int) -> RealizedGeometry:
     )
     return RealizedGeometry(coords=coords, offsets=offsets)
 
+
+
+def _dense_grid_lines(*, n_vertices: int) -> RealizedGeometry:
+    n = int(n_vertices)
+    if n < 4:
+        n = 4
+
+    # 横線を並べた格子。1 本あたり per_line 点、z に緩い起伏を付ける。
+    per_line = 1_000 if n >= 2_000 else 2
+    n_lines = max(1, n // per_line)
+    xs = np.linspace(-200.0, 200.0, num=per_line, dtype=np.float32)
+    ys = np.linspace(-200.0, 200.0, num=n_lines, dtype=np.float32)
+    x = np.tile(xs, n_lines)
+    y = np.repeat(ys, per_line)
+    z = (10.0 * np.sin(x * 0.05) * np.cos(y * 0.05)).astype(np.float32, copy=False)
+    coords = np.stack([x, y, z], axis=1).astype(np.float32, copy=False)
+    offsets = np.arange(0, coords.shape[0] + 1, per_line, dtype=np.int32)
+    return RealizedGeometry(coords=coords, offsets=offsets)
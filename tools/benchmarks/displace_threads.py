@@ -0,0 +1,90 @@
+"""
+どこで: `tools/benchmarks/displace_threads.py`。
+何を: displace の評価カーネル（直列 / prange 並列 × float64 / float32）をスレッド数別に計測する。
+なぜ: 高密度メッシュでの並列化の伸びと float32 経路の効果を、同じ入力で比較するため。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def _bootstrap_import_paths() -> None:
+    script_dir = Path(__file__).resolve().parent
+    project_root = script_dir.parents[1]
+    src_dir = project_root / "src"
+
+    # `python tools/benchmarks/displace_threads.py` と
+    # `python -m tools.benchmarks.displace_threads` の両方で動かす。
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    if str(src_dir) not in sys.path:
+        sys.path.insert(0, str(src_dir))
+
+
+_bootstrap_import_paths()
+
+import numba  # noqa: E402  # type: ignore[import-untyped]
+
+from grafix.core.effects import displace as displace_module  # noqa: E402
+from tools.benchmarks.cases import build_dense_mesh_case  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    case = build_dense_mesh_case(n_vertices=int(args.vertices))
+    inputs = [case.geometry]
+
+    max_threads = int(numba.config.NUMBA_NUM_THREADS)
+    threads = [int(s) for s in str(args.threads).split(",") if s.strip()]
+
+    print(f"[grafix-bench] case={case.label} numba_max_threads={max_threads}")  # noqa: T201
+    print(f"{'variant':<24} {'threads':>7} {'mean_ms':>10} {'min_ms':>10}")  # noqa: T201
+
+    for precision in ("float64", "float32"):
+        os.environ[displace_module.PRECISION_ENV] = precision
+
+        os.environ[displace_module.PARALLEL_ENV] = "0"
+        mean_ms, min_ms = _time_displace(inputs, warmup=args.warmup, repeats=args.repeats)
+        print(f"{'serial/' + precision:<24} {1:>7} {mean_ms:>10.2f} {min_ms:>10.2f}")  # noqa: T201
+
+        os.environ[displace_module.PARALLEL_ENV] = "1"
+        for n in threads:
+            if n > max_threads:
+                print(f"{'parallel/' + precision:<24} {n:>7} {'skipped':>10}")  # noqa: T201
+                continue
+            numba.set_num_threads(n)
+            mean_ms, min_ms = _time_displace(inputs, warmup=args.warmup, repeats=args.repeats)
+            print(f"{'parallel/' + precision:<24} {n:>7} {mean_ms:>10.2f} {min_ms:>10.2f}")  # noqa: T201
+        numba.set_num_threads(max_threads)
+
+    return 0
+
+
+def _time_displace(inputs, *, warmup: int, repeats: int) -> tuple[float, float]:
+    for _ in range(max(0, int(warmup))):
+        displace_module.displace(inputs, t=0.0)
+
+    times_ms: list[float] = []
+    for i in range(max(1, int(repeats))):
+        t0 = time.perf_counter_ns()
+        displace_module.displace(inputs, t=0.01 * float(i))
+        times_ms.append(float(time.perf_counter_ns() - t0) / 1_000_000.0)
+    return sum(times_ms) / float(len(times_ms)), min(times_ms)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="displace_threads")
+    p.add_argument("--vertices", type=int, default=500_000, help="入力頂点数")
+    p.add_argument("--threads", default="1,2,4,8", help="並列版のスレッド数（カンマ区切り）")
+    p.add_argument("--repeats", type=int, default=10, help="本計測の反復回数")
+    p.add_argument("--warmup", type=int, default=2, help="ウォームアップ回数（JIT 除外用）")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())